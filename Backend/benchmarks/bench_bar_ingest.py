@@ -0,0 +1,118 @@
+"""
+Bar-ingest benchmark: one 5000-row TwelveData response into bars_1m.
+
+Supabase is replaced by a fake client whose execute() sleeps --latency
+seconds per upsert, so the numbers show encoding cost plus how batches are
+uploaded, not the network.
+
+  before — the old save_bars_1m: copy, to_dict(orient='records'), per-cell
+           _sanitize_records, then sequential 500-row upserts
+  after  — database.save_bars: column-wise encoding, streamed batches,
+           BAR_UPLOAD_CONCURRENCY uploads in flight
+
+Usage (from Backend/):
+    python -m benchmarks.bench_bar_ingest [--rows 5000] [--latency 0.05] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import database
+
+
+class _FakeClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.rows = 0
+
+    def table(self, _name):
+        return self
+
+    def upsert(self, batch, on_conflict):
+        self.rows += len(batch)
+        return self
+
+    def execute(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+
+# ── Legacy path, reproduced verbatim for comparison ──────────────────────────
+
+def _legacy_sanitize_records(records):
+    clean = []
+    for rec in records:
+        clean_rec = {}
+        for k, v in rec.items():
+            if isinstance(v, (np.integer,)):
+                clean_rec[k] = int(v)
+            elif isinstance(v, (np.floating,)):
+                clean_rec[k] = float(v)
+            elif isinstance(v, np.ndarray):
+                clean_rec[k] = v.tolist()
+            else:
+                clean_rec[k] = v
+        clean.append(clean_rec)
+    return clean
+
+
+def _legacy_save_bars_1m(client, symbol, df):
+    data = df.copy()
+    if 'datetime' not in data.columns and isinstance(data.index, pd.DatetimeIndex):
+        data['datetime'] = data.index.strftime('%Y-%m-%d %H:%M:%S')
+    data['symbol'] = symbol
+    records = data[['symbol', 'datetime', 'open', 'high', 'low', 'close', 'volume']].to_dict(orient='records')
+    records = _legacy_sanitize_records(records)
+    for i in range(0, len(records), 500):
+        client.table("bars_1m").upsert(records[i:i + 500], on_conflict="symbol,datetime").execute()
+
+
+def _twelvedata_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2024-01-02 09:30:00", periods=rows, freq="min", name="datetime")
+    close = 100 + rng.standard_normal(rows).cumsum()
+    return pd.DataFrame({
+        "open": close + rng.random(rows), "high": close + 1, "low": close - 1,
+        "close": close, "volume": rng.integers(1_000, 50_000, rows).astype(float),
+    }, index=idx)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake upsert round trip")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = _twelvedata_frame(args.rows)
+    print(f"{args.rows} bars -> bars_1m, best of {args.repeat}")
+    for latency in (0.0, args.latency):
+        client = _FakeClient(latency)
+        with patch.object(database, "_get_client", return_value=client):
+            before = _best_of(lambda: _legacy_save_bars_1m(client, "AAPL", df), args.repeat)
+            after = _best_of(lambda: database.save_bars("AAPL", df, "bars_1m"), args.repeat)
+        label = "encode only" if latency == 0 else f"{latency * 1000:.0f} ms/upsert"
+        print(f"  {label:<16} before {before * 1000:8.1f} ms   after {after * 1000:8.1f} ms   "
+              f"({before / after:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
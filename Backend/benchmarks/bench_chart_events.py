@@ -0,0 +1,124 @@
+"""
+Chart event detection benchmark: a year of 1min bars (252 sessions x 390).
+
+  legacy   — the previous list-of-dicts engine: sort by string key, float()
+             per row, full sort of every |move| to keep 8 events
+  records  — compute_price_events on the same records (array engine underneath)
+  arrays   — price_events_from_arrays on the time/close arrays, what /history
+             uses with a ChartSeries
+
+Every run checks that all three return identical events.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_chart_events [--sessions 252] [--repeat 5] [--timeframe 5D]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from services.chart_events import (
+    _MAX_EVENTS, _calendar_date, _sort_key_record, compute_price_events, event_floor_pct,
+    price_events_from_arrays,
+)
+
+
+def legacy_events(records: list[dict[str, Any]], timeframe: str) -> list[dict[str, Any]]:
+    """The pre-NumPy implementation, kept here as the baseline."""
+    if not records or len(records) < 2:
+        return []
+    rows = sorted(records, key=_sort_key_record)
+    if timeframe == "1D":
+        today = _calendar_date(rows[-1].get("time") or rows[-1].get("date"))
+        if today:
+            rows = [r for r in rows if _calendar_date(r.get("time") or r.get("date")) == today]
+    if len(rows) < 2:
+        return []
+    floor = event_floor_pct(timeframe)
+    moves = []
+    for i in range(1, len(rows)):
+        prev_c = float(rows[i - 1].get("close") or 0)
+        cur_c = float(rows[i].get("close") or 0)
+        if prev_c <= 0:
+            continue
+        pct = (cur_c - prev_c) / prev_c * 100.0
+        t = str(rows[i].get("time") or rows[i].get("date") or "")
+        cal = _calendar_date(t)
+        if not cal:
+            continue
+        moves.append((abs(pct), i, pct, t, cur_c, cal))
+    moves.sort(reverse=True, key=lambda x: x[0])
+    seen, picked = set(), []
+    for abs_pct, idx, pct, t, price, cal in moves:
+        if abs_pct < floor:
+            break
+        if cal in seen:
+            continue
+        seen.add(cal)
+        picked.append((pct, t, price, cal))
+        if len(picked) >= _MAX_EVENTS:
+            break
+    picked.sort(key=lambda x: x[1])
+    return [
+        {"index": n, "label": f"Event {n}", "time": t, "event_date": cal,
+         "price": round(price, 4), "pct_change": round(pct, 3)}
+        for n, (pct, t, price, cal) in enumerate(picked, start=1)
+    ]
+
+
+def _minute_bars(sessions: int) -> tuple[np.ndarray, np.ndarray]:
+    days = pd.bdate_range("2025-01-02", periods=sessions)
+    minutes = pd.timedelta_range("09:30:00", periods=390, freq="min")
+    index = (days.values[:, None] + minutes.values[None, :]).ravel()
+    times = pd.DatetimeIndex(index).strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+    rng = np.random.default_rng(0)
+    # Quantized prices so equal |moves| (ties) actually occur
+    close = np.round(150 * np.exp(np.cumsum(rng.standard_normal(len(times)) * 0.0008)), 2)
+    return times, close
+
+
+def _best_of(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeframe", default="5D", help="event floor to use (1D keeps only the last session)")
+    args = parser.parse_args()
+
+    times, close = _minute_bars(args.sessions)
+    records = [{"time": t, "close": c} for t, c in zip(times.tolist(), close.tolist())]
+    print(f"{len(times):,} 1min bars, timeframe floor {args.timeframe}, best of {args.repeat}")
+
+    cases = {
+        "legacy": lambda: legacy_events(records, args.timeframe),
+        "records": lambda: compute_price_events(records, args.timeframe),
+        "arrays": lambda: price_events_from_arrays(times, close, args.timeframe),
+    }
+    results = {}
+    for name, fn in cases.items():
+        elapsed, results[name] = _best_of(fn, args.repeat)
+        print(f"  {name:<8} {elapsed * 1000:8.2f} ms")
+    same = results["legacy"] == results["records"] == results["arrays"]
+    print(f"identical events: {same} ({len(results['legacy'])} events)")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
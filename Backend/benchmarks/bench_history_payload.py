@@ -0,0 +1,105 @@
+"""
+/history payload benchmark: body size and encode time per response format.
+
+Synthetic bars shaped like each timeframe's view (1D: ~390 1min bars,
+3M: ~440 1h bars, 5Y: ~260 weekly bars):
+
+  before    — the old path: DataFrame.to_dict(orient='records') with the
+              leaked dt/date_only columns, FastAPI's jsonable_encoder + json
+  records   — ChartSeries.records() encoded with orjson (default format)
+  columnar  — parallel t/o/h/l/c/v arrays with orjson (format=columnar)
+  arrow     — Arrow IPC stream (format=arrow)
+
+Sizes are shown raw and gzipped (GZipMiddleware compresses bodies >= 1 KB).
+
+Usage (from Backend/):
+    python -m benchmarks.bench_history_payload [--repeat 50]
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from routers.stock_data import encode_history
+from services.chart_series import ChartSeries
+
+VIEWS = {
+    "1D": ("datetime", pd.date_range("2024-01-02 09:30", periods=390, freq="min")),
+    "3M": ("datetime", pd.date_range("2024-01-02 09:30", periods=441, freq="h")),
+    "5Y": ("date", pd.date_range("2019-01-04", periods=261, freq="W-FRI")),
+}
+
+
+def _frame(time_key: str, index: pd.DatetimeIndex) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(len(index)).cumsum()
+    fmt = "%Y-%m-%d" if time_key == "date" else "%Y-%m-%d %H:%M:%S"
+    return pd.DataFrame({
+        "symbol": "AAPL", time_key: index.strftime(fmt),
+        "open": close + 0.1, "high": close + 1, "low": close - 1, "close": close,
+        "volume": rng.integers(1_000, 50_000, len(index)),
+    })
+
+
+def _before(df: pd.DataFrame, time_key: str) -> bytes:
+    data = df.copy()
+    data["dt"] = pd.to_datetime(data[time_key])
+    if time_key == "datetime":
+        data["date_only"] = data["dt"].dt.date
+    data["time"] = data[time_key]
+    body = {"symbol": "AAPL", "data": data.to_dict(orient="records"), "events": []}
+    return json.dumps(jsonable_encoder(body)).encode()
+
+
+def _series(df: pd.DataFrame, time_key: str) -> ChartSeries:
+    return ChartSeries("AAPL", time_key, df[time_key].to_numpy(dtype=object),
+                       {c: df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close", "volume")})
+
+
+def _best_of(fn, repeat: int) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"best of {args.repeat}; sizes in KB (raw / gzip)")
+    for timeframe, (time_key, index) in VIEWS.items():
+        df = _frame(time_key, index)
+        series = _series(df, time_key)
+        print(f"\n{timeframe}: {len(df)} bars")
+        cases = {
+            "before": lambda: _before(df, time_key),
+            "records": lambda: encode_history(series, timeframe, "records")[0],
+            "columnar": lambda: encode_history(series, timeframe, "columnar")[0],
+            "arrow": lambda: encode_history(series, timeframe, "arrow")[0],
+        }
+        for name, fn in cases.items():
+            try:
+                elapsed, body = _best_of(fn, args.repeat)
+            except ImportError as e:
+                print(f"  {name:<9} skipped ({e})")
+                continue
+            gz = len(gzip.compress(body))
+            print(f"  {name:<9} {elapsed * 1000:7.2f} ms   {len(body) / 1024:7.1f} / {gz / 1024:6.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Momentum detection benchmark: three hours of per-second ticks per symbol.
+
+  rescan   — min/max over every point still inside the window on each tick,
+             O(window) per tick
+  deques   — MomentumDetector.update, monotonic deques, O(1) amortized per tick
+
+Both evaluate the same windows (default "30m:3,2h:5"), and the run checks
+that they flag the same ticks.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_momentum [--symbols 2] [--seconds 10800] [--windows 30m:3,2h:5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.momentum_detector import MomentumDetector, parse_windows
+
+
+def _ticks(symbols: int, seconds: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    # Volatile enough that some windows cross their thresholds
+    return 100 * np.exp(np.cumsum(rng.standard_normal((symbols, seconds)) * 0.0004, axis=1))
+
+
+def rescan(prices: np.ndarray, windows) -> list[tuple[int, int, str]]:
+    hits = []
+    for s, series in enumerate(prices):
+        recent: deque[tuple[int, float]] = deque()
+        longest = max(w.seconds for w in windows)
+        for t, price in enumerate(series.tolist()):
+            recent.append((t, price))
+            while recent[0][0] < t - longest:
+                recent.popleft()
+            for w in windows:
+                inside = [p for ts, p in recent if ts >= t - w.seconds]
+                lo, hi = min(inside), max(inside)
+                up, down = (price - lo) / lo * 100, (price - hi) / hi * 100
+                pct = up if up >= -down else down
+                if abs(pct) >= w.threshold_pct and pct != 0:
+                    hits.append((s, t, w.label))
+    return hits
+
+
+def deques(prices: np.ndarray, windows) -> list[tuple[int, int, str]]:
+    detector = MomentumDetector(windows)
+    hits = []
+    for s, series in enumerate(prices):
+        symbol = str(s)
+        for t, price in enumerate(series.tolist()):
+            for signal in detector.update(symbol, t, price):
+                hits.append((s, t, signal.window.label))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=2)
+    parser.add_argument("--seconds", type=int, default=10800, help="ticks per symbol (one per second)")
+    parser.add_argument("--windows", default="30m:3,2h:5")
+    args = parser.parse_args()
+
+    windows = parse_windows(args.windows)
+    prices = _ticks(args.symbols, args.seconds)
+    print(f"{prices.size:,} ticks, windows {args.windows}")
+
+    results = {}
+    for name, fn in (("rescan", rescan), ("deques", deques)):
+        start = time.perf_counter()
+        results[name] = fn(prices, windows)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<7} {elapsed:8.2f} s  ({elapsed / prices.size * 1e6:6.2f} us/tick)")
+    same = results["rescan"] == results["deques"]
+    print(f"identical signals: {same} ({len(results['deques'])} flagged ticks)")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
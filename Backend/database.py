@@ -4,14 +4,19 @@ Drop-in replacement for the old SQLite-based database.py.
 """
 
 import os
+import time
 import uuid
+import itertools
 import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from services.metrics import instrument_supabase_client
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
@@ -27,6 +32,7 @@ def _get_client() -> Client:
         if not url or not key:
             raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
         client = create_client(url, key)
+        instrument_supabase_client(client)
         _thread_local.supabase = client
     return client
 
@@ -82,31 +88,74 @@ def get_news_notify_count(symbol: str) -> int:
 
 # ===== Dismissed Notifications =====
 
+# The dismissed-id set is read on every panel poll but only changes through the
+# writes below, which update or drop the cached copy. The TTL bounds staleness
+# from writes made by another process.
+DISMISSED_CACHE_TTL_S = float(os.getenv("DISMISSED_CACHE_TTL_S", "300"))
+DISMISSED_PAGE_ROWS = 1000  # PostgREST's default max rows per response
+
+_dismissed_ids: Optional[frozenset] = None
+_dismissed_loaded_at = 0.0
+_dismissed_writes = 0  # bumped by every write, so a load that raced one is not cached
+_dismissed_lock = threading.Lock()
+
+
+def _invalidate_dismissed():
+    global _dismissed_ids, _dismissed_writes
+    with _dismissed_lock:
+        _dismissed_ids = None
+        _dismissed_writes += 1
+
+
 def dismiss_notification(notification_id: str):
+    global _dismissed_ids, _dismissed_writes
     client = _get_client()
     client.table("dismissed_notifications").upsert({
         "notification_id": notification_id,
         "dismissed_at": datetime.now().isoformat(),
     }, on_conflict="notification_id").execute()
-
-
-def get_dismissed_notification_ids() -> set:
-    client = _get_client()
-    resp = client.table("dismissed_notifications").select("notification_id").execute()
-    return {row["notification_id"] for row in resp.data}
+    with _dismissed_lock:
+        _dismissed_writes += 1
+        if _dismissed_ids is not None:
+            _dismissed_ids = _dismissed_ids | {notification_id}
+
+
+def get_dismissed_notification_ids() -> frozenset:
+    global _dismissed_ids, _dismissed_loaded_at
+    with _dismissed_lock:
+        if _dismissed_ids is not None and time.monotonic() - _dismissed_loaded_at < DISMISSED_CACHE_TTL_S:
+            return _dismissed_ids
+        writes = _dismissed_writes
+    loaded_at = time.monotonic()
+    client = _get_client()
+    ids = set()
+    for start in itertools.count(0, DISMISSED_PAGE_ROWS):
+        resp = (client.table("dismissed_notifications")
+                .select("notification_id")
+                .order("notification_id")
+                .range(start, start + DISMISSED_PAGE_ROWS - 1)
+                .execute())
+        ids.update(row["notification_id"] for row in resp.data)
+        if len(resp.data) < DISMISSED_PAGE_ROWS:
+            break
+    ids = frozenset(ids)
+    with _dismissed_lock:
+        if writes == _dismissed_writes:
+            _dismissed_ids, _dismissed_loaded_at = ids, loaded_at
+    return ids
 
 
 def clear_all_dismissed():
     client = _get_client()
     # Delete all rows — Supabase requires a filter, so use a tautology
     client.table("dismissed_notifications").delete().neq("notification_id", "").execute()
+    _invalidate_dismissed()
 
 
 # ===== Generated Notifications =====
 
-def save_generated_notification(notification: dict):
-    client = _get_client()
-    client.table("generated_notifications").upsert({
+def _notification_row(notification: dict, created_at: str) -> dict:
+    return {
         "id": notification["id"],
         "type": notification["type"],
         "symbol": notification["symbol"],
@@ -115,9 +164,27 @@ def save_generated_notification(notification: dict):
         "message": notification["message"],
         "direction": notification["direction"],
         "percent_change": notification["percentChange"],
-        "created_at": datetime.now().isoformat(),
+        "created_at": created_at,
         "articles_json": notification.get("articles", ""),
-    }, on_conflict="id").execute()
+    }
+
+
+def save_generated_notification(notification: dict):
+    client = _get_client()
+    client.table("generated_notifications").upsert(
+        _notification_row(notification, datetime.now().isoformat()), on_conflict="id"
+    ).execute()
+
+
+def save_generated_notifications(notifications: list[dict]):
+    """Upsert many generated notifications in one request."""
+    if not notifications:
+        return
+    client = _get_client()
+    created_at = datetime.now().isoformat()
+    client.table("generated_notifications").upsert(
+        [_notification_row(n, created_at) for n in notifications], on_conflict="id"
+    ).execute()
 
 
 def notification_exists(notification_id: str) -> bool:
@@ -126,14 +193,78 @@ def notification_exists(notification_id: str) -> bool:
     return len(resp.data) > 0
 
 
-def get_generated_notifications_for_date(date_str: str) -> list:
+NOTIFICATION_ID_CHUNK = 200
+
+
+def get_existing_notification_ids(notification_ids: Iterable[str]) -> set:
+    """The subset of notification_ids already generated (one `in` query per chunk of ids)."""
+    ids = list(dict.fromkeys(notification_ids))
+    if not ids:
+        return set()
     client = _get_client()
-    resp = (client.table("generated_notifications")
-            .select("*")
-            .eq("date", date_str)
-            .order("created_at", desc=True)
-            .execute())
-    return resp.data
+    existing = set()
+    # Chunked so the id list stays well inside the request URL limit
+    for i in range(0, len(ids), NOTIFICATION_ID_CHUNK):
+        resp = (client.table("generated_notifications")
+                .select("id")
+                .in_("id", ids[i:i + NOTIFICATION_ID_CHUNK])
+                .execute())
+        existing.update(row["id"] for row in resp.data or [])
+    return existing
+
+
+def row_cursor(row: dict, column: str) -> str:
+    """Cursor for paged reads: `<column value>|<id>`."""
+    return f"{row[column]}|{row['id']}"
+
+
+def _paged(query, column: str, since: Optional[str], limit: Optional[int]) -> list:
+    """
+    Newest first; with a `since` cursor, the `limit` rows right after it.
+    Those are read oldest first (keyset on column, then id: a bulk upsert
+    stamps a whole batch with one created_at), so rows past the limit are
+    left for the next call instead of being skipped. The cursor for that call
+    is row_cursor() of the first (newest) row returned. A bare timestamp
+    cursor is read as "after this time".
+    """
+    if since:
+        value, _, last_id = since.partition("|")
+        if last_id:
+            query = query.or_(f'{column}.gt."{value}",and({column}.eq."{value}",id.gt."{last_id}")')
+        else:
+            query = query.gt(column, value)
+        query = query.order(column).order("id")
+    else:
+        query = query.order(column, desc=True).order("id", desc=True)
+    if limit:
+        query = query.limit(limit)
+    rows = query.execute().data or []
+    return rows[::-1] if since else rows
+
+
+def get_generated_notifications_for_date(date_str: str, since: Optional[str] = None,
+                                         limit: Optional[int] = None) -> list:
+    """The day's notifications, newest first; with a `since` cursor, the page after it (see _paged)."""
+    client = _get_client()
+    query = (client.table("generated_notifications")
+             .select("*")
+             .eq("date", date_str))
+    return _paged(query, "created_at", since, limit)
+
+
+def clear_all_notifications(date_str: str) -> int:
+    """
+    Dismiss the day's generated notifications and read + dismiss every unread
+    alert in one statement (supabase_migration_notification_reads.sql).
+    Returns the number of newly dismissed ids.
+    """
+    client = _get_client()
+    resp = client.rpc("clear_all_notifications", {
+        "p_date": date_str,
+        "p_dismissed_at": datetime.now().isoformat(),
+    }).execute()
+    _invalidate_dismissed()
+    return resp.data or 0
 
 
 # ===== Reminders =====
@@ -213,6 +344,17 @@ def get_all_alerts() -> list:
     return resp.data
 
 
+def get_unread_alerts(since: Optional[str] = None, limit: int = 100) -> list:
+    """
+    Unread, non-dismissed alerts joined with their reminder's condition fields
+    (the unread_alert_notifications view), newest first, at most `limit`.
+    With a `since` cursor, the page of alerts triggered after it (see _paged).
+    """
+    client = _get_client()
+    query = client.table("unread_alert_notifications").select("*")
+    return _paged(query, "triggered_at", since, limit)
+
+
 def mark_alert_read(alert_id: str) -> Optional[dict]:
     client = _get_client()
     try:
@@ -255,90 +397,89 @@ def save_news_article_sent(symbol: str, url_hash: str, url: str, date_str: str):
 
 # ===== Price Bars =====
 
-def save_bars_1d(symbol: str, df: pd.DataFrame):
-    if df.empty:
-        return
-    client = _get_client()
-    data = df.copy()
-    if 'date' not in data.columns and isinstance(data.index, pd.DatetimeIndex):
-        data['date'] = data.index.strftime('%Y-%m-%d')
-    elif 'date' in data.columns and pd.api.types.is_datetime64_any_dtype(data['date']):
-        data['date'] = data['date'].dt.strftime('%Y-%m-%d')
-    data['symbol'] = symbol
-    records = data[['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']].to_dict(orient='records')
-    # Convert numpy types to Python native for JSON serialization
-    records = _sanitize_records(records)
-    _batch_upsert(client, "bars_1d", records, on_conflict="symbol,date")
+BAR_UPLOAD_BATCH_SIZE = 500
+BAR_UPLOAD_CONCURRENCY = int(os.getenv("BAR_UPLOAD_CONCURRENCY", "4"))
+_BAR_COLUMNS = ("open", "high", "low", "close", "volume")
 
+_upload_pool: Optional[ThreadPoolExecutor] = None
+_upload_pool_lock = threading.Lock()
 
-def save_bars_1h(symbol: str, df: pd.DataFrame):
+
+def save_bars(symbol: str, df: pd.DataFrame, table: str):
+    """
+    Upsert OHLCV bars into bars_1d / bars_1h / bars_1m.
+    Accepts a TwelveData frame (DatetimeIndex) or a frame with a date/datetime column.
+    """
     if df.empty:
         return
-    client = _get_client()
-    data = df.copy()
-    if 'datetime' not in data.columns and isinstance(data.index, pd.DatetimeIndex):
-        data['datetime'] = data.index.strftime('%Y-%m-%d %H:%M:%S')
-    elif 'datetime' in data.columns and pd.api.types.is_datetime64_any_dtype(data['datetime']):
-        data['datetime'] = data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    data['symbol'] = symbol
-    records = data[['symbol', 'datetime', 'open', 'high', 'low', 'close', 'volume']].to_dict(orient='records')
-    records = _sanitize_records(records)
-    _batch_upsert(client, "bars_1h", records, on_conflict="symbol,datetime")
+    time_col = "date" if table == "bars_1d" else "datetime"
+    _batch_upsert(table, _bar_record_batches(symbol, df, time_col), on_conflict=f"symbol,{time_col}")
 
 
-def save_bars_1m(symbol: str, df: pd.DataFrame):
-    if df.empty:
+def _bar_record_batches(symbol: str, df: pd.DataFrame, time_col: str,
+                        batch_size: int = BAR_UPLOAD_BATCH_SIZE) -> Iterator[list[dict]]:
+    """
+    Encode bars column-wise (one vectorized conversion per column, NaN -> None)
+    and yield JSON-ready record batches lazily.
+    """
+    fmt = "%Y-%m-%d" if time_col == "date" else "%Y-%m-%d %H:%M:%S"
+    if time_col in df.columns:
+        times = df[time_col]
+        times = times.dt.strftime(fmt) if pd.api.types.is_datetime64_any_dtype(times) else times.astype(str)
+    elif isinstance(df.index, pd.DatetimeIndex):
+        times = pd.Series(df.index.strftime(fmt), index=df.index)
+    else:
+        raise ValueError(f"bars need a DatetimeIndex or a '{time_col}' column")
+
+    columns = {"symbol": [symbol] * len(df), time_col: times.tolist()}
+    for col in _BAR_COLUMNS:
+        values = pd.to_numeric(df[col], errors="coerce")
+        if col == "volume":
+            values = values.round().astype("Int64")
+        columns[col] = values.astype(object).where(values.notna(), None).tolist()
+
+    keys = list(columns)
+    lists = list(columns.values())
+    for i in range(0, len(df), batch_size):
+        yield [dict(zip(keys, row)) for row in zip(*(col[i:i + batch_size] for col in lists))]
+
+
+def _get_upload_pool() -> ThreadPoolExecutor:
+    global _upload_pool
+    with _upload_pool_lock:
+        if _upload_pool is None:
+            _upload_pool = ThreadPoolExecutor(max_workers=BAR_UPLOAD_CONCURRENCY, thread_name_prefix="bar-upload")
+        return _upload_pool
+
+
+def _upsert_batch(table: str, batch: list[dict], on_conflict: str):
+    # Runs on an upload thread: _get_client() hands each thread its own httpx session
+    _get_client().table(table).upsert(batch, on_conflict=on_conflict).execute()
+
+
+def _batch_upsert(table: str, batches: Iterable[list[dict]], on_conflict: str):
+    """
+    Upsert record batches (to stay under Supabase payload limits), with up to
+    BAR_UPLOAD_CONCURRENCY batches in flight. Batches are pulled from the
+    iterator only as upload slots free up; the first failure is raised.
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return
+    second = next(batches, None)
+    if second is None:
+        _upsert_batch(table, first, on_conflict)
         return
-    client = _get_client()
-    data = df.copy()
-    if 'datetime' not in data.columns and isinstance(data.index, pd.DatetimeIndex):
-        data['datetime'] = data.index.strftime('%Y-%m-%d %H:%M:%S')
-    elif 'datetime' in data.columns and pd.api.types.is_datetime64_any_dtype(data['datetime']):
-        data['datetime'] = data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    data['symbol'] = symbol
-    records = data[['symbol', 'datetime', 'open', 'high', 'low', 'close', 'volume']].to_dict(orient='records')
-    records = _sanitize_records(records)
-    _batch_upsert(client, "bars_1m", records, on_conflict="symbol,datetime")
-
-
-def _sanitize_records(records: list[dict]) -> list[dict]:
-    """Convert numpy/pandas types to Python native types for JSON serialization."""
-    import numpy as np
-    clean = []
-    for rec in records:
-        clean_rec = {}
-        for k, v in rec.items():
-            if isinstance(v, (np.integer,)):
-                clean_rec[k] = int(v)
-            elif isinstance(v, (np.floating,)):
-                clean_rec[k] = float(v)
-            elif isinstance(v, np.ndarray):
-                clean_rec[k] = v.tolist()
-            else:
-                clean_rec[k] = v
-        clean.append(clean_rec)
-    return clean
-
-
-def _batch_upsert(client: Client, table: str, records: list[dict], on_conflict: str, batch_size: int = 500):
-    """Upsert records in batches to avoid hitting Supabase payload limits."""
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
-        client.table(table).upsert(batch, on_conflict=on_conflict).execute()
-
-
-def get_latest_timestamp(symbol: str, table: str):
-    client = _get_client()
-    sort_col = "date" if table == "bars_1d" else "datetime"
-    resp = (client.table(table)
-            .select(sort_col)
-            .eq("symbol", symbol)
-            .order(sort_col, desc=True)
-            .limit(1)
-            .execute())
-    if resp.data:
-        return resp.data[0][sort_col]
-    return None
+
+    pool = _get_upload_pool()
+    in_flight: deque[Future] = deque()
+    for batch in itertools.chain((first, second), batches):
+        if len(in_flight) >= BAR_UPLOAD_CONCURRENCY:
+            in_flight.popleft().result()
+        in_flight.append(pool.submit(_upsert_batch, table, batch, on_conflict))
+    for future in in_flight:
+        future.result()
 
 
 def fetch_history(symbol: str, table: str, start_str: Optional[str] = None):
@@ -420,50 +561,38 @@ def toggle_email_notifications(enabled: bool):
 
 # ===== Bars query helper (used by notification_service) =====
 
-def get_bars_1m_range(symbol: str, start: str, end: str = None):
-    """
-    Get earliest and latest bars_1m rows for a symbol in a time range.
-    Returns (earliest_row, latest_row) or (None, None).
-    """
-    client = _get_client()
-
-    # Earliest
-    q = client.table("bars_1m").select("*").eq("symbol", symbol).gte("datetime", start)
-    if end:
-        q = q.lte("datetime", end)
-    resp = q.order("datetime").limit(1).execute()
-    earliest = resp.data[0] if resp.data else None
-
-    if not earliest:
-        return None, None
+WINDOW_STATS_CHUNK = 500
 
-    # Latest
-    q2 = client.table("bars_1m").select("*").eq("symbol", symbol).gte("datetime", start)
-    if end:
-        q2 = q2.lte("datetime", end)
-    resp2 = q2.order("datetime", desc=True).limit(1).execute()
-    latest = resp2.data[0] if resp2.data else None
 
-    return earliest, latest
-
-
-def get_bars_1m_row(symbol: str, operator: str, datetime_val: str, order_asc: bool = True):
+def get_bars_1m_window_stats(windows: list[dict]) -> dict[tuple[str, str], dict]:
     """
-    Get a single bars_1m row. Used for morning gap queries.
-    operator: 'gte' or 'lt'
+    First/last/min/max bars_1m for many (symbol, window) pairs via the
+    bars_1m_window_stats RPC (supabase_migration_bar_window_stats.sql).
+
+    windows: [{"key": str, "symbol": str, "start": str | None, "end": str | None,
+               "extremes": bool}]
+             start is inclusive, end exclusive (datetime text, ET). extremes asks
+             for the lowest low / highest high; only windows with a start get them.
+    Returns {(key, symbol): {"first_datetime", "first_close", "last_datetime",
+             "last_close", "min_low", "min_low_datetime", "max_high",
+             "max_high_datetime", "bar_count"}} (the last five null without
+             extremes); windows without bars are absent.
     """
-    client = _get_client()
-    q = client.table("bars_1m").select("*").eq("symbol", symbol)
-    if operator == "gte":
-        q = q.gte("datetime", datetime_val)
-    elif operator == "lt":
-        q = q.lt("datetime", datetime_val)
-    elif operator == "lte":
-        q = q.lte("datetime", datetime_val)
-    order_dir = not order_asc  # desc=True means descending
-    q = q.order("datetime", desc=(not order_asc)).limit(1)
-    resp = q.execute()
-    return resp.data[0] if resp.data else None
+    if not windows:
+        return {}
+    client = _get_client()
+    payload = [
+        {"key": w["key"], "symbol": w["symbol"], "start_at": w.get("start"), "end_at": w.get("end"),
+         "extremes": bool(w.get("extremes"))}
+        for w in windows
+    ]
+    stats = {}
+    # Chunked so a large watchlist stays under PostgREST's row limit
+    for i in range(0, len(payload), WINDOW_STATS_CHUNK):
+        resp = client.rpc("bars_1m_window_stats", {"windows": payload[i:i + WINDOW_STATS_CHUNK]}).execute()
+        for row in resp.data or []:
+            stats[(row["window_key"], row["symbol"])] = row
+    return stats
 
 
 if __name__ == "__main__":
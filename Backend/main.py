@@ -1,6 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from services.finnhub_client import router as finnhub_router
+from services.request_context import DEDUP_HEADER, request_context_middleware
+from services.metrics import route_latency_middleware
 
 app = FastAPI(title="Qualcomm Financial Insights Engine API")
 
@@ -14,6 +17,45 @@ def on_startup():
         print(f"Warning: Database init skipped ({e}). Install deps with: pip install -r requirements.txt")
 
 
+@app.on_event("startup")
+async def install_blocking_io_executor():
+    # Route asyncio.to_thread / run_in_executor(None, ...) through the bounded pool
+    from services.blocking_io import install_default_executor
+    install_default_executor()
+
+
+@app.on_event("shutdown")
+def shutdown_blocking_io_executor():
+    from services.blocking_io import shutdown
+    shutdown()
+
+
+@app.on_event("startup")
+async def start_loop_diagnostics():
+    # Opt-in with LOOP_DIAGNOSTICS=1; results at GET /debug/loop
+    from services.loop_diagnostics import start_loop_diagnostics
+    start_loop_diagnostics()
+
+
+@app.on_event("shutdown")
+def stop_loop_diagnostics():
+    from services.loop_diagnostics import stop_loop_diagnostics
+    stop_loop_diagnostics()
+
+
+@app.on_event("startup")
+async def start_notification_worker():
+    # Market notifications are generated on a schedule; GET /notifications only reads them
+    from services.notification_worker import start_notification_worker
+    start_notification_worker()
+
+
+@app.on_event("shutdown")
+def stop_notification_worker():
+    from services.notification_worker import stop_notification_worker
+    stop_notification_worker()
+
+
 @app.on_event("startup")
 async def start_price_monitor():
     # Set to True to enable background price monitoring (uses Finnhub API credits)
@@ -32,8 +74,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[DEDUP_HEADER, "X-Notifications-Cursor", "X-Alerts-Cursor", "X-Notifications-Event-Id"],
 )
 
+# Compress larger bodies (chart history) for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Memoize upstream lookups (Finnhub quote/profile/metric, ...) per request
+app.middleware("http")(request_context_middleware)
+
+# Per-route latency histogram, exported at GET /metrics
+app.middleware("http")(route_latency_middleware)
+
 # Include routers
 app.include_router(finnhub_router, prefix="/api/v1")
 
@@ -91,6 +143,18 @@ try:
 except Exception as e:
     print(f"Warning: account router not loaded ({e})")
 
+try:
+    from routers.metrics import router as metrics_router
+    app.include_router(metrics_router)
+except Exception as e:
+    print(f"Warning: metrics router not loaded ({e})")
+
+try:
+    from routers.diagnostics import router as diagnostics_router
+    app.include_router(diagnostics_router)
+except Exception as e:
+    print(f"Warning: diagnostics router not loaded ({e})")
+
 from routers.sentiment import router as sentiment_router
 app.include_router(sentiment_router, prefix="/api/v1")
 
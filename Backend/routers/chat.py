@@ -6,11 +6,15 @@ from services.ai100_client import (
 )
 from services.news_processor import NewsProcessor
 from services.prompt_router import classify_and_resolve_prompt
+from services.conversation_store import conversation_store
+from services.blocking_io import run_blocking
 from typing import Optional
+import asyncio
 import datetime
 import re
 import json
 import os
+import uuid
 
 router = APIRouter()
 news_processor = NewsProcessor()
@@ -26,6 +30,7 @@ class ChatRequest(BaseModel):
     ticker: Optional[str] = None
     improve_summary: bool = False
     history: Optional[list[ChatMessage]] = None
+    conversation_id: Optional[str] = None
 
 # We use Finnhub Search API for dynamic ticker resolution instead of a local map.
 from services.finnhub_client import get_finnhub_search
@@ -45,6 +50,19 @@ GREETING_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
+# Follow-ups that only make sense against what the previous turn fetched
+FOLLOWUP_PATTERN = re.compile(
+    r"^(?:can you |could you |please )?"
+    r"(?:summari[sz]e|explain|simplify|elaborate on|expand on|tell me more about|more on|what about)\b"
+    r".*\b(?:them|these|those|it|that|this|the articles?|the news|the headlines?)\W*$",
+    re.IGNORECASE,
+)
+
+# 409 detail when conversation_id names a session the server no longer has
+SESSION_EXPIRED_DETAIL = "Conversation session expired; resend with history"
+
+FOLLOWUP_PHRASES = {"tell me more", "more", "go on", "summarize", "summarise", "explain"}
+
 async def extract_ticker(message: str):
     # 1. Check for explicit tickers in parentheses or as standalone uppercase words
     # This regex looks for words like (AAPL) or just AAPL
@@ -83,7 +101,7 @@ async def extract_ticker(message: str):
         
         for search_query in search_candidates:
             try:
-                search_results = get_finnhub_search(search_query)
+                search_results = await run_blocking(get_finnhub_search, search_query)
                 if search_results and "result" in search_results:
                     results = search_results["result"]
                     if results:
@@ -112,7 +130,7 @@ async def extract_ticker(message: str):
             return t
 
     # 4. Fallback: Use AI to extract ticker
-    return extract_ticker_with_ai(message)
+    return await run_blocking(extract_ticker_with_ai, message)
 
 
 def should_fetch_news(message: str, include_news: bool) -> bool:
@@ -139,6 +157,13 @@ def is_simple_greeting(message: str) -> bool:
     return bool(GREETING_PATTERN.fullmatch(message.strip()))
 
 
+def is_contextual_followup(message: str) -> bool:
+    cleaned = message.strip()
+    if cleaned.lower().strip(" ?.!") in FOLLOWUP_PHRASES:
+        return True
+    return bool(FOLLOWUP_PATTERN.match(cleaned))
+
+
 def build_greeting_response() -> str:
     return (
         "Hello! I'm your financial AI assistant. "
@@ -242,19 +267,93 @@ def fetch_standard_stock_card_data(ticker: str):
         print(f"Error fetching stock card data for {ticker}: {e}")
         return None
 
+def _build_session_context(session: dict) -> Optional[str]:
+    """Render the articles / stock card fetched by earlier turns as prompt context."""
+    parts = []
+    news_items = session.get("news_items") or []
+    if news_items:
+        parts.append(f"Articles shown earlier about {session.get('ticker') or 'the market'}:")
+        for index, item in enumerate(news_items[:5], start=1):
+            headline = item.get("headline", "Untitled article")
+            source = item.get("source", "Unknown source")
+            summary = (item.get("summary") or "").strip()
+            parts.append(f"{index}. {headline} ({source}): {summary}")
+    card = session.get("stock_card")
+    if card:
+        parts.append(
+            f"{card.get('name')} ({card.get('ticker')}) last price ${_format_number(card.get('price'))}, "
+            f"change {_format_number(card.get('change'))} ({_format_number(card.get('percent'))}%), "
+            f"day range ${_format_number(card.get('low'))} - ${_format_number(card.get('high'))}, "
+            f"market cap {card.get('mcap')}, industry {card.get('industry')}."
+        )
+    return "\n".join(parts) if parts else None
+
+
+async def _answer_from_session(message: str, session: dict, eli5_mode: bool):
+    """Answer a follow-up from the stored session; skips the classifier and Finnhub."""
+    context = _build_session_context(session)
+    if not context:
+        return None
+    ai_prompt = f"Context from earlier conversation: {context}\n\nUser asks: {message}"
+    ai_response = await run_blocking(get_chat_response, ai_prompt, history=None)
+    if eli5_mode:
+        ai_response = await run_blocking(simplify_for_eli5, ai_response)
+    return {
+        "response": ai_response,
+        "source": "ai100_session",
+        "ticker": session.get("ticker"),
+        "stock_data": session.get("stock_card"),
+    }
+
+
 @router.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     message = request.message.strip()
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
+    conversation_id = request.conversation_id or uuid.uuid4().hex
+    session = conversation_store.get(conversation_id)
+
+    # A known conversation uses the stored history; the client's copy only seeds
+    # a new or expired session. Without either, ask the client to resend it.
+    if session:
+        history = session["history"]
+    elif request.history is not None:
+        history = [m.model_dump() if hasattr(m, 'model_dump') else m.dict() for m in request.history]
+        conversation_store.update(conversation_id, history=history)
+    elif request.conversation_id:
+        raise HTTPException(status_code=409, detail=SESSION_EXPIRED_DETAIL)
+    else:
+        history = []
+
     if is_simple_greeting(message):
-        return {"response": build_greeting_response(), "source": "local_greeting", "stock_data": None}
+        response = build_greeting_response()
+        conversation_store.append_turn(conversation_id, message, response)
+        return {"response": response, "source": "local_greeting", "stock_data": None,
+                "conversation_id": conversation_id}
 
-    history = [m.model_dump() if hasattr(m, 'model_dump') else m.dict() for m in request.history] if request.history else []
-    
+    result = None
+    eli5_mode = request.eli5 or should_simplify(message, False)
+    if (
+        session
+        and not request.include_news
+        and (not request.ticker or request.ticker == session.get("ticker"))
+        and is_contextual_followup(message)
+    ):
+        result = await _answer_from_session(message, session, eli5_mode)
+
+    if result is None:
+        result = await _chat_turn(request, message, history, conversation_id, session)
+
+    conversation_store.append_turn(conversation_id, message, result.get("response") or "")
+    result["conversation_id"] = conversation_id
+    return result
+
+
+async def _chat_turn(request: ChatRequest, message: str, history: list, conversation_id: str, session: Optional[dict]):
     # 1. Classify intent via the new AI Prompt Router
-    resolution = classify_and_resolve_prompt(message, history)
+    resolution = await run_blocking(classify_and_resolve_prompt, message, history)
     
     # 2. Merge frontend overrides with router outputs
     # If the user explicitly clicked the "news" button or asked for news, we honor it regardless of the classifier.
@@ -273,58 +372,71 @@ async def chat_endpoint(request: ChatRequest):
     stock_info = None
     if ticker:
         # Standardize the UI rendering for any valid stock
-        stock_info = fetch_standard_stock_card_data(ticker)
+        stock_info = await run_blocking(fetch_standard_stock_card_data, ticker)
+        session_fields = {"ticker": ticker, "stock_card": stock_info}
+        if not session or session.get("ticker") != ticker:
+            session_fields["news_items"] = []
+        conversation_store.update(conversation_id, **session_fields)
 
     if intent == "FINANCIAL_NEWS":
         try:
             if ticker:
                 to_date = datetime.date.today().isoformat()
                 from_date = (datetime.date.today() - datetime.timedelta(days=7)).isoformat()
-                news_items = news_processor.fetch_and_process_news(ticker=ticker, from_date=from_date, to_date=to_date)
+                news_items = await run_blocking(
+                    news_processor.fetch_and_process_news, ticker=ticker, from_date=from_date, to_date=to_date
+                )
             else:
-                news_items = news_processor.fetch_and_process_news(ticker=None)
+                news_items = await run_blocking(news_processor.fetch_and_process_news, ticker=None)
+            conversation_store.update(conversation_id, news_items=news_items or [])
 
             if not news_items:
                 ticker_label = f"for {ticker}" if ticker else ""
                 fallback = f"I couldn't find fresh news {ticker_label} right now. Please try again in a minute."
                 return {"response": fallback, "source": "finnhub_news", "ticker": ticker, "stock_data": stock_info}
 
-            agg_summary = generate_aggregated_summary(news_items, ticker)
+            agg_summary = await run_blocking(generate_aggregated_summary, news_items, ticker)
             response = _build_news_response(news_items, ticker, agg_summary)
             
             if request.improve_summary:
-                response = improve_news_summary(response, ticker or "Market")
+                response = await run_blocking(improve_news_summary, response, ticker or "Market")
             if eli5_mode:
-                response = simplify_for_eli5(response)
+                response = await run_blocking(simplify_for_eli5, response)
 
             return {"response": response, "source": "finnhub_news", "ticker": ticker, "stock_data": stock_info}
         except Exception as e:
             print(f"News summary fetch failed (ticker={ticker}): {e}")
             # fallback to generalized chat
-            ai_response = get_chat_response(message, history=request.history)
+            ai_response = await run_blocking(get_chat_response, message, history=history)
             if eli5_mode:
-                ai_response = simplify_for_eli5(ai_response)
+                ai_response = await run_blocking(simplify_for_eli5, ai_response)
             return {"response": ai_response, "source": "ai100", "stock_data": stock_info}
 
     elif intent == "LIVE_DATA_OVERVIEW" and ticker:
         try:
-            quote = get_finnhub_quote(ticker)
-            metrics_data = get_finnhub_metric(ticker)
+            quote, metrics_data = await asyncio.gather(
+                run_blocking(get_finnhub_quote, ticker),
+                run_blocking(get_finnhub_metric, ticker),
+            )
             metrics = metrics_data.get("metric", {})
 
             try:
                 to_date = datetime.date.today().isoformat()
                 from_date = (datetime.date.today() - datetime.timedelta(days=14)).isoformat()
-                news_items = news_processor.fetch_and_process_news(ticker=ticker, from_date=from_date, to_date=to_date)
+                news_items = await run_blocking(
+                    news_processor.fetch_and_process_news, ticker=ticker, from_date=from_date, to_date=to_date
+                )
             except Exception as news_err:
                 print(f"Error fetching news for report: {news_err}")
                 news_items = []
+            if news_items:
+                conversation_store.update(conversation_id, news_items=news_items)
 
             name = stock_info.get("name") if stock_info else ticker
-            ai_report = generate_stock_report(name, ticker, quote, metrics, news_items)
+            ai_report = await run_blocking(generate_stock_report, name, ticker, quote, metrics, news_items)
 
             if eli5_mode:
-                ai_report = simplify_for_eli5(ai_report)
+                ai_report = await run_blocking(simplify_for_eli5, ai_report)
                 
             return {
                 "response": ai_report, 
@@ -334,21 +446,21 @@ async def chat_endpoint(request: ChatRequest):
             }
         except Exception as e:
             print(f"Finnhub lookup failed for {ticker}: {e}")
-            ai_response = get_chat_response(message, history=request.history)
+            ai_response = await run_blocking(get_chat_response, message, history=history)
             if eli5_mode:
-                ai_response = simplify_for_eli5(ai_response)
+                ai_response = await run_blocking(simplify_for_eli5, ai_response)
             return {"response": ai_response, "source": "ai100", "stock_data": stock_info}
 
     elif intent == "CONTEXTUAL_FOLLOWUP" and resolution.contextual_reference:
         ai_prompt = f"Context from earlier conversation: {resolution.contextual_reference}\n\nUser asks: {message}"
-        ai_response = get_chat_response(ai_prompt, history=None) # We embed the context directly
+        ai_response = await run_blocking(get_chat_response, ai_prompt, history=None) # We embed the context directly
         if eli5_mode:
-            ai_response = simplify_for_eli5(ai_response)
+            ai_response = await run_blocking(simplify_for_eli5, ai_response)
         return {"response": ai_response, "source": "ai100_context", "stock_data": stock_info}
         
     else:
         # Default AI chat for General EXPLANATION_ANALYSIS or fallback
-        ai_response = get_chat_response(message, history=request.history)
+        ai_response = await run_blocking(get_chat_response, message, history=history)
         if eli5_mode:
-            ai_response = simplify_for_eli5(ai_response)
+            ai_response = await run_blocking(simplify_for_eli5, ai_response)
         return {"response": ai_response, "source": "ai100", "stock_data": stock_info}
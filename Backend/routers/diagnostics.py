@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+
+from services.bar_cache import bar_cache
+from services.loop_diagnostics import loop_diagnostics_snapshot
+from services import notification_bus
+from services.notification_worker import worker_state
+from services.td_scheduler import budget_state
+
+router = APIRouter(prefix="/debug", tags=["Diagnostics"])
+
+
+@router.get("/loop")
+async def event_loop_diagnostics():
+    """Event-loop lag percentiles and recent stalls attributed to route/service."""
+    return loop_diagnostics_snapshot()
+
+
+@router.get("/bar-cache")
+async def bar_cache_stats():
+    """In-memory bar cache size, hit ratio and evictions."""
+    return bar_cache.stats()
+
+
+@router.get("/td-budget")
+async def twelvedata_budget():
+    """TwelveData credits used/remaining this minute and day, and deferred refreshes."""
+    return budget_state()
+
+
+@router.get("/notifications")
+async def notification_worker_state():
+    """Background notification worker (last run, next trigger) and stream subscribers."""
+    return {**worker_state(), "stream": notification_bus.stats()}
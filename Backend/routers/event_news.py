@@ -2,7 +2,8 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
 
-from services.event_news_service import get_or_fetch_event_news
+from services.blocking_io import run_blocking
+from services.event_news_service import get_event_news
 from services.supabase_client import SupabaseClient
 
 router = APIRouter()
@@ -16,7 +17,8 @@ async def get_event_news_for_chart(
     force_refresh: bool = False,
 ):
     """
-    Lazy pipeline: check `stock_event_news` per date, then Finnhub only for cache misses.
+    Lazy pipeline: in-process rows (often prefetched by /history), then one bulk read of
+    `stock_event_news`, then Finnhub only for cache misses (one request per cluster of nearby dates).
     Separate from `/news/{ticker}` summarization cache.
     """
     t = (ticker or "").strip().upper()
@@ -27,6 +29,6 @@ async def get_event_news_for_chart(
         return []
 
     try:
-        return get_or_fetch_event_news(_supabase, t, cleaned, force_refresh=force_refresh)
+        return await run_blocking(get_event_news, _supabase, t, cleaned, force_refresh=force_refresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
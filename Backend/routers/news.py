@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Query, HTTPException
 from services.news_processor import NewsProcessor
+from services.blocking_io import run_blocking
 from typing import List, Optional
 import datetime
 
@@ -24,7 +25,9 @@ async def get_company_news_summary(
         from_date = (datetime.date.today() - datetime.timedelta(days=7)).isoformat()
         
     try:
-        news = news_processor.fetch_and_process_news(ticker, from_date, to_date, force_refresh=force_refresh)
+        news = await run_blocking(
+            news_processor.fetch_and_process_news, ticker, from_date, to_date, force_refresh=force_refresh
+        )
         return news
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -35,7 +38,7 @@ async def get_market_news_summary(force_refresh: bool = False):
     Get summarized general market news (trending).
     """
     try:
-        news = news_processor.fetch_and_process_news(ticker=None, force_refresh=force_refresh)
+        news = await run_blocking(news_processor.fetch_and_process_news, ticker=None, force_refresh=force_refresh)
         return news
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -50,7 +53,7 @@ async def get_similar_news(
     """
     try:
         # 1. Get the source article to retrieve its embedding
-        article = news_processor.supabase.get_article_by_hash(url_hash)
+        article = await run_blocking(news_processor.supabase.get_article_by_hash, url_hash)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
         
@@ -62,13 +65,14 @@ async def get_similar_news(
             summary = article.get('summary', '')
             headline = article.get('headline', '')
             text_to_embed = f"{headline} {summary}"
-            embedding = get_embedding(text_to_embed)
+            embedding = await run_blocking(get_embedding, text_to_embed)
 
             # Save it back to DB for future use
-            news_processor.supabase.save_embedding(url_hash, embedding)
+            await run_blocking(news_processor.supabase.save_embedding, url_hash, embedding)
 
         # Search for similar articles
-        similar_articles = news_processor.supabase.search_similar_articles(
+        similar_articles = await run_blocking(
+            news_processor.supabase.search_similar_articles,
             query_embedding=embedding,
             match_threshold=0.5,
             match_count=limit + 1
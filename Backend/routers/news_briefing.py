@@ -18,6 +18,7 @@ from database import (
     news_article_already_sent, save_news_article_sent,
 )
 from services.ai100_client import summarize_only
+from services.notification_service import publish_notifications
 import pytz
 import json
 import hashlib
@@ -129,6 +130,7 @@ def _generate_briefing_for_symbol(symbol: str) -> Optional[dict]:
         "articles": articles_json,
     }
     save_generated_notification(n)
+    publish_notifications([n])
     try:
         if send_notification_email:
             send_notification_email(n)
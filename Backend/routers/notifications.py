@@ -1,83 +1,85 @@
-from fastapi import APIRouter
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from services.notification_service import generate_all_notifications
+from services import notification_bus
+from services.notification_service import ET, alert_notification, get_today_notifications
 from database import (
     dismiss_notification,
     get_dismissed_notification_ids,
-    get_all_alerts,
+    get_unread_alerts,
     mark_alert_read,
-    get_all_reminders,
+    row_cursor,
+    clear_all_notifications,
 )
 
 router = APIRouter()
 
-
-def _alerts_as_notifications(dismissed_ids: set) -> list:
+# Response headers carrying the cursors for the next poll. Market notifications
+# (created_at) and alerts (triggered_at) are written independently, so each
+# list has its own cursor: a shared one could skip a notification committed
+# after a newer alert was returned.
+CURSOR_HEADER = "X-Notifications-Cursor"
+ALERTS_CURSOR_HEADER = "X-Alerts-Cursor"
+# The bus's newest event id when the panel was read: pass it as the stream's
+# last_event_id so notifications published after this read are replayed.
+EVENT_ID_HEADER = "X-Notifications-Event-Id"
+# Default and maximum rows per list (alerts and market notifications each)
+PAGE_SIZE = int(os.getenv("NOTIFICATIONS_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = 500
+
+
+def _alerts_as_notifications(alerts: list, dismissed_ids: set) -> list:
     """
     Convert unread, non-dismissed alerts (triggered reminders) into
-    the unified Notification shape so they appear in the panel.
+    the unified Notification shape so they appear in the panel. Rows come
+    from the unread_alert_notifications view, already filtered and joined
+    with their reminder's condition fields; the checks here only cover a
+    dismissal made since the view was read.
     """
-    # Build a lookup of reminder details so we can add context to each alert
-    reminders_by_id = {r["id"]: r for r in get_all_reminders()}
-
-    notifications = []
-    for alert in get_all_alerts():
-        alert_id = f"ALERT_{alert['id']}"
-
-        # Skip if already dismissed through the notification panel
-        if alert_id in dismissed_ids:
-            continue
-
-        # Skip if already read/dismissed via the Reminders page
-        if alert.get("is_read"):
-            continue
-
-        reminder = reminders_by_id.get(alert.get("reminder_id"), {})
-        ticker = alert.get("ticker", "")
-        message = alert.get("message", "")
-        triggered_at = alert.get("triggered_at", "")
-
-        # Build a human-readable title from the reminder condition
-        ctype = reminder.get("condition_type", "")
-        target = reminder.get("target_price")
-        pct = reminder.get("percent_change")
-        if ctype == "price_above" and target:
-            title = f"Price above ${target:.2f}"
-        elif ctype == "price_below" and target:
-            title = f"Price below ${target:.2f}"
-        elif ctype == "percent_change" and pct is not None:
-            title = f"{'▲' if pct > 0 else '▼'} {abs(pct):.1f}% move"
-        elif ctype == "time_based":
-            title = "Scheduled reminder"
-        else:
-            title = "Reminder triggered"
-
-        notifications.append({
-            "id": alert_id,
-            "type": "REMINDER_ALERT",
-            "symbol": ticker,
-            "title": title,
-            "message": message,
-            "direction": "neutral",
-            "percentChange": 0,
-            "timestamp": triggered_at[:16].replace("T", " ") if triggered_at else "",
-        })
-
-    return notifications
+    return [
+        alert_notification(alert, alert)
+        for alert in alerts
+        if f"ALERT_{alert['id']}" not in dismissed_ids and not alert.get("is_read")
+    ]
 
 
 @router.get("/notifications", tags=["Notifications"])
-def get_notifications():
+def get_notifications(
+    response: Response,
+    since: Optional[str] = Query(
+        None, description="Only market notifications created after this cursor (the previous "
+                          f"response's {CURSOR_HEADER} header)"),
+    alerts_since: Optional[str] = Query(
+        None, description="Only alerts triggered after this cursor (the previous response's "
+                          f"{ALERTS_CURSOR_HEADER} header)"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                       description="Newest alerts and market notifications to return (each)"),
+):
+    """
+    Read-only: market notifications are generated by the background worker
+    (services.notification_worker), so a poll never fetches bars or sends email.
+    """
+    # Taken before the reads: anything published while they run is replayed, not lost
+    response.headers[EVENT_ID_HEADER] = notification_bus.last_id()
     dismissed_ids = get_dismissed_notification_ids()
 
-    # All market-move / news-briefing notifications
-    market_notifications = [
-        n for n in generate_all_notifications()
-        if n["id"] not in dismissed_ids
-    ]
+    # Today's market-move / news-briefing notifications
+    generated, cursor = get_today_notifications(since, limit)
+    market_notifications = [n for n in generated if n["id"] not in dismissed_ids]
 
     # Triggered reminder alerts merged in
-    alert_notifications = _alerts_as_notifications(dismissed_ids)
+    alerts = get_unread_alerts(alerts_since, limit)
+    alert_notifications = _alerts_as_notifications(alerts, dismissed_ids)
+    alerts_cursor = row_cursor(alerts[0], "triggered_at") if alerts else alerts_since
+
+    if cursor:
+        response.headers[CURSOR_HEADER] = cursor
+    if alerts_cursor:
+        response.headers[ALERTS_CURSOR_HEADER] = alerts_cursor
 
     # Combine and return (alerts first — they are actionable)
     return alert_notifications + market_notifications
@@ -96,22 +98,36 @@ def dismiss(req: DismissRequest):
     if nid.startswith("ALERT_"):
         alert_id = nid[len("ALERT_"):]
         mark_alert_read(alert_id)
+    # Other open panels drop it too
+    notification_bus.publish("dismiss", {"id": nid})
     return {"message": "Notification dismissed"}
 
 
 @router.post("/notifications/clear-all", tags=["Notifications"])
 def clear_all():
-    dismissed_ids = get_dismissed_notification_ids()
-
-    # Dismiss all market notifications
-    for n in generate_all_notifications():
-        if n["id"] not in dismissed_ids:
-            dismiss_notification(n["id"])
+    # Dismiss today's market notifications and read + dismiss all unread alerts in one statement
+    clear_all_notifications(datetime.now(ET).strftime("%Y-%m-%d"))
+    notification_bus.publish("clear", {})
+    return {"message": "All notifications cleared"}
 
-    # Mark all unread alerts as read too
-    for alert in get_all_alerts():
-        if not alert.get("is_read"):
-            mark_alert_read(alert["id"])
-            dismiss_notification(f"ALERT_{alert['id']}")
 
-    return {"message": "All notifications cleared"}
+@router.get("/notifications/stream", tags=["Notifications"])
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    since_event_id: Optional[str] = Query(
+        None, alias="last_event_id",
+        description=f"Replay events after this id (the panel load's {EVENT_ID_HEADER} header); "
+                    "the Last-Event-ID header of a reconnect takes precedence"),
+):
+    """
+    Server-sent events: `notification` (new panel item), `dismiss`, `clear` and
+    `reset` (reload with GET /notifications). Load the panel once with GET, then
+    connect here with its event id; on reconnect EventSource sends Last-Event-ID
+    and missed events are replayed.
+    """
+    return StreamingResponse(
+        notification_bus.sse_stream(last_event_id or since_event_id),
+        media_type="text/event-stream",
+        # No proxy buffering or caching of the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
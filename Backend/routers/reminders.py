@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import Optional
 from services.reminder_parser import parse_reminder
 from services.finnhub_client import get_finnhub_quote
+from services.blocking_io import run_blocking
 
 router = APIRouter()
 
@@ -90,7 +91,7 @@ async def parse_reminder_text(request: ReminderRequest):
         raise HTTPException(status_code=400, detail="Reminder text cannot be empty")
 
     try:
-        parsed = parse_reminder(request.text)
+        parsed = await run_blocking(parse_reminder, request.text)
 
         ticker = parsed.get("ticker")
         current_price = None
@@ -103,7 +104,7 @@ async def parse_reminder_text(request: ReminderRequest):
 
         if ticker and parsed.get("condition_type") == "percent_change":
             try:
-                quote = get_finnhub_quote(ticker)
+                quote = await run_blocking(get_finnhub_quote, ticker)
                 current_price = quote.get("c")
             except Exception as e:
                 print(f"Could not fetch price for {ticker}: {e}")
@@ -143,7 +144,7 @@ async def save_reminder(request: SaveReminderRequest):
             payload.get("current_price"),
             payload.get("percent_change"),
         )
-    row = create_reminder(payload)
+    row = await run_blocking(create_reminder, payload)
     # Fire-and-forget: check condition instantly without blocking the response
     asyncio.create_task(check_single_reminder(row))
     return SavedReminder(**row)
@@ -153,14 +154,14 @@ async def save_reminder(request: SaveReminderRequest):
 async def list_reminders():
     """Return all reminders, newest first."""
     from database import get_all_reminders
-    return [SavedReminder(**r) for r in get_all_reminders()]
+    return [SavedReminder(**r) for r in await run_blocking(get_all_reminders)]
 
 
 @router.get("/reminders/{reminder_id}", response_model=SavedReminder)
 async def get_reminder(reminder_id: str):
     """Fetch a single reminder by ID."""
     from database import get_reminder_by_id
-    row = get_reminder_by_id(reminder_id)
+    row = await run_blocking(get_reminder_by_id, reminder_id)
     if not row:
         raise HTTPException(status_code=404, detail="Reminder not found")
     return SavedReminder(**row)
@@ -173,7 +174,7 @@ async def update_status(reminder_id: str, body: ReminderStatusUpdate):
     VALID_STATUSES = {"active", "triggered", "expired", "cancelled"}
     if body.status not in VALID_STATUSES:
         raise HTTPException(status_code=400, detail=f"Invalid status: {body.status}")
-    row = update_reminder_status(reminder_id, body.status)
+    row = await run_blocking(update_reminder_status, reminder_id, body.status)
     if not row:
         raise HTTPException(status_code=404, detail="Reminder not found")
     return SavedReminder(**row)
@@ -183,7 +184,7 @@ async def update_status(reminder_id: str, body: ReminderStatusUpdate):
 async def remove_reminder(reminder_id: str):
     """Hard-delete a reminder."""
     from database import delete_reminder
-    deleted = delete_reminder(reminder_id)
+    deleted = await run_blocking(delete_reminder, reminder_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Reminder not found")
 
@@ -194,7 +195,7 @@ async def remove_reminder(reminder_id: str):
 async def list_alerts():
     """Return all alerts, newest first."""
     from database import get_all_alerts
-    rows = get_all_alerts()
+    rows = await run_blocking(get_all_alerts)
     return [AlertResponse(**{**r, "is_read": bool(r["is_read"])}) for r in rows]
 
 
@@ -202,7 +203,7 @@ async def list_alerts():
 async def read_alert(alert_id: str):
     """Mark an alert as read."""
     from database import mark_alert_read
-    row = mark_alert_read(alert_id)
+    row = await run_blocking(mark_alert_read, alert_id)
     if not row:
         raise HTTPException(status_code=404, detail="Alert not found")
     return AlertResponse(**{**row, "is_read": bool(row["is_read"])})
@@ -212,6 +213,6 @@ async def read_alert(alert_id: str):
 async def delete_alert(alert_id: str):
     """Dismiss (hard-delete) an alert."""
     from database import dismiss_alert
-    deleted = dismiss_alert(alert_id)
+    deleted = await run_blocking(dismiss_alert, alert_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -1,6 +1,6 @@
-import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
+from services.blocking_io import run_blocking
 from services.financial_data_service import FinancialDataService
 from services.sentiment_engine import SentimentEngine
 
@@ -25,7 +25,8 @@ async def ingest_financial_data(
         raise HTTPException(status_code=400, detail="period_type must be 'quarterly' or 'annual'")
 
     try:
-        result = financial_data_service.ingest_ticker(
+        result = await run_blocking(
+            financial_data_service.ingest_ticker,
             ticker=ticker,
             period_type=period_type,
             num_periods=num_periods,
@@ -55,7 +56,9 @@ async def get_financial_data(
         raise HTTPException(status_code=400, detail="period_type must be 'quarterly' or 'annual'")
 
     try:
-        data = financial_data_service.get_ticker_data(ticker=ticker, period_type=period_type, limit=limit)
+        data = await run_blocking(
+            financial_data_service.get_ticker_data, ticker=ticker, period_type=period_type, limit=limit
+        )
         return {"ticker": ticker, "count": len(data), "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -73,7 +76,9 @@ async def get_llm_input(
     ticker = ticker.upper()
 
     try:
-        llm_input = financial_data_service.get_latest_llm_input(ticker=ticker, period_type=period_type)
+        llm_input = await run_blocking(
+            financial_data_service.get_latest_llm_input, ticker=ticker, period_type=period_type
+        )
         if not llm_input:
             raise HTTPException(
                 status_code=404,
@@ -97,8 +102,8 @@ async def get_sentiment_report(
     Runs financial ingestion, news sentiment scoring, and LLM qualitative analysis.
     Reports are cached in Supabase for 24 hours unless force_refresh=true.
 
-    All blocking I/O (Finnhub API calls, LLM call) runs in a thread pool via
-    asyncio.to_thread so the event loop is never blocked.
+    All blocking I/O (Finnhub API calls, LLM call) runs on the bounded
+    blocking-I/O pool via run_blocking so the event loop is never blocked.
     """
     ticker = ticker.upper()
     valid_horizons = {"1D", "1W", "1M", "3M", "6M"}
@@ -106,7 +111,7 @@ async def get_sentiment_report(
         raise HTTPException(status_code=400, detail=f"horizon must be one of {sorted(valid_horizons)}")
 
     try:
-        report = await asyncio.to_thread(
+        report = await run_blocking(
             sentiment_engine.generate_report,
             ticker,
             horizon,
@@ -1,18 +1,108 @@
-from fastapi import APIRouter
-from services.chart_events import compute_price_events
-from services.history_loader import load_chart_history_records
+import json
+import math
+import os
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from services.adaptive_events import adaptive_events
+from services.chart_series import ChartSeries
+from services.event_index import chart_events
+from services.event_news_service import prefetch_event_news, resolved_event_news
+from services.history_loader import load_chart_history
+from services.supabase_client import SupabaseClient
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
 
 router = APIRouter()
+_supabase = SupabaseClient()
+
+# Resolve news for a chart's event dates in the background while the chart renders
+PREFETCH_EVENT_NEWS = os.getenv("HISTORY_PREFETCH_EVENT_NEWS", "1") == "1"
+# include=event_news waits at most this long; later rows come from /event-news
+EVENT_NEWS_WAIT_S = float(os.getenv("HISTORY_EVENT_NEWS_WAIT_S", "1.5"))
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _json_safe(value: Any) -> Any:
+    """Plain Python values with NaN/inf as None, which is what orjson writes (null)."""
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+def encode_json(payload: dict[str, Any]) -> bytes:
+    """orjson when available (serializes NumPy arrays natively), else the stdlib; same body either way."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_json_safe(payload), separators=(",", ":"), allow_nan=False).encode()
+
+
+def history_events(series: ChartSeries, timeframe: str, mode: str = "fixed") -> list[dict[str, Any]]:
+    """Chart event markers from every bar, so downsampling never hides a marker's move."""
+    if mode == "adaptive":
+        return adaptive_events(series, timeframe)
+    return chart_events(series, timeframe)
+
+
+def encode_history(series: ChartSeries, timeframe: str, fmt: str = "records",
+                   points: Optional[int] = None, events: Optional[list[dict[str, Any]]] = None,
+                   extra: Optional[dict[str, Any]] = None) -> tuple[bytes, str]:
+    """Response body and media type for one chart in the requested format."""
+    shown = series.downsample(points)
+    if events is None:
+        events = history_events(series, timeframe)
+    extra = extra or {}
+
+    if fmt == "records":
+        payload = {"symbol": series.symbol, "data": shown.records(), "events": events, **extra}
+        return encode_json(payload), "application/json"
+    if fmt == "columnar":
+        payload = {"symbol": series.symbol, "time_key": shown.time_key, **shown.columnar(), "events": events, **extra}
+        return encode_json(payload), "application/json"
+    metadata = {"symbol": series.symbol, "time_key": shown.time_key, "events": json.dumps(_json_safe(events)),
+                **{k: json.dumps(_json_safe(v)) for k, v in extra.items()}}
+    return shown.to_arrow_ipc(metadata), ARROW_MEDIA_TYPE
 
 
 @router.get("/history/{symbol}", tags=["Stock Data"])
-def get_history(symbol: str, timeframe: str = "1D"):
+def get_history(
+    symbol: str,
+    timeframe: str = "1D",
+    points: Optional[int] = Query(None, ge=3, le=10000, description="Downsample to at most this many bars (LTTB)"),
+    format: Literal["records", "columnar", "arrow"] = Query(
+        "records", description="records: one object per bar; columnar: parallel t/o/h/l/c/v arrays; "
+                               "arrow: Arrow IPC stream with events in the schema metadata"),
+    events: Literal["fixed", "adaptive"] = Query(
+        "fixed", description="fixed: per-timeframe % floor; adaptive: z-score against the symbol's EWMA volatility "
+                             "(single-bar moves, 5-bar runs and session gaps)"),
+    include: Optional[Literal["event_news"]] = Query(
+        None, description="event_news: embed news for the event dates that resolve within a short wait"),
+):
     """
     timeframe: 1D, 5D, 1M, 3M, 1Y, 5Y
     """
     symbol = symbol.upper()
-    data = load_chart_history_records(symbol, timeframe)
-    if not data:
-        return {"symbol": symbol, "data": [], "events": []}
-    events = compute_price_events(data, timeframe)
-    return {"symbol": symbol, "data": data, "events": events}
+    series = load_chart_history(symbol, timeframe) or ChartSeries.empty(symbol)
+    markers = history_events(series, timeframe, events)
+    extra = None
+    if markers and (PREFETCH_EVENT_NEWS or include == "event_news"):
+        # The chart's follow-up /event-news call then reads memory or joins these lookups
+        futures = prefetch_event_news(_supabase, symbol, [e["event_date"] for e in markers])
+        if include == "event_news":
+            extra = {"event_news": resolved_event_news(futures, EVENT_NEWS_WAIT_S)}
+    try:
+        body, media_type = encode_history(series, timeframe, format, points, markers, extra)
+    except ImportError:
+        raise HTTPException(status_code=406, detail="format=arrow needs pyarrow on the server")
+    return Response(body, media_type=media_type)
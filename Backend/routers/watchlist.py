@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from database import add_to_watchlist, remove_from_watchlist, get_watchlist
 from services.finnhub_client import get_finnhub_quote
+from services.notification_worker import request_run as request_notification_run
 
 router = APIRouter()
 
@@ -34,6 +35,8 @@ def read_watchlist():
 @router.post("/watchlist", tags=["Watchlist"])
 def add_item(item: WatchlistItem):
     add_to_watchlist(item.symbol, item.name)
+    # Today's EOD / gap notifications still apply to a stock added after their trigger
+    request_notification_run()
     return {"message": "Added to watchlist"}
 
 @router.delete("/watchlist/{symbol}", tags=["Watchlist"])
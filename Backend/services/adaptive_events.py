@@ -0,0 +1,223 @@
+"""
+Volatility-normalized chart events (GET /history?events=adaptive).
+
+The fixed `_FLOOR_PCT` floors in chart_events treat every symbol alike. Here
+each move is scored as a z-score against the symbol's own recent volatility:
+an EWMA of squared returns (RiskMetrics style, alpha = 2 / (span + 1)), read
+before the bar it scores so a spike never dampens itself.
+
+Three kinds of move are scored per bar and the strongest one is kept:
+
+  move   one bar: close / previous close (intraday session opens use
+         close / open so the overnight jump is not counted twice)
+  run    RUN_BARS bars within one session, against sqrt(RUN_BARS) x the
+         volatility at the start of the run
+  gap    a session's open against the previous close, scored against a
+         separate EWMA of gaps (every bar for daily/weekly charts)
+
+Scores are kept per symbol and bar table, following the bar cache's
+(series_id, version) token: when bars are appended only the new bars (and
+the revised last one) are scored, from the stored EWMA state. The 5Y weekly
+view is short and is scored directly.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.bar_cache import bar_cache
+from services.chart_events import _MAX_EVENTS, pick_daily_peaks
+from services.chart_series import DEFAULT_TIMEFRAME, TIMEFRAMES, ChartSeries
+from services.event_index import _event_id
+from services.stock_manager import _table_and_interval
+
+EWMA_SPAN = max(2, int(os.getenv("ADAPTIVE_EVENT_SPAN", "30")))
+MIN_Z = float(os.getenv("ADAPTIVE_EVENT_Z", "4.0"))
+RUN_BARS = 5
+_ALPHA = 2.0 / (EWMA_SPAN + 1)
+_WARMUP = 20       # returns before a move or run is scored
+_GAP_WARMUP = 5    # sessions before a gap is scored
+_DAY = 86400
+
+KINDS = ("move", "run", "gap")
+_KIND_BARS = (1, RUN_BARS, 1)
+
+# Per-bar arrays kept for every scored bar
+_FIELDS = ("ts", "time", "close", "var", "gap_var", "n", "gap_n", "z", "kind", "pct")
+
+
+def _ewma(values: np.ndarray, seed: float) -> np.ndarray:
+    """EWMA after each value, continuing from `seed` (NaN: start at the first value); NaNs carry forward."""
+    smoothed = pd.Series(np.r_[seed, values]).ewm(alpha=_ALPHA, adjust=False, ignore_na=True).mean()
+    return smoothed.to_numpy()[1:]
+
+
+def _score(cols: dict[str, np.ndarray], intraday: bool, context: Optional[dict[str, np.ndarray]] = None,
+           ) -> dict[str, np.ndarray]:
+    """
+    Score the rows of `cols` after the first len(context["ts"]) rows, which
+    were scored before (their state seeds the EWMAs and backs the runs).
+    """
+    c = len(context["ts"]) if context else 0
+    ts, open_, close = cols["ts"], cols["open"], cols["close"]
+    day = ts // _DAY
+    prev_close = np.r_[np.nan, close[:-1]]
+    session_open = np.ones(len(ts), dtype=bool)
+    if intraday:
+        session_open[1:] = day[1:] != day[:-1]
+    base = np.where(session_open & intraday, open_, prev_close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.where(base > 0, close / base - 1.0, np.nan)
+        gap = np.where(session_open & (prev_close > 0), open_ / prev_close - 1.0, np.nan)
+    ret, gap = ret[c:], gap[c:]
+
+    def last(name, default):
+        return context[name][-1] if c else default
+
+    var = _ewma(ret ** 2, last("var", np.nan))
+    gap_var = _ewma(gap ** 2, last("gap_var", np.nan))
+    n = last("n", 0) + np.cumsum(np.isfinite(ret))
+    gap_n = last("gap_n", 0) + np.cumsum(np.isfinite(gap))
+    var_before = np.r_[last("var", np.nan), var[:-1]]
+    gap_var_before = np.r_[last("gap_var", np.nan), gap_var[:-1]]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_move = np.where((n - np.isfinite(ret) >= _WARMUP) & (var_before > 0),
+                          ret / np.sqrt(var_before), np.nan)
+        z_gap = np.where((gap_n - np.isfinite(gap) >= _GAP_WARMUP) & (gap_var_before > 0),
+                         gap / np.sqrt(gap_var_before), np.nan)
+
+        # Runs: close over the close RUN_BARS back, within one session, against the volatility back then
+        run = np.full(len(ret), np.nan)
+        z_run = np.full(len(ret), np.nan)
+        rows = np.arange(c, len(ts))
+        start = rows - RUN_BARS
+        ok = start >= 0
+        if ok.any():
+            all_var = np.r_[context["var"], var] if c else var
+            all_n = np.r_[context["n"], n] if c else n
+            s, r = start[ok], rows[ok]
+            same_session = ~intraday | (day[s] == day[r])
+            run_ret = np.where(close[s] > 0, close[r] / close[s] - 1.0, np.nan)
+            vol = np.sqrt(all_var[s] * RUN_BARS)
+            run[ok] = run_ret
+            z_run[ok] = np.where(same_session & (all_n[s] >= _WARMUP) & (vol > 0), run_ret / vol, np.nan)
+
+    z_all = np.vstack([z_move, z_run, z_gap])
+    strength = np.nan_to_num(np.abs(z_all), nan=-1.0)
+    kind = strength.argmax(axis=0)
+    pick = np.arange(len(kind))
+    z = z_all[kind, pick]
+    pct = np.vstack([ret, run, gap])[kind, pick] * 100.0
+    return {
+        "ts": ts[c:], "time": cols["time"][c:], "close": close[c:],
+        "var": var, "gap_var": gap_var, "n": n, "gap_n": gap_n,
+        "z": z, "kind": kind.astype(np.int8), "pct": pct,
+    }
+
+
+class _Scores:
+    def __init__(self, token: tuple[int, int], bars: dict[str, np.ndarray]):
+        self.token = token
+        self.bars = bars
+
+
+_scores: dict[tuple[str, str], _Scores] = {}
+_scores_lock = threading.Lock()
+
+
+def _cached_scores(table: str, symbol: str) -> Optional[dict[str, np.ndarray]]:
+    """Scores for every cached bar of the symbol, scoring only bars added since the last call."""
+    intraday = table != "bars_1d"
+    with _scores_lock:
+        state = _scores.get((table, symbol))
+    if state is not None and len(state.bars["ts"]) > 1:
+        bars = state.bars
+        last = len(bars["ts"]) - 1
+        first = max(0, last - RUN_BARS)
+        tail = bar_cache.columns(table, symbol, start_ts=int(bars["ts"][first]))
+        if tail is None:
+            return None
+        token, cols = tail
+        if token == state.token:
+            return bars
+        known = last - first
+        if token[0] == state.token[0] and np.array_equal(cols["ts"][:known], bars["ts"][first:last]):
+            # Same series, bars appended or the last one revised: continue the EWMAs from the bar before it
+            context = {name: values[first:last] for name, values in bars.items()}
+            fresh = _score(cols, intraday, context)
+            bars = {name: np.concatenate([values[:last], fresh[name]]) for name, values in bars.items()}
+            with _scores_lock:
+                _scores[(table, symbol)] = _Scores(token, bars)
+            return bars
+    full = bar_cache.columns(table, symbol)
+    if full is None:
+        return None
+    token, cols = full
+    bars = _score(cols, intraday)
+    with _scores_lock:
+        _scores[(table, symbol)] = _Scores(token, bars)
+    return bars
+
+
+def _series_columns(series: ChartSeries) -> dict[str, np.ndarray]:
+    ts = np.asarray(series.time.astype(str), dtype="datetime64[s]").astype(np.int64)
+    return {"ts": ts, "time": series.time, "open": series.columns["open"], "close": series.columns["close"]}
+
+
+def adaptive_events(series: ChartSeries, timeframe: str) -> list[dict[str, Any]]:
+    """
+    Events for a chart like compute_price_events (one per calendar day, at
+    most _MAX_EVENTS, in time order) but picked by |z| >= ADAPTIVE_EVENT_Z.
+    Each event also carries its z_score, kind (move/run/gap) and bar count,
+    and the same `<symbol>:<interval>:<bar time>` id as chart_events.
+    """
+    if len(series) < 2:
+        return []
+    interval, _ = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
+    table, _ = _table_and_interval(interval)
+    bars = None if timeframe == "5Y" else _cached_scores(table, series.symbol)
+    if bars is None:
+        # Weekly view, or bars not in the cache: score the chart itself
+        bars = _score(_series_columns(series), series.time_key == "datetime")
+    else:
+        times = bars["time"]
+        lo = int(np.searchsorted(times, series.time[0], side="left"))
+        hi = int(np.searchsorted(times, series.time[-1], side="right"))
+        bars = {name: values[lo:hi] for name, values in bars.items()}
+
+    dates = bars["time"].astype(str).astype("U10")
+    window = np.ones(len(dates), dtype=bool)
+    if timeframe == "1D" and len(dates):
+        window = dates == dates[-1]
+    strength = np.nan_to_num(np.abs(bars["z"]), nan=0.0)
+    picked = pick_daily_peaks(strength, dates, np.flatnonzero(window & (strength >= MIN_Z)), _MAX_EVENTS)
+
+    label = "1week" if timeframe == "5Y" else interval
+    out: list[dict[str, Any]] = []
+    for n, k in enumerate(picked.tolist(), start=1):
+        kind = int(bars["kind"][k])
+        out.append(
+            {
+                "index": n,
+                "label": f"Event {n}",
+                "time": str(bars["time"][k]),
+                "event_date": str(dates[k]),
+                "price": round(float(bars["close"][k]), 4),
+                "pct_change": round(float(bars["pct"][k]), 3),
+                "z_score": round(float(bars["z"][k]), 2),
+                "kind": KINDS[kind],
+                "bars": _KIND_BARS[kind],
+                "id": _event_id(series.symbol, label, str(bars["time"][k])),
+            }
+        )
+    return out
+
+
+def clear() -> None:
+    with _scores_lock:
+        _scores.clear()
@@ -1,9 +1,11 @@
 import os
 import re
 import json
+import logging
 import requests
 from typing import Optional
 from fastapi import HTTPException
+from services.metrics import record_llm_tokens, time_upstream
 
 # Cirrascale AI Suite OpenAI-compatible endpoint
 AI100_BASE_URL = os.getenv("AI100_BASE_URL", "https://aisuite.cirrascale.com/apis/v2")
@@ -15,6 +17,8 @@ AI100_MODEL = os.getenv("AI100_MODEL", "DeepSeek-R1-Distill-Llama-70B")
 # Maximum retries for JSON parsing failures
 MAX_RETRIES = 2
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_AI_UNAVAILABLE_MESSAGE = (
     "I'm having trouble reaching the AI service right now. "
     "Please try again in a moment."
@@ -35,6 +39,28 @@ def is_api_configured() -> bool:
     return bool(AI100_API_KEY)
 
 
+def post_chat_completion(payload: dict, timeout: float = 30) -> tuple[requests.Response, Optional[dict]]:
+    """
+    POST a payload to the chat completions endpoint.
+    Returns the response and, for HTTP 200, its parsed JSON body.
+    Records call latency and the token usage reported by the endpoint.
+    """
+    headers = {
+        "Authorization": f"Bearer {AI100_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    with time_upstream("ai100", "chat/completions") as timer:
+        response = requests.post(f"{AI100_BASE_URL}/chat/completions", json=payload, headers=headers, timeout=timeout)
+        timer.status = response.status_code
+
+    data = None
+    if response.status_code == 200:
+        data = response.json()
+        if isinstance(data, dict):
+            record_llm_tokens(payload.get("model", AI100_MODEL), data.get("usage"))
+    return response, data
+
+
 def chat_completion(
     system_prompt: str,
     user_prompt: str,
@@ -50,11 +76,6 @@ def chat_completion(
     if not AI100_API_KEY:
         return None
 
-    url = f"{AI100_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {AI100_API_KEY}",
-        "Content-Type": "application/json",
-    }
     payload = {
         "model": AI100_MODEL,
         "messages": [
@@ -67,12 +88,11 @@ def chat_completion(
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response, data = post_chat_completion(payload, timeout=30)
         if response.status_code != 200:
             print(f"[AI100] Error {response.status_code}: {response.text[:500]}")
             return None
 
-        data = response.json()
         message = data["choices"][0]["message"]
         content = (message.get("content") or "").strip()
 
@@ -112,11 +132,6 @@ def chat_completion_raw(
     if not AI100_API_KEY:
         return None
 
-    url = f"{AI100_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {AI100_API_KEY}",
-        "Content-Type": "application/json",
-    }
     payload = {
         "model": AI100_MODEL,
         "messages": [
@@ -129,12 +144,11 @@ def chat_completion_raw(
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response, data = post_chat_completion(payload, timeout=30)
         if response.status_code != 200:
             print(f"[AI100] Error {response.status_code}: {response.text[:500]}")
             return None
 
-        data = response.json()
         message = data["choices"][0]["message"]
         content = (message.get("content") or "").strip()
 
@@ -261,15 +275,9 @@ def analyze_text(text: str) -> dict:
     Retries up to MAX_RETRIES times if JSON parsing fails.
     """
     if not AI100_API_KEY:
-        print("⚠️  AI100_API_KEY not set — returning mock response.")
+        logger.debug("AI100_API_KEY not set — returning mock response.")
         return _mock_response(text)
 
-    url = f"{AI100_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {AI100_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     # Build the user prompt with article text (truncated to ~3500 chars to stay within token limits)
     user_prompt = USER_PROMPT_TEMPLATE.format(article_text=text[:3500])
 
@@ -283,49 +291,39 @@ def analyze_text(text: str) -> dict:
         "max_tokens": 600,
     }
 
-    # Log the prompt being sent
-    print("─" * 60)
-    print("📤 AI100 REQUEST")
-    print(f"   Model:  {AI100_MODEL}")
-    print(f"   System: {SYSTEM_PROMPT[:100]}...")
-    print(f"   Article length: {len(text)} chars (truncated to {min(len(text), 3500)})")
-    print("─" * 60)
+    logger.debug("AI100 analyze_text: model=%s, article %d chars (truncated to %d)",
+                 AI100_MODEL, len(text), min(len(text), 3500))
 
     last_error = None
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response, data = post_chat_completion(payload, timeout=30)
 
-            print(f"   Attempt {attempt}/{MAX_RETRIES} — HTTP {response.status_code}")
+            logger.debug("AI100 attempt %d/%d — HTTP %d", attempt, MAX_RETRIES, response.status_code)
 
             if response.status_code != 200:
-                print(f"   ❌ API Error: {response.status_code} — {response.text[:300]}")
+                print(f"[AI100] analyze_text HTTP {response.status_code}: {response.text[:300]}")
                 last_error = f"HTTP {response.status_code}"
                 continue
 
-            data = response.json()
             message = data["choices"][0]["message"]
             raw_content = message.get("content", "") or ""
             finish_reason = data["choices"][0].get("finish_reason", "unknown")
 
-            print(f"   📥 Raw LLM response ({len(raw_content)} chars, finish_reason={finish_reason}):")
-            if raw_content:
-                print(f"   {raw_content[:400]}")
+            logger.debug("AI100 response: %d chars, finish_reason=%s: %s",
+                         len(raw_content), finish_reason, raw_content[:400])
 
             # Handle tool_calls edge case (Llama sometimes routes JSON-like output here)
             if not raw_content and finish_reason == "tool_calls":
                 tool_calls = message.get("tool_calls", [])
-                print(f"   ⚠️  Model returned tool_calls instead of content ({len(tool_calls)} calls)")
+                logger.debug("AI100 returned tool_calls instead of content (%d calls)", len(tool_calls))
                 if tool_calls:
                     # Try to extract useful data from tool call arguments
                     args_str = tool_calls[0].get("function", {}).get("arguments", "{}")
-                    print(f"   Tool call args: {args_str[:200]}")
                     if args_str and args_str != "{}":
                         try:
                             result = json.loads(args_str)
                             result = _validate_and_sanitize(result, text)
-                            print(f"   ✅ Extracted from tool_calls: sentiment={result['sentiment']}")
-                            print("─" * 60)
                             return result
                         except (json.JSONDecodeError, ValueError):
                             pass
@@ -334,15 +332,13 @@ def analyze_text(text: str) -> dict:
 
             if not raw_content:
                 last_error = "Empty content in response"
-                print(f"   ⚠️  Empty content, retrying...")
+                logger.debug("AI100 empty content, retrying")
                 continue
 
             # Try structured text parsing first (SUMMARY: / SENTIMENT: / etc.)
             try:
                 result = _parse_structured_response(raw_content)
                 result = _validate_and_sanitize(result, text)
-                print(f"   ✅ Parsed (structured): sentiment={result['sentiment']}, tone={result['tone']}")
-                print("─" * 60)
                 return result
             except ValueError:
                 pass
@@ -351,31 +347,27 @@ def analyze_text(text: str) -> dict:
             try:
                 result = _try_extract_json(raw_content)
                 result = _validate_and_sanitize(result, text)
-                print(f"   ✅ Parsed (JSON fallback): sentiment={result['sentiment']}, tone={result['tone']}")
-                print("─" * 60)
                 return result
             except ValueError as e:
                 last_error = str(e)
-                print(f"   ⚠️  Attempt {attempt} — could not parse response: {e}")
+                logger.debug("AI100 attempt %d could not parse response: %s", attempt, e)
 
             payload["temperature"] = min(0.5, payload["temperature"] + 0.1)
             continue
 
         except (KeyError, json.JSONDecodeError) as e:
             last_error = str(e)
-            print(f"   ⚠️  Attempt {attempt} error: {e}")
+            logger.debug("AI100 attempt %d error: %s", attempt, e)
             payload["temperature"] = min(0.5, payload["temperature"] + 0.1)
             continue
 
         except requests.RequestException as e:
             last_error = str(e)
-            print(f"   ❌ Network error on attempt {attempt}: {e}")
+            logger.debug("AI100 network error on attempt %d: %s", attempt, e)
             continue
 
     # All retries exhausted
-    print(f"   ❌ All {MAX_RETRIES} attempts failed. Last error: {last_error}")
-    print(f"   Falling back to mock response.")
-    print("─" * 60)
+    print(f"[AI100] analyze_text: all {MAX_RETRIES} attempts failed ({last_error}); using mock response.")
     return _mock_response(text)
 
 
@@ -441,12 +433,6 @@ def summarize_only(text: str) -> str:
     if not AI100_API_KEY:
         return text[:200].strip() + ("..." if len(text) > 200 else "")
 
-    url = f"{AI100_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {AI100_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "model": AI100_MODEL,
         "messages": [
@@ -458,9 +444,8 @@ def summarize_only(text: str) -> str:
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20)
+        response, data = post_chat_completion(payload, timeout=20)
         if response.status_code == 200:
-            data = response.json()
             content = data["choices"][0]["message"].get("content", "").strip()
             if content:
                 return content
@@ -474,11 +459,6 @@ def _call_chat_completion(messages, temperature: float = 0.7, max_tokens: int =
     if not AI100_API_KEY:
         return None
 
-    url = f"{AI100_BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {AI100_API_KEY}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "model": AI100_MODEL,
         "messages": messages,
@@ -487,12 +467,11 @@ def _call_chat_completion(messages, temperature: float = 0.7, max_tokens: int =
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=timeout)
+        response, data = post_chat_completion(payload, timeout=timeout)
         if response.status_code != 200:
             print(f"AI100 API Error: {response.status_code} - {response.text}")
             return None
 
-        data = response.json()
         message = data["choices"][0]["message"]
         content = message.get("content")
 
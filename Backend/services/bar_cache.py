@@ -0,0 +1,254 @@
+"""
+In-process LRU of hot per-symbol bar series.
+
+Each (table, symbol) entry holds NumPy column arrays with spare capacity, so
+newly fetched TwelveData bars are written in place at the tail instead of
+rebuilding the frame. Reads binary-search the sorted `ts` column and return
+a fresh DataFrame (callers may mutate it freely).
+
+The LRU is bounded by BAR_CACHE_MAX_SYMBOLS entries and BAR_CACHE_MAX_MB of
+estimated memory; stats() reports hits, misses, evictions and memory.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.metrics import record_cache
+
+MAX_SYMBOLS = int(os.getenv("BAR_CACHE_MAX_SYMBOLS", "64"))
+MAX_BYTES = int(float(os.getenv("BAR_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+_NUMERIC_COLUMNS = ("ts",) + PRICE_COLUMNS
+# Approximate footprint of one "YYYY-MM-DD HH:MM:SS" str object
+_TIME_STR_BYTES = sys.getsizeof("2024-01-02 09:30:00")
+_MIN_CAPACITY = 256
+_series_ids = itertools.count(1)
+
+
+def time_column(table: str) -> str:
+    return "date" if table == "bars_1d" else "datetime"
+
+
+def _to_epoch_seconds(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def frame_columns(table: str, df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Sorted, de-duplicated column arrays from a Supabase or TwelveData frame."""
+    col = time_column(table)
+    fmt = "%Y-%m-%d" if table == "bars_1d" else "%Y-%m-%d %H:%M:%S"
+    data = df.copy()
+    if col not in data.columns and isinstance(data.index, pd.DatetimeIndex):
+        data[col] = data.index.strftime(fmt)
+    elif col in data.columns and pd.api.types.is_datetime64_any_dtype(data[col]):
+        data[col] = data[col].dt.strftime(fmt)
+    data = data.reset_index(drop=True)
+    data["ts"] = _to_epoch_seconds(data[col])
+    data = data.drop_duplicates("ts", keep="last").sort_values("ts", kind="stable")
+    columns = {
+        "ts": data["ts"].to_numpy(dtype=np.int64),
+        "time": data[col].astype(str).to_numpy(dtype=object),
+    }
+    for c in PRICE_COLUMNS:
+        values = data[c] if c in data.columns else pd.Series(np.nan, index=data.index)
+        columns[c] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    return columns
+
+
+class _BarSeries:
+    """Growable column arrays; rows [0, length) are valid."""
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        n = len(columns["ts"])
+        capacity = max(_MIN_CAPACITY, n + n // 4)
+        self.length = n
+        # (series_id, version) changes whenever the rows do; lets readers detect appends
+        self.series_id = next(_series_ids)
+        self.version = 0
+        self.arrays: dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            buf = np.empty(capacity, dtype=values.dtype)
+            buf[:n] = values
+            self.arrays[name] = buf
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self.arrays["ts"][: self.length]
+
+    def nbytes(self) -> int:
+        numeric = sum(self.arrays[c].nbytes for c in _NUMERIC_COLUMNS)
+        return numeric + self.arrays["time"].nbytes + self.length * _TIME_STR_BYTES
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.arrays["ts"])
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name, buf in self.arrays.items():
+            grown = np.empty(new_capacity, dtype=buf.dtype)
+            grown[: self.length] = buf[: self.length]
+            self.arrays[name] = grown
+
+    def merge(self, columns: dict[str, np.ndarray]) -> None:
+        """
+        Write new rows in place from the first new timestamp onward. Stored
+        rows after the new batch's last timestamp are kept.
+        """
+        new_ts = columns["ts"]
+        if len(new_ts) == 0:
+            return
+        ts = self.ts
+        lo = int(np.searchsorted(ts, new_ts[0], side="left"))
+        hi = int(np.searchsorted(ts, new_ts[-1], side="right"))
+        tail = {name: buf[hi: self.length].copy() for name, buf in self.arrays.items()} if hi < self.length else None
+        end = lo + len(new_ts)
+        total = end + (self.length - hi if tail else 0)
+        self._grow(total)
+        for name, buf in self.arrays.items():
+            buf[lo:end] = columns[name]
+            if tail:
+                buf[end:total] = tail[name]
+        self.length = total
+        self.version += 1
+
+    def frame(self, table: str, symbol: str, lo: int, hi: int) -> pd.DataFrame:
+        volume = self.arrays["volume"][lo:hi]
+        if not np.isnan(volume).any():
+            volume = volume.astype(np.int64)
+        return pd.DataFrame({
+            "symbol": symbol,
+            time_column(table): self.arrays["time"][lo:hi].copy(),
+            "open": self.arrays["open"][lo:hi].copy(),
+            "high": self.arrays["high"][lo:hi].copy(),
+            "low": self.arrays["low"][lo:hi].copy(),
+            "close": self.arrays["close"][lo:hi].copy(),
+            "volume": volume.copy(),
+        })
+
+
+class BarCache:
+    def __init__(self, max_symbols: int = MAX_SYMBOLS, max_bytes: int = MAX_BYTES):
+        self.max_symbols = max_symbols
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], _BarSeries] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def contains(self, table: str, symbol: str) -> bool:
+        with self._lock:
+            return (table, symbol) in self._entries
+
+    def put(self, table: str, symbol: str, df: pd.DataFrame) -> None:
+        """Replace the cached series for a symbol (cold-start load)."""
+        series = _BarSeries(frame_columns(table, df))
+        with self._lock:
+            self._entries[(table, symbol)] = series
+            self._entries.move_to_end((table, symbol))
+            self._evict()
+
+    def append(self, table: str, symbol: str, df: pd.DataFrame) -> bool:
+        """Merge freshly fetched bars into a cached series. Returns False if not cached."""
+        if df is None or df.empty:
+            return self.contains(table, symbol)
+        columns = frame_columns(table, df)
+        with self._lock:
+            series = self._entries.get((table, symbol))
+            if series is None:
+                return False
+            series.merge(columns)
+            self._entries.move_to_end((table, symbol))
+            self._evict()
+            return True
+
+    def latest_timestamp(self, table: str, symbol: str) -> Optional[str]:
+        with self._lock:
+            series = self._entries.get((table, symbol))
+            if series is None or series.length == 0:
+                return None
+            return series.arrays["time"][series.length - 1]
+
+    def get(self, table: str, symbol: str, start: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Bars with time >= start as a new DataFrame, or None on a miss."""
+        start_ts = _to_epoch_seconds([start])[0] if start else None
+        with self._lock:
+            series = self._entries.get((table, symbol))
+            if series is None:
+                self.misses += 1
+                record_cache("bar_memory", hit=False)
+                return None
+            self.hits += 1
+            self._entries.move_to_end((table, symbol))
+            lo = int(np.searchsorted(series.ts, start_ts, side="left")) if start_ts is not None else 0
+            df = series.frame(table, symbol, lo, series.length)
+        record_cache("bar_memory", hit=True)
+        return df
+
+    def columns(self, table: str, symbol: str, start_ts: Optional[int] = None,
+                end_ts: Optional[int] = None) -> Optional[tuple[tuple[int, int], dict[str, np.ndarray]]]:
+        """
+        Copies of the column arrays with start_ts <= ts < end_ts, plus the
+        series' (series_id, version) token, or None on a miss.
+        """
+        with self._lock:
+            series = self._entries.get((table, symbol))
+            if series is None:
+                self.misses += 1
+                record_cache("bar_memory", hit=False)
+                return None
+            self.hits += 1
+            self._entries.move_to_end((table, symbol))
+            ts = series.ts
+            lo = int(np.searchsorted(ts, start_ts, side="left")) if start_ts is not None else 0
+            hi = int(np.searchsorted(ts, end_ts, side="left")) if end_ts is not None else series.length
+            hi = max(lo, hi)
+            cols = {name: buf[lo:hi].copy() for name, buf in series.arrays.items()}
+            token = (series.series_id, series.version)
+        record_cache("bar_memory", hit=True)
+        return token, cols
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(s.nbytes() for s in self._entries.values())
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            per_entry = {f"{t}:{s}": {"rows": e.length, "bytes": e.nbytes()} for (t, s), e in self._entries.items()}
+            total = sum(v["bytes"] for v in per_entry.values())
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_symbols,
+                "memory_bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "series": per_entry,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self) -> None:
+        # Callers hold self._lock. Always keep the most recently used entry.
+        total = sum(s.nbytes() for s in self._entries.values())
+        while len(self._entries) > 1 and (len(self._entries) > self.max_symbols or total > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes()
+            self.evictions += 1
+
+
+bar_cache = BarCache()
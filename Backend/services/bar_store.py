@@ -0,0 +1,184 @@
+"""
+Local columnar OHLCV store in front of Supabase.
+
+One Arrow IPC file per (table, symbol) under BAR_STORE_DIR, e.g.
+bar_store/bars_1h/AAPL.arrow. Files are memory-mapped on read and sorted by
+an int64 `ts` column (seconds since epoch of the ET wall-clock time stored in
+Supabase), so range queries are a binary search plus a zero-copy slice.
+
+Supabase stays the durable store: DataManager writes fetched bars there first
+and then appends them here. A missing file is hydrated from Supabase once.
+
+pyarrow is optional — without it (or with BAR_STORE_DIR set to an empty
+string) is_enabled() is False and callers keep reading Supabase directly.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from services.metrics import record_cache
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # optional dependency
+    pa = None
+    pa_ipc = None
+
+BAR_STORE_DIR = os.getenv(
+    "BAR_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bar_store")
+)
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return pa is not None and bool(BAR_STORE_DIR)
+
+
+def time_column(table: str) -> str:
+    return "date" if table == "bars_1d" else "datetime"
+
+
+def _path(table: str, symbol: str) -> str:
+    return os.path.join(BAR_STORE_DIR, table, f"{symbol.upper()}.arrow")
+
+
+def _lock_for(path: str) -> threading.Lock:
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = threading.Lock()
+        return lock
+
+
+def _to_epoch_seconds(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def _schema(table: str):
+    return pa.schema(
+        [("ts", pa.int64()), (time_column(table), pa.string())]
+        + [(c, pa.float64()) for c in PRICE_COLUMNS]
+        + [("volume", pa.int64())]
+    )
+
+
+def _frame_to_arrow(table: str, df: pd.DataFrame):
+    """
+    Normalize a TwelveData frame (DatetimeIndex) or a Supabase frame (text
+    date/datetime column) into a sorted, de-duplicated Arrow table.
+    """
+    col = time_column(table)
+    fmt = "%Y-%m-%d" if table == "bars_1d" else "%Y-%m-%d %H:%M:%S"
+    data = df.copy()
+    if col not in data.columns and isinstance(data.index, pd.DatetimeIndex):
+        data[col] = data.index.strftime(fmt)
+    elif col in data.columns and pd.api.types.is_datetime64_any_dtype(data[col]):
+        data[col] = data[col].dt.strftime(fmt)
+    data = data.reset_index(drop=True)
+    data["ts"] = _to_epoch_seconds(data[col])
+    data = data.drop_duplicates("ts", keep="last").sort_values("ts", kind="stable")
+
+    arrays = [pa.array(data["ts"].to_numpy(), type=pa.int64()), pa.array(data[col].astype(str), type=pa.string())]
+    for c in PRICE_COLUMNS:
+        arrays.append(pa.array(pd.to_numeric(data.get(c), errors="coerce"), type=pa.float64(), from_pandas=True))
+    volume = pd.to_numeric(data["volume"], errors="coerce") if "volume" in data.columns else pd.Series([np.nan] * len(data))
+    arrays.append(pa.array(volume, type=pa.int64(), from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=_schema(table))
+
+
+def _read_table(path: str):
+    """Memory-map an IPC file; buffers stay valid after the map is closed by GC."""
+    with pa.memory_map(path, "r") as source:
+        return pa_ipc.open_file(source).read_all()
+
+
+def _write_atomic(path: str, table) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _ts_column(table) -> np.ndarray:
+    return table.column("ts").to_numpy()
+
+
+def exists(table: str, symbol: str) -> bool:
+    return is_enabled() and os.path.exists(_path(table, symbol))
+
+
+def latest_timestamp(table: str, symbol: str) -> Optional[str]:
+    """Latest stored date/datetime text, or None if the store has no bars."""
+    if not exists(table, symbol):
+        return None
+    t = _read_table(_path(table, symbol))
+    if t.num_rows == 0:
+        return None
+    return t.column(time_column(table))[t.num_rows - 1].as_py()
+
+
+def read(table: str, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Bars with start <= time (< end) as a DataFrame shaped like the Supabase
+    rows (symbol, date|datetime, open, high, low, close, volume).
+    Returns None when the store has no file for this symbol.
+    """
+    if not exists(table, symbol):
+        record_cache("bar_store", hit=False)
+        return None
+    t = _read_table(_path(table, symbol))
+    ts = _ts_column(t)
+    lo = int(np.searchsorted(ts, _to_epoch_seconds([start])[0], side="left")) if start else 0
+    hi = int(np.searchsorted(ts, _to_epoch_seconds([end])[0], side="left")) if end else len(ts)
+    sliced = t.slice(lo, max(0, hi - lo)).drop_columns(["ts"])
+    df = sliced.to_pandas()
+    df.insert(0, "symbol", symbol.upper())
+    record_cache("bar_store", hit=True)
+    return df
+
+
+def write(table: str, symbol: str, df: pd.DataFrame) -> None:
+    """Replace the stored bars for a symbol (used to hydrate from Supabase)."""
+    if not is_enabled() or df is None:
+        return
+    path = _path(table, symbol)
+    new = _frame_to_arrow(table, df)
+    with _lock_for(path):
+        _write_atomic(path, new)
+
+
+def append(table: str, symbol: str, df: pd.DataFrame) -> None:
+    """
+    Merge freshly fetched bars into the store. Rows inside the new batch's
+    time span replace stored ones (the last bar of a session gets revised);
+    rows before and after it are kept.
+    """
+    if not is_enabled() or df is None or df.empty:
+        return
+    path = _path(table, symbol)
+    new = _frame_to_arrow(table, df)
+    if new.num_rows == 0:
+        return
+    with _lock_for(path):
+        if not os.path.exists(path):
+            _write_atomic(path, new)
+            return
+        current = _read_table(path)
+        ts = _ts_column(current)
+        new_ts = _ts_column(new)
+        lo = int(np.searchsorted(ts, new_ts[0], side="left"))
+        hi = int(np.searchsorted(ts, new_ts[-1], side="right"))
+        parts = [current.slice(0, lo), new, current.slice(hi)]
+        merged = pa.concat_tables([p for p in parts if p.num_rows]).combine_chunks()
+        _write_atomic(path, merged)
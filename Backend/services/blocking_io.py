@@ -0,0 +1,63 @@
+"""
+Bounded executor for blocking I/O called from async route handlers.
+
+Finnhub, AI100, TwelveData, newspaper3k and Supabase are all used through
+synchronous clients. Calling them directly inside an `async def` handler
+freezes the event loop for every other request on the worker, so async code
+awaits them through run_blocking() instead.
+
+The pool is also installed as the loop's default executor on startup, which
+bounds any remaining asyncio.to_thread() callers (e.g. in libraries) by the same
+BLOCKING_IO_WORKERS limit. shutdown() drops the pool and the next caller
+builds a fresh one, so a second app lifespan in the same process (tests,
+reloads) keeps working.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "32"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    """The current pool, created on first use after import or shutdown()."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+        return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable on the bounded pool and await its result.
+    Context variables (e.g. the per-request memo table) are carried over.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_pool(), call)
+
+
+def install_default_executor() -> None:
+    """Make asyncio.to_thread / run_in_executor(None, ...) use the bounded pool."""
+    asyncio.get_running_loop().set_default_executor(_pool())
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
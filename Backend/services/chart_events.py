@@ -1,9 +1,16 @@
 """
 Detect notable single-step price moves for chart markers (lazy news is keyed by calendar day).
+
+The engine works on parallel time/close arrays: bar-to-bar % changes are one
+vector op, the strongest move per calendar day is a group reduction and the
+top events come from argpartition, so a year of 1min bars never goes through
+a Python-level sort. The record-based functions are thin adapters over it.
 """
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
+
+import numpy as np
 
 # Max markers to show; keeps chart readable and caps Finnhub calls.
 _MAX_EVENTS = 8
@@ -34,46 +41,105 @@ def _sort_key_record(r: dict[str, Any]) -> str:
     return str(r.get("time") or r.get("date") or "")
 
 
+def _calendar_dates(times: np.ndarray) -> np.ndarray:
+    """First ten characters of each (stripped) time string, as a fixed-width array."""
+    lengths = np.char.str_len(times)
+    # Only leading whitespace, or trailing whitespace on short (date-only) text, can change the prefix
+    maybe_padded = (lengths > 0) & ((times.astype("U1") <= " ") | (lengths <= 10))
+    if maybe_padded.any():
+        times = np.char.strip(times)
+    return times.astype("U10")
+
+
+def _session_order(times: np.ndarray, timeframe: str) -> np.ndarray:
+    """Indices of the bars to scan, in time order (1D keeps only the last calendar date)."""
+    if len(times) < 2:
+        return np.empty(0, dtype=np.int64)
+    if (times[1:] >= times[:-1]).all():
+        order = np.arange(len(times))
+    else:
+        order = np.argsort(times, kind="stable")
+    if timeframe == "1D":
+        dates = _calendar_dates(times[order])
+        if dates[-1]:
+            order = order[dates == dates[-1]]
+    return order if len(order) >= 2 else np.empty(0, dtype=np.int64)
+
+
+def _as_arrays(times: Sequence[Any], closes: Sequence[Any]) -> tuple[np.ndarray, np.ndarray]:
+    return np.asarray(times).astype(str), np.asarray(closes, dtype=np.float64)
+
+
+def _record_arrays(records: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    times = [_sort_key_record(r) for r in records]
+    closes = [float(r.get("close") or 0) for r in records]
+    return _as_arrays(times, closes)
+
+
+def _pct_changes(closes: np.ndarray) -> np.ndarray:
+    prev = closes[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (closes[1:] - prev) / prev * 100.0
+
+
+def pick_daily_peaks(strength: np.ndarray, dates: np.ndarray, candidates: np.ndarray,
+                     limit: int = _MAX_EVENTS) -> np.ndarray:
+    """
+    The strongest candidate per calendar date, then the `limit` strongest
+    dates, as ascending indices. Ties go to the earlier index both within a
+    date and for the last slots.
+    """
+    if not len(candidates):
+        return candidates
+    _, day = np.unique(dates[candidates], return_inverse=True)
+    day = day.ravel()
+    best = np.full(day.max() + 1, -np.inf)
+    np.maximum.at(best, day, strength[candidates])
+    at_best = strength[candidates] == best[day]
+    _, first = np.unique(day[at_best], return_index=True)
+    daily = candidates[at_best][first]
+
+    if len(daily) > limit:
+        top = np.argpartition(-strength[daily], limit - 1)[:limit]
+        cutoff = strength[daily[top]].min()
+        daily = daily[strength[daily] >= cutoff]
+    return np.sort(daily[np.lexsort((daily, -strength[daily]))][:limit])
+
+
 def prepare_event_rows(records: list[dict[str, Any]], timeframe: str) -> list[dict[str, Any]]:
     """
     Same ordering and 1D session filter as compute_price_events (for debugging / exports).
     """
     if not records or len(records) < 2:
         return []
-    rows = sorted(records, key=_sort_key_record)
-    if timeframe == "1D":
-        today = _calendar_date(rows[-1].get("time") or rows[-1].get("date"))
-        if today:
-            rows = [r for r in rows if _calendar_date(r.get("time") or r.get("date")) == today]
-    return rows if len(rows) >= 2 else []
+    times = np.array([_sort_key_record(r) for r in records]).astype(str)
+    return [records[i] for i in _session_order(times, timeframe).tolist()]
 
 
 def bar_pct_changes_for_inspection(records: list[dict[str, Any]], timeframe: str) -> list[dict[str, Any]]:
     """
     Every consecutive bar pair after prepare_event_rows, with pct_change = (close - prev_close) / prev_close * 100.
     """
-    rows = prepare_event_rows(records, timeframe)
-    out: list[dict[str, Any]] = []
-    for i in range(1, len(rows)):
-        prev_c = float(rows[i - 1].get("close") or 0)
-        cur_c = float(rows[i].get("close") or 0)
-        t_prev = str(rows[i - 1].get("time") or rows[i - 1].get("date") or "")
-        t = str(rows[i].get("time") or rows[i].get("date") or "")
-        if prev_c <= 0:
-            pct = None
-        else:
-            pct = (cur_c - prev_c) / prev_c * 100.0
-        out.append(
-            {
-                "bar_index": i,
-                "prev_time": t_prev,
-                "time": t,
-                "prev_close": round(prev_c, 6),
-                "close": round(cur_c, 6),
-                "pct_change": None if pct is None else round(pct, 6),
-            }
-        )
-    return out
+    if not records or len(records) < 2:
+        return []
+    times, closes = _record_arrays(records)
+    order = _session_order(times, timeframe)
+    if not len(order):
+        return []
+    times, closes = times[order].tolist(), closes[order]
+    pct = _pct_changes(closes).tolist()
+    closes = closes.tolist()
+    return [
+        {
+            "bar_index": i,
+            "prev_time": times[i - 1],
+            "time": times[i],
+            "prev_close": round(closes[i - 1], 6),
+            "close": round(closes[i], 6),
+            "pct_change": None if closes[i - 1] <= 0 else round(pct[i - 1], 6),
+        }
+        for i in range(1, len(times))
+    ]
 
 
 def compute_price_events(records: list[dict[str, Any]], timeframe: str) -> list[dict[str, Any]]:
@@ -81,52 +147,39 @@ def compute_price_events(records: list[dict[str, Any]], timeframe: str) -> list[
     Returns events sorted by time, labeled Event 1..n, one per calendar day (strongest move kept).
     Each record should include 'time' (or 'date'), 'close'.
     """
-    rows = prepare_event_rows(records, timeframe)
-    if not rows:
+    if not records or len(records) < 2:
+        return []
+    return price_events_from_arrays(*_record_arrays(records), timeframe)
+
+
+def price_events_from_arrays(times: Sequence[Any], closes: Sequence[Any], timeframe: str) -> list[dict[str, Any]]:
+    """
+    compute_price_events over parallel time-text and close arrays (e.g. a ChartSeries).
+    Ties on |move| go to the earlier bar, both within a day and for the last slots.
+    """
+    times, closes = _as_arrays(times, closes)
+    order = _session_order(times, timeframe)
+    if not len(order):
         return []
+    times, closes = times[order], closes[order]
 
-    floor = _FLOOR_PCT.get(timeframe, 0.5)
-
-    moves: list[tuple[float, int, float, str, float, str]] = []
-    for i in range(1, len(rows)):
-        prev_c = float(rows[i - 1].get("close") or 0)
-        cur_c = float(rows[i].get("close") or 0)
-        if prev_c <= 0:
-            continue
-        pct = (cur_c - prev_c) / prev_c * 100.0
-        t = str(rows[i].get("time") or rows[i].get("date") or "")
-        cal = _calendar_date(t)
-        if not cal:
-            continue
-        moves.append((abs(pct), i, pct, t, cur_c, cal))
-
-    moves.sort(reverse=True, key=lambda x: x[0])
-
-    seen_dates: set[str] = set()
-    picked: list[tuple[float, int, float, str, float, str]] = []
-    for abs_pct, idx, pct, t, price, cal in moves:
-        if abs_pct < floor:
-            break
-        if cal in seen_dates:
-            continue
-        seen_dates.add(cal)
-        picked.append((abs_pct, idx, pct, t, price, cal))
-        if len(picked) >= _MAX_EVENTS:
-            break
-
-    # Chronological order for Event 1..n
-    picked.sort(key=lambda x: x[3])
+    pct = _pct_changes(closes)
+    strength = np.abs(pct)
+    dates = _calendar_dates(times[1:])
+    # NaN moves fail the floor comparison, like a non-positive previous close
+    moves = np.flatnonzero((closes[:-1] > 0) & (dates != "") & (strength >= event_floor_pct(timeframe)))
 
+    picked = pick_daily_peaks(strength, dates, moves).tolist()
     out: list[dict[str, Any]] = []
-    for n, (_, _idx, pct, t, price, cal) in enumerate(picked, start=1):
+    for n, k in enumerate(picked, start=1):
         out.append(
             {
                 "index": n,
                 "label": f"Event {n}",
-                "time": t,
-                "event_date": cal,
-                "price": round(price, 4),
-                "pct_change": round(pct, 3),
+                "time": str(times[k + 1]),
+                "event_date": str(dates[k]),
+                "price": round(float(closes[k + 1]), 4),
+                "pct_change": round(float(pct[k]), 3),
             }
         )
     return out
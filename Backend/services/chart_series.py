@@ -0,0 +1,287 @@
+"""
+Chart-ready OHLCV arrays per symbol and /history timeframe.
+
+Every timeframe is a level of detail over one base interval held in the
+in-memory bar cache:
+
+  1D        1min bars, last 24 hours
+  5D        1h bars, last five trading dates
+  1M / 3M   1h bars, last 30 / 90 days
+  1Y        1day bars, last 365 days
+  5Y        1day bars aggregated into W-FRI weeks, last five years
+
+Window timeframes are a binary search into the base arrays. The weekly level
+is precomputed per symbol and maintained incrementally: when bars arrive only
+the last week is re-aggregated. Responses are built straight from NumPy
+arrays — no DataFrame per request — and can be downsampled with LTTB to a
+point budget.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import numpy as np
+
+from services.bar_cache import bar_cache, frame_columns
+from services.stock_manager import manager
+
+_DAY = 86400
+_EPOCH = datetime(1970, 1, 1)
+
+# timeframe -> (base interval, lookback); 5D keeps five trading dates instead
+TIMEFRAMES: dict[str, tuple[str, Optional[timedelta]]] = {
+    "1D": ("1min", timedelta(hours=24)),
+    "5D": ("1h", None),
+    "1M": ("1h", timedelta(days=30)),
+    "3M": ("1h", timedelta(days=90)),
+    "1Y": ("1day", timedelta(days=365)),
+    "5Y": ("1day", timedelta(days=365 * 5)),
+}
+DEFAULT_TIMEFRAME = "1Y"
+_FIVE_DAY_DATES = 5
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class ChartSeries:
+    """Column arrays for one chart; `time` holds the date/datetime text."""
+
+    def __init__(self, symbol: str, time_key: str, time: np.ndarray, columns: dict[str, np.ndarray]):
+        self.symbol = symbol
+        self.time_key = time_key
+        self.time = time
+        self.columns = columns
+
+    @classmethod
+    def empty(cls, symbol: str, time_key: str = "datetime") -> "ChartSeries":
+        return cls(symbol, time_key, np.empty(0, dtype=object), {c: np.empty(0) for c in PRICE_COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def take(self, indices: np.ndarray) -> "ChartSeries":
+        return ChartSeries(self.symbol, self.time_key, self.time[indices],
+                           {name: values[indices] for name, values in self.columns.items()})
+
+    def downsample(self, points: Optional[int]) -> "ChartSeries":
+        if not points or points >= len(self):
+            return self
+        return self.take(lttb_indices(self.columns["close"], points))
+
+    def volume(self) -> np.ndarray:
+        volume = self.columns["volume"]
+        return volume.astype(np.int64) if not np.isnan(volume).any() else volume
+
+    def columnar(self) -> dict[str, Any]:
+        """Parallel arrays t/o/h/l/c/v (NumPy; the time column as a list of text)."""
+        return {
+            "t": self.time.tolist(),
+            "o": self.columns["open"], "h": self.columns["high"],
+            "l": self.columns["low"], "c": self.columns["close"],
+            "v": self.volume(),
+        }
+
+    def to_arrow_ipc(self, metadata: Optional[dict[str, str]] = None) -> bytes:
+        """The columnar arrays as an Arrow IPC stream (pyarrow is optional)."""
+        import pyarrow as pa
+
+        cols = self.columnar()
+        table = pa.table({"t": pa.array(cols["t"], type=pa.string()),
+                          **{k: pa.array(cols[k]) for k in ("o", "h", "l", "c", "v")}})
+        table = table.replace_schema_metadata(metadata or {})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def records(self) -> list[dict[str, Any]]:
+        """Rows shaped like the Supabase bars plus 'time', as plain Python values."""
+        times = self.time.tolist()
+        volume = self.volume().tolist()
+        prices = [self.columns[c].tolist() for c in PRICE_COLUMNS[:-1]]
+        symbol, key = self.symbol, self.time_key
+        return [
+            {"symbol": symbol, key: t, "open": o, "high": h, "low": l, "close": c, "volume": v, "time": t}
+            for t, o, h, l, c, v in zip(times, *prices, volume)
+        ]
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of `y`. x is the bar index, matching the chart, which
+    hides closed-market gaps.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = n - 1.0, float(y[-1])
+        else:
+            avg_x, avg_y = (next_start + next_end - 1) / 2.0, float(np.nanmean(y[next_start:next_end]))
+        xs = np.arange(start, end)
+        area = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        out[i + 1] = a
+    return out
+
+
+# ── Weekly level of detail (5Y) ──────────────────────────────────────────────
+
+def _weekly(cols: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """W-FRI weeks over sorted daily columns: first open, max high, min low, last close, summed volume."""
+    ts = cols["ts"]
+    if len(ts) == 0:
+        return {name: np.empty(0, dtype=np.float64 if name in PRICE_COLUMNS else np.int64)
+                for name in ("label", "first_ts", "last_ts") + PRICE_COLUMNS}
+    days = ts // _DAY
+    # 1970-01-01 was a Thursday: (days + 3) % 7 is the Monday-based weekday; Friday is 4
+    label = days + (4 - (days + 3) % 7) % 7
+    starts = np.flatnonzero(np.r_[True, label[1:] != label[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    return {
+        "label": label[starts],
+        "first_ts": ts[starts],
+        "last_ts": ts[ends],
+        "open": cols["open"][starts],
+        "high": np.fmax.reduceat(cols["high"], starts),
+        "low": np.fmin.reduceat(cols["low"], starts),
+        "close": cols["close"][ends],
+        "volume": np.add.reduceat(np.nan_to_num(cols["volume"]), starts),
+    }
+
+
+class _WeeklyLOD:
+    def __init__(self, token: tuple[int, int], weeks: dict[str, np.ndarray]):
+        self.token = token
+        self.weeks = weeks
+
+
+_weekly_lods: dict[str, _WeeklyLOD] = {}
+_weekly_lock = threading.Lock()
+
+
+def _weekly_lod(symbol: str) -> Optional[_WeeklyLOD]:
+    """The symbol's weekly bars, re-aggregating only from the last stored week onward."""
+    with _weekly_lock:
+        lod = _weekly_lods.get(symbol)
+    if lod is not None and len(lod.weeks["label"]):
+        tail = bar_cache.columns("bars_1d", symbol, start_ts=int(lod.weeks["first_ts"][-1]))
+        if tail is None:
+            return None
+        token, cols = tail
+        if token == lod.token:
+            return lod
+        if token[0] == lod.token[0]:
+            # Same series, new or revised bars at the end: splice the re-aggregated tail
+            fresh = _weekly(cols)
+            weeks = {name: np.concatenate([values[:-1], fresh[name]]) for name, values in lod.weeks.items()}
+            lod = _WeeklyLOD(token, weeks)
+            with _weekly_lock:
+                _weekly_lods[symbol] = lod
+            return lod
+    full = bar_cache.columns("bars_1d", symbol)
+    if full is None:
+        return None
+    token, cols = full
+    lod = _WeeklyLOD(token, _weekly(cols))
+    with _weekly_lock:
+        _weekly_lods[symbol] = lod
+    return lod
+
+
+# ── Building a chart ─────────────────────────────────────────────────────────
+
+def _epoch_seconds(dt: datetime) -> int:
+    """Same clock as the bar cache `ts`: the wall-clock text read as UTC."""
+    return int((dt - _EPOCH).total_seconds())
+
+
+def _base_columns(symbol: str, interval: str, table: str, start_ts: Optional[int] = None):
+    cached = bar_cache.columns(table, symbol, start_ts=start_ts)
+    if cached is not None:
+        return cached[1]
+    # Evicted or never cached: load once through DataManager (this warms the cache)
+    df = manager.get_stock_data(symbol, interval)
+    if df.empty:
+        return None
+    cols = frame_columns(table, df)
+    if start_ts is not None:
+        lo = int(np.searchsorted(cols["ts"], start_ts, side="left"))
+        cols = {name: values[lo:] for name, values in cols.items()}
+    return cols
+
+
+def _series(symbol: str, table: str, cols: dict[str, np.ndarray]) -> ChartSeries:
+    return ChartSeries(symbol, "date" if table == "bars_1d" else "datetime", cols["time"],
+                       {c: cols[c] for c in PRICE_COLUMNS})
+
+
+def _weekly_series(symbol: str, cutoff_ts: int) -> Optional[ChartSeries]:
+    lod = _weekly_lod(symbol)
+    if lod is None:
+        return None
+    weeks = lod.weeks
+    i = int(np.searchsorted(weeks["last_ts"], cutoff_ts, side="left"))
+    columns = {c: weeks[c][i:].copy() for c in PRICE_COLUMNS}
+    if i < len(weeks["label"]) and weeks["first_ts"][i] < cutoff_ts:
+        # The window starts mid-week: aggregate that week from the cutoff only
+        week_end = int(weeks["last_ts"][i]) + 1
+        partial = bar_cache.columns("bars_1d", symbol, start_ts=cutoff_ts, end_ts=week_end)
+        if partial is not None and len(partial[1]["ts"]):
+            first = _weekly(partial[1])
+            for c in PRICE_COLUMNS:
+                columns[c][0] = first[c][0]
+    labels = weeks["label"][i:].astype("datetime64[D]").astype(str).astype(object)
+    keep = ~np.isnan(np.vstack([columns[c] for c in PRICE_COLUMNS])).any(axis=0)
+    series = ChartSeries(symbol, "date", labels, columns)
+    return series if keep.all() else series.take(np.flatnonzero(keep))
+
+
+def load_chart_series(symbol: str, timeframe: str, now: Optional[datetime] = None) -> ChartSeries:
+    """
+    Chart arrays for a /history timeframe (unknown timeframes get the 1Y view).
+    Refreshes the symbol through DataManager first (credit budget, single-flight).
+    """
+    symbol = symbol.upper()
+    interval, lookback = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
+    now = now or datetime.now()
+    table = manager.ensure_fresh(symbol, interval)
+    empty = ChartSeries.empty(symbol, "date" if table == "bars_1d" else "datetime")
+
+    if timeframe == "5Y":
+        cutoff_ts = _epoch_seconds(now - lookback)
+        series = _weekly_series(symbol, cutoff_ts)
+        if series is None:
+            # Not cached: fall back to the generic path once, which warms the cache
+            if _base_columns(symbol, interval, table) is None:
+                return empty
+            series = _weekly_series(symbol, cutoff_ts)
+        return series if series is not None else empty
+
+    if lookback is None:
+        cols = _base_columns(symbol, interval, table)
+        if cols is None:
+            return empty
+        days = cols["ts"] // _DAY
+        day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        if len(day_starts) > _FIVE_DAY_DATES:
+            cols = {name: values[day_starts[-_FIVE_DAY_DATES]:] for name, values in cols.items()}
+        return _series(symbol, table, cols)
+
+    cols = _base_columns(symbol, interval, table, start_ts=_epoch_seconds(now - lookback))
+    return empty if cols is None else _series(symbol, table, cols)
+
+
+def clear() -> None:
+    with _weekly_lock:
+        _weekly_lods.clear()
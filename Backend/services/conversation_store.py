@@ -0,0 +1,146 @@
+"""
+Server-side chat session store keyed by conversation id.
+
+Keeps what the last turns already resolved — ticker, fetched news items,
+stock card and a short message history — so follow-ups ("summarize them")
+can be answered from memory instead of re-running the classifier and
+Finnhub, and clients don't have to resend the whole history every turn.
+
+Sessions live in an in-memory LRU. When CHAT_SESSION_SQLITE_PATH is set,
+evicted sessions are spilled to SQLite and promoted back on the next access.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+MAX_SESSIONS = int(os.getenv("CHAT_SESSION_MAX", "256"))
+SESSION_TTL_SECONDS = int(os.getenv("CHAT_SESSION_TTL_SECONDS", "3600"))
+SQLITE_PATH = os.getenv("CHAT_SESSION_SQLITE_PATH") or None
+MAX_HISTORY_MESSAGES = 10
+
+# Article fields worth keeping for follow-ups (embeddings are large and unused here).
+_NEWS_FIELDS = ("url_hash", "headline", "source", "url", "datetime", "summary", "sentiment", "tone", "ticker")
+
+
+def _new_session() -> dict:
+    return {
+        "ticker": None,
+        "news_items": [],
+        "stock_card": None,
+        "history": [],
+        "updated_at": time.time(),
+    }
+
+
+def _slim_news_items(items: list) -> list:
+    return [{k: item.get(k) for k in _NEWS_FIELDS if k in item} for item in (items or [])]
+
+
+class ConversationStore:
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl_seconds: int = SESSION_TTL_SECONDS,
+                 sqlite_path: Optional[str] = SQLITE_PATH):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                "conversation_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, conversation_id: str) -> Optional[dict]:
+        """Return a copy of the session, or None if unknown/expired."""
+        if not conversation_id:
+            return None
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                session = self._load_spilled(conversation_id)
+                if session is not None:
+                    self._sessions[conversation_id] = session
+                    self._evict_overflow()
+            if session is None:
+                return None
+            if time.time() - session["updated_at"] > self.ttl_seconds:
+                del self._sessions[conversation_id]
+                return None
+            self._sessions.move_to_end(conversation_id)
+            return dict(session)
+
+    def update(self, conversation_id: str, **fields: Any) -> dict:
+        """Merge fields into the session (creating it if needed)."""
+        if "news_items" in fields:
+            fields["news_items"] = _slim_news_items(fields["news_items"])
+        if "history" in fields:
+            fields["history"] = list(fields["history"])[-MAX_HISTORY_MESSAGES:]
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                session = self._load_spilled(conversation_id) or _new_session()
+                self._sessions[conversation_id] = session
+            session.update(fields)
+            session["updated_at"] = time.time()
+            self._sessions.move_to_end(conversation_id)
+            self._evict_overflow()
+            return dict(session)
+
+    def append_turn(self, conversation_id: str, user_message: str, assistant_message: str) -> None:
+        session = self.get(conversation_id) or _new_session()
+        history = session["history"] + [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": assistant_message},
+        ]
+        self.update(conversation_id, history=history)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # ------------------------------------------------------------------ #
+    # Eviction / SQLite spill (callers hold self._lock)                    #
+    # ------------------------------------------------------------------ #
+
+    def _evict_overflow(self) -> None:
+        while len(self._sessions) > self.max_sessions:
+            conversation_id, session = self._sessions.popitem(last=False)
+            self._spill(conversation_id, session)
+
+    def _spill(self, conversation_id: str, session: dict) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO chat_sessions (conversation_id, data, updated_at) VALUES (?, ?, ?)",
+                (conversation_id, json.dumps(session), session["updated_at"]),
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"[ChatSession] Could not spill session {conversation_id}: {e}")
+
+    def _load_spilled(self, conversation_id: str) -> Optional[dict]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT data FROM chat_sessions WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute("DELETE FROM chat_sessions WHERE conversation_id = ?", (conversation_id,))
+            self._db.commit()
+            return json.loads(row[0])
+        except Exception as e:
+            print(f"[ChatSession] Could not load spilled session {conversation_id}: {e}")
+            return None
+
+
+conversation_store = ConversationStore()
@@ -8,12 +8,18 @@ Called after each save_generated_notification() to email the user
 import os
 import resend
 from database import get_user_settings
+from services.metrics import time_upstream
 
 resend.api_key = os.environ.get("RESEND_API_KEY", "")
 
 FROM_ADDRESS = "Financial Insights <onboarding@resend.dev>"
 
 
+def _send(params: "resend.Emails.SendParams") -> dict:
+    with time_upstream("resend", "emails.send"):
+        return resend.Emails.send(params)
+
+
 def send_notification_email(notification: dict):
     """Send an email for a generated notification. Silently skips if not configured."""
     try:
@@ -31,7 +37,7 @@ def send_notification_email(notification: dict):
             "html": html,
         }
 
-        result = resend.Emails.send(params)
+        result = _send(params)
         print(f"  [Email] Sent to {settings['email']}: {subject} (id={result.get('id', '?')})")
     except Exception as e:
         print(f"  [Email] Failed to send: {e}")
@@ -46,7 +52,7 @@ def send_confirmation_email(email: str, code: str):
             "subject": f"Your confirmation code: {code}",
             "html": _confirmation_email_html(code),
         }
-        result = resend.Emails.send(params)
+        result = _send(params)
         print(f"  [Email] Confirmation sent to {email} (id={result.get('id', '?')})")
     except Exception as e:
         print(f"  [Email] Failed to send confirmation: {e}")
@@ -75,7 +81,7 @@ def send_alert_email(alert: dict, reminder: dict):
             "html": html,
         }
 
-        result = resend.Emails.send(params)
+        result = _send(params)
         print(f"  [Email] Reminder alert sent to {settings['email']}: {subject} (id={result.get('id', '?')})")
     except Exception as e:
         print(f"  [Email] Failed to send reminder alert: {e}")
@@ -2,6 +2,7 @@ import os
 import requests
 import json
 import numpy as np
+from services.metrics import time_upstream
 
 # Load credentials from the environment (falling back to the standard endpoints)
 AI100_BASE_URL = os.getenv("AI100_BASE_URL", "https://aisuite.cirrascale.com/apis/v2")
@@ -31,7 +32,9 @@ def get_embedding(text: str) -> list:
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=20)
+        with time_upstream("ai100", "embeddings") as timer:
+            response = requests.post(url, json=payload, headers=headers, timeout=20)
+            timer.status = response.status_code
         
         if response.status_code != 200:
             print(f"[AI100 Embeddings] API Error {response.status_code}: {response.text[:200]}")
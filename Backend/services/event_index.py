@@ -0,0 +1,246 @@
+"""
+Per-symbol index of each calendar day's strongest bar-to-bar move.
+
+Chart events (chart_events) are the strongest move per calendar day, then
+the strongest days. Finished days never change, so instead of scanning every
+bar of a chart on each /history call the index keeps one peak per (table,
+symbol, date) — bar time, % change and close — and only rescans from the
+last indexed day onward when bars arrive (O(new bars)). A chart then scans
+just its first and last dates, which may be partial, and takes the days in
+between from the index.
+
+Event ids are `<symbol>:<interval>:<bar time>`, so a marker keeps its id
+across requests and across timeframes built from the same bars.
+
+Indexes are persisted as JSON next to the bar store
+(BAR_STORE_DIR/events/<table>/<SYMBOL>.json) and reloaded after a restart;
+they are checked against the cached bars before reuse.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+from services import bar_store
+from services.bar_cache import bar_cache
+from services.chart_events import (
+    _MAX_EVENTS, _calendar_dates, event_floor_pct, pick_daily_peaks, price_events_from_arrays,
+)
+from services.chart_series import DEFAULT_TIMEFRAME, TIMEFRAMES, ChartSeries
+from services.stock_manager import _table_and_interval
+
+_PEAK_FIELDS = ("date", "ts", "time", "pct", "close")
+
+
+class _EventIndex:
+    """
+    Day peaks for one (table, symbol) plus where the next refresh resumes:
+    the first bar of the last indexed day and the bar before it.
+    """
+
+    def __init__(self, token: Optional[tuple[int, int]], peaks: dict[str, np.ndarray],
+                 resume_ts: int, prev_ts: Optional[int], prev_close: float):
+        self.token = token
+        self.peaks = peaks
+        self.resume_ts = resume_ts
+        self.prev_ts = prev_ts
+        self.prev_close = prev_close
+
+
+_indexes: dict[tuple[str, str], _EventIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _day_peaks(ts: np.ndarray, time: np.ndarray, close: np.ndarray, prev_close: float) -> dict[str, np.ndarray]:
+    """Strongest move per calendar day over bars whose predecessor closed at prev_close, then close[:-1]."""
+    prev = np.r_[prev_close, close[:-1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = (close - prev) / prev * 100.0
+    strength = np.abs(pct)
+    dates = _calendar_dates(np.asarray(time).astype(str))
+    moves = np.flatnonzero((prev > 0) & (dates != "") & np.isfinite(strength))
+    picked = pick_daily_peaks(strength, dates, moves, limit=max(1, len(moves)))
+    return {"date": dates[picked], "ts": ts[picked], "time": np.asarray(time, dtype=object)[picked],
+            "pct": pct[picked], "close": close[picked]}
+
+
+def _build(token: tuple[int, int], cols: dict[str, np.ndarray], base: Optional[_EventIndex] = None) -> _EventIndex:
+    """
+    Index `cols`; with `base`, cols starts at base.prev_ts and only days from
+    base.resume_ts onward are (re)computed and spliced onto base's peaks.
+    """
+    ts, time, close = cols["ts"], cols["time"], cols["close"]
+    if base is None:
+        fresh = _day_peaks(ts, time, close, np.nan)
+        kept = None
+    else:
+        fresh = _day_peaks(ts[1:], time[1:], close[1:], float(close[0]))
+        keep = int(np.searchsorted(base.peaks["ts"], base.resume_ts, side="left"))
+        kept = {name: values[:keep] for name, values in base.peaks.items()}
+    peaks = fresh if kept is None else {name: np.concatenate([kept[name], fresh[name]]) for name in _PEAK_FIELDS}
+
+    # Resume point: first bar of the last calendar day in cols, and the bar before it
+    dates = _calendar_dates(np.asarray(time[-1:]).astype(str))
+    first = int(np.searchsorted(np.asarray(time).astype(str), str(dates[0]), side="left"))
+    resume_ts = int(ts[first])
+    if first > 0:
+        prev_ts, prev_close = int(ts[first - 1]), float(close[first - 1])
+    else:
+        prev_ts, prev_close = None, float("nan")
+    return _EventIndex(token, peaks, resume_ts, prev_ts, prev_close)
+
+
+def _path(table: str, symbol: str) -> str:
+    return os.path.join(bar_store.BAR_STORE_DIR, "events", table, f"{symbol.upper()}.json")
+
+
+def _save(table: str, symbol: str, index: _EventIndex) -> None:
+    if not bar_store.BAR_STORE_DIR:
+        return
+    payload = {
+        "resume_ts": index.resume_ts, "prev_ts": index.prev_ts,
+        "prev_close": None if np.isnan(index.prev_close) else index.prev_close,
+        "peaks": {name: np.asarray(values).tolist() for name, values in index.peaks.items()},
+    }
+    path = _path(table, symbol)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[EVENT INDEX] Could not save {table}/{symbol}: {e}")
+
+
+def _load(table: str, symbol: str) -> Optional[_EventIndex]:
+    if not bar_store.BAR_STORE_DIR:
+        return None
+    try:
+        with open(_path(table, symbol)) as f:
+            payload = json.load(f)
+        raw = payload["peaks"]
+        peaks = {
+            "date": np.asarray(raw["date"], dtype="U10"),
+            "ts": np.asarray(raw["ts"], dtype=np.int64),
+            "time": np.asarray(raw["time"], dtype=object),
+            "pct": np.asarray(raw["pct"], dtype=np.float64),
+            "close": np.asarray(raw["close"], dtype=np.float64),
+        }
+        prev_close = payload.get("prev_close")
+        return _EventIndex(None, peaks, int(payload["resume_ts"]), payload.get("prev_ts"),
+                           float("nan") if prev_close is None else float(prev_close))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[EVENT INDEX] Ignoring unreadable index {table}/{symbol}: {e}")
+        return None
+
+
+def day_peaks(table: str, symbol: str) -> Optional[dict[str, np.ndarray]]:
+    """The symbol's indexed day peaks, brought up to date with the bar cache (None if not cached)."""
+    symbol = symbol.upper()
+    key = (table, symbol)
+    with _indexes_lock:
+        index = _indexes.get(key)
+    if index is None:
+        index = _load(table, symbol)
+
+    if index is not None and index.prev_ts is not None:
+        tail = bar_cache.columns(table, symbol, start_ts=index.prev_ts)
+        if tail is None:
+            return None
+        token, cols = tail
+        if token == index.token:
+            return index.peaks
+        ts = cols["ts"]
+        # The bar before the last indexed day must be unchanged to resume from it
+        if len(ts) >= 2 and ts[0] == index.prev_ts and ts[1] == index.resume_ts \
+                and cols["close"][0] == index.prev_close:
+            index = _build(token, cols, base=index)
+            with _indexes_lock:
+                _indexes[key] = index
+            _save(table, symbol, index)
+            return index.peaks
+
+    full = bar_cache.columns(table, symbol)
+    if full is None:
+        return None
+    token, cols = full
+    if len(cols["ts"]) == 0:
+        return None
+    index = _build(token, cols)
+    with _indexes_lock:
+        _indexes[key] = index
+    _save(table, symbol, index)
+    return index.peaks
+
+
+def _event_id(symbol: str, interval: str, time: str) -> str:
+    return f"{symbol}:{interval}:{time}"
+
+
+def chart_events(series: ChartSeries, timeframe: str) -> list[dict[str, Any]]:
+    """
+    compute_price_events for a chart window, with stable ids. Days strictly
+    inside the window come from the index; the first and last dates (possibly
+    partial) are scanned from the chart's own bars.
+    """
+    interval, _ = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
+    table, _ = _table_and_interval(interval)
+    peaks = None
+    if timeframe not in ("1D", "5Y") and len(series) >= 2:
+        peaks = day_peaks(table, series.symbol)
+    if peaks is None:
+        # Weekly bars, the single-day view or uncached bars: scan the chart directly
+        events = price_events_from_arrays(series.time, series.columns["close"], timeframe)
+        label = "1week" if timeframe == "5Y" else interval
+        return [{**e, "id": _event_id(series.symbol, label, e["time"])} for e in events]
+
+    times = np.asarray(series.time).astype(str)
+    close = series.columns["close"]
+    dates = _calendar_dates(times)
+    first_date, last_date = dates[0], dates[-1]
+
+    # Moves on the window's first and last dates (the first bar has no predecessor in the window)
+    prev = close[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = (close[1:] - prev) / prev * 100.0
+    edge = np.flatnonzero((dates[1:] == first_date) | (dates[1:] == last_date)) + 1
+    inner = (peaks["date"] > first_date) & (peaks["date"] < last_date)
+
+    head = edge[dates[edge] == first_date]
+    tail = edge[dates[edge] != first_date]
+    cand_time = np.concatenate([times[head], peaks["time"][inner].astype(str), times[tail]])
+    cand_date = np.concatenate([dates[head], peaks["date"][inner], dates[tail]])
+    cand_pct = np.concatenate([pct[head - 1], peaks["pct"][inner], pct[tail - 1]])
+    cand_close = np.concatenate([close[head], peaks["close"][inner], close[tail]])
+    cand_prev_ok = np.concatenate([prev[head - 1] > 0, np.ones(int(inner.sum()), dtype=bool), prev[tail - 1] > 0])
+
+    strength = np.abs(cand_pct)
+    moves = np.flatnonzero(cand_prev_ok & (cand_date != "") & (strength >= event_floor_pct(timeframe)))
+    picked = pick_daily_peaks(strength, cand_date, moves, _MAX_EVENTS).tolist()
+
+    out: list[dict[str, Any]] = []
+    for n, k in enumerate(picked, start=1):
+        out.append(
+            {
+                "index": n,
+                "label": f"Event {n}",
+                "time": str(cand_time[k]),
+                "event_date": str(cand_date[k]),
+                "price": round(float(cand_close[k]), 4),
+                "pct_change": round(float(cand_pct[k]), 3),
+                "id": _event_id(series.symbol, interval, str(cand_time[k])),
+            }
+        )
+    return out
+
+
+def clear() -> None:
+    with _indexes_lock:
+        _indexes.clear()
@@ -1,36 +1,61 @@
 """
 Lazy-fetch company news for chart event dates only.
 Uses table `stock_event_news` — separate from `news_articles` summarization cache.
+
+Resolved rows are also kept in process, and lookups in progress are shared
+as futures, so /history can start resolving its event dates in the
+background and the chart's follow-up /event-news call only reads memory
+(or joins the lookup that is already running).
 """
 from __future__ import annotations
 
 import hashlib
+import os
 import re
-from typing import Any
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
 
 from services.finnhub_client import get_company_news_safe, get_finnhub_profile
 
+# Missing dates closer than this share one company-news request
+EVENT_NEWS_SPAN_DAYS = int(os.getenv("EVENT_NEWS_SPAN_DAYS", "14"))
+
+# In-process rows per (ticker, event_date), and lookups in flight
+_MEMORY_ROWS = 4096
+_memory: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+_pending: dict[tuple[str, str], Future] = {}
+_memory_lock = threading.Lock()
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="event-news")
+
 
 def _hash_url(url: str) -> str:
     clean_url = (url or "").lower().strip()
     return hashlib.sha256(clean_url.encode("utf-8")).hexdigest()
 
 
-def _pick_article(raw: list[dict[str, Any]], ticker: str, company_hint: str) -> dict[str, Any] | None:
+def _pick_article(
+    raw: list[dict[str, Any]], ticker: str, company_hint: str | Callable[[], str]
+) -> dict[str, Any] | None:
+    """Newest article naming the ticker, else the company (hint may be a lazy callable), else the newest."""
     if not raw:
         return None
     ticker_u = (ticker or "").upper()
-    hint = re.sub(
-        r"(?i)\s+(inc\.?|corp\.?|co\.?|ltd\.?|plc|group|holdings|technologies|solutions)\b.*",
-        "",
-        company_hint or "",
-    ).strip()
     candidates = sorted(raw, key=lambda x: x.get("datetime", 0), reverse=True)
 
     for item in candidates:
         h = (item.get("headline") or "") + " " + (item.get("summary") or "")
         if ticker_u and ticker_u in h.upper():
             return item
+    if callable(company_hint):
+        company_hint = company_hint()
+    hint = re.sub(
+        r"(?i)\s+(inc\.?|corp\.?|co\.?|ltd\.?|plc|group|holdings|technologies|solutions)\b.*",
+        "",
+        company_hint or "",
+    ).strip()
     if hint and len(hint) > 2:
         hu = hint.upper()
         for item in candidates:
@@ -40,6 +65,81 @@ def _pick_article(raw: list[dict[str, Any]], ticker: str, company_hint: str) ->
     return candidates[0]
 
 
+def _date_clusters(dates: list[str], span_days: int) -> list[list[str]]:
+    """Sorted dates grouped so each group spans at most span_days (one Finnhub call each)."""
+    clusters: list[list[str]] = []
+    first = None
+    for d in sorted(dates):
+        try:
+            day = datetime.strptime(d, "%Y-%m-%d").date()
+        except ValueError:
+            clusters.append([d])
+            first = None
+            continue
+        if clusters and first is not None and (day - first).days <= span_days:
+            clusters[-1].append(d)
+        else:
+            clusters.append([d])
+            first = day
+    return clusters
+
+
+def _bucket_by_day(raw: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Finnhub articles keyed by the UTC calendar day of their `datetime` (epoch seconds)."""
+    buckets: dict[str, list[dict[str, Any]]] = {}
+    for item in raw:
+        try:
+            day = datetime.fromtimestamp(int(item.get("datetime") or 0), tz=timezone.utc).strftime("%Y-%m-%d")
+        except (TypeError, ValueError, OverflowError, OSError):
+            continue
+        buckets.setdefault(day, []).append(item)
+    return buckets
+
+
+def _fetch_news_by_day(ticker: str, dates: list[str]) -> tuple[dict[str, list[dict[str, Any]]], dict[str, str]]:
+    """
+    Finnhub company news for the given days: one call per cluster of nearby
+    dates, bucketed per day locally. Returns (articles by day, error by day).
+
+    Finnhub caps the articles per response, newest first, so a busy ticker's
+    response can stop short of the cluster's first dates. Dates older than
+    the oldest article returned are requested again over their own, narrower
+    range rather than reported as having no news.
+    """
+    by_day: dict[str, list[dict[str, Any]]] = {}
+    errors: dict[str, str] = {}
+    pending = deque(_date_clusters(dates, EVENT_NEWS_SPAN_DAYS))
+    while pending:
+        cluster = pending.popleft()
+        try:
+            raw = get_company_news_safe(ticker, cluster[0], cluster[-1])
+        except Exception as e:
+            errors.update((d, str(e)) for d in cluster)
+            continue
+        buckets = _bucket_by_day(raw or [])
+        oldest = min(buckets, default=None)
+        uncovered = [d for d in cluster if oldest is not None and d < oldest]
+        if len(uncovered) == len(cluster):
+            uncovered = []  # nothing inside the range at all: not a capped response
+        for d in cluster:
+            if d not in uncovered:
+                by_day[d] = buckets.get(d, [])
+        if uncovered:
+            pending.append(uncovered)
+    return by_day, errors
+
+
+def _cached_result(event_date: str, row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "event_date": event_date,
+        "headline": row.get("headline"),
+        "summary": row.get("summary"),
+        "url": row.get("url"),
+        "source": row.get("source"),
+        "from_cache": True,
+    }
+
+
 def get_or_fetch_event_news(
     supabase: Any,
     ticker: str,
@@ -49,6 +149,10 @@ def get_or_fetch_event_news(
     """
     For each YYYY-MM-DD in `dates`, return one article row (from DB or Finnhub).
     `supabase` is a SupabaseClient instance.
+
+    Cached days come from one bulk read; the misses share one Finnhub call per
+    cluster of nearby dates and one bulk upsert. The company profile (used to
+    match headlines by name) is only fetched when a day has no ticker match.
     """
     if not supabase or not getattr(supabase, "client", None):
         return [_empty_row(d, "Database not configured") for d in dates]
@@ -57,70 +161,55 @@ def get_or_fetch_event_news(
     if not t or not dates:
         return []
 
-    uniq_dates = []
-    seen: set[str] = set()
-    for d in dates:
-        if d and d not in seen:
-            seen.add(d)
-            uniq_dates.append(d[:10])
+    uniq_dates = list(dict.fromkeys(d[:10] for d in dates if d))
 
-    company_name = ""
-    try:
-        prof = get_finnhub_profile(t)
-        company_name = (prof or {}).get("name") or ""
-    except Exception:
-        pass
+    cached = {} if force_refresh else supabase.get_stock_event_news_bulk(t, uniq_dates)
+    missing = [d for d in uniq_dates if not cached.get(d)]
+    by_day, errors = _fetch_news_by_day(t, missing) if missing else ({}, {})
+
+    company: list[str] = []
+
+    def company_name() -> str:
+        if not company:
+            try:
+                prof = get_finnhub_profile(t)
+                company.append((prof or {}).get("name") or "")
+            except Exception:
+                company.append("")
+        return company[0]
 
     results: list[dict[str, Any]] = []
+    save_rows: list[dict[str, Any]] = []
     for event_date in uniq_dates:
-        if force_refresh:
-            row = None
-        else:
-            row = supabase.get_stock_event_news(t, event_date)
-
+        row = cached.get(event_date)
         if row:
-            results.append(
-                {
-                    "event_date": event_date,
-                    "headline": row.get("headline"),
-                    "summary": row.get("summary"),
-                    "url": row.get("url"),
-                    "source": row.get("source"),
-                    "from_cache": True,
-                }
-            )
+            results.append(_cached_result(event_date, row))
             continue
-
-        try:
-            raw = get_company_news_safe(t, event_date, event_date)
-        except Exception as e:
-            results.append(_empty_row(event_date, str(e)))
+        if event_date in errors:
+            results.append(_empty_row(event_date, errors[event_date]))
             continue
 
-        picked = _pick_article(raw, t, company_name)
+        picked = _pick_article(by_day.get(event_date) or [], t, company_name)
         if not picked:
             results.append(_empty_row(event_date, "No articles from Finnhub for this date"))
             continue
 
         url = picked.get("url") or ""
-        url_hash = _hash_url(url)
         headline = picked.get("headline") or ""
         summary = (picked.get("summary") or "").strip() or headline
         source = picked.get("source") or ""
-        article_dt = picked.get("datetime")
-
-        save_row = {
-            "ticker": t,
-            "event_date": event_date,
-            "url_hash": url_hash,
-            "headline": headline,
-            "summary": summary[:8000] if summary else None,
-            "source": source,
-            "url": url,
-            "article_datetime": article_dt,
-        }
-        supabase.upsert_stock_event_news(save_row)
-
+        save_rows.append(
+            {
+                "ticker": t,
+                "event_date": event_date,
+                "url_hash": _hash_url(url),
+                "headline": headline,
+                "summary": summary[:8000] if summary else None,
+                "source": source,
+                "url": url,
+                "article_datetime": picked.get("datetime"),
+            }
+        )
         results.append(
             {
                 "event_date": event_date,
@@ -132,9 +221,107 @@ def get_or_fetch_event_news(
             }
         )
 
+    if save_rows:
+        supabase.upsert_stock_event_news_bulk(save_rows)
     return results
 
 
+def _release(ticker: str, dates: list[str], futures: list[Future]) -> None:
+    # A forced refresh may have replaced the entry with its own future meanwhile
+    with _memory_lock:
+        for d, future in zip(dates, futures):
+            if _pending.get((ticker, d)) is future:
+                del _pending[(ticker, d)]
+
+
+def _resolve(supabase: Any, ticker: str, dates: list[str], futures: list[Future], force_refresh: bool) -> None:
+    """Run one batched lookup and settle the futures of its dates."""
+    try:
+        rows = get_or_fetch_event_news(supabase, ticker, dates, force_refresh=force_refresh)
+    except BaseException as e:
+        _release(ticker, dates, futures)
+        for future in futures:
+            future.set_exception(e)
+        return
+    by_date = {row["event_date"]: row for row in rows}
+    with _memory_lock:
+        for d in dates:
+            row = by_date.get(d)
+            # Only articles are kept; empty days are retried like before
+            if row and row.get("headline"):
+                _memory[(ticker, d)] = row
+                _memory.move_to_end((ticker, d))
+        while len(_memory) > _MEMORY_ROWS:
+            _memory.popitem(last=False)
+    _release(ticker, dates, futures)
+    for d, future in zip(dates, futures):
+        future.set_result(by_date.get(d) or _empty_row(d, "No result"))
+
+
+def event_news_futures(
+    supabase: Any,
+    ticker: str,
+    dates: list[str],
+    force_refresh: bool = False,
+    background: bool = True,
+) -> dict[str, Future]:
+    """
+    One future per calendar day: already settled for in-process rows, shared
+    for days another caller is resolving, and new for the rest, which are
+    resolved as one batch (on the prefetch pool, or in the calling thread
+    when background=False).
+    """
+    t = (ticker or "").strip().upper()
+    uniq_dates = list(dict.fromkeys(d[:10] for d in dates if d))
+    futures: dict[str, Future] = {}
+    todo: list[str] = []
+    with _memory_lock:
+        for d in uniq_dates:
+            key = (t, d)
+            row = None if force_refresh else _memory.get(key)
+            if row is not None:
+                _memory.move_to_end(key)
+                futures[d] = Future()
+                futures[d].set_result({**row, "from_cache": True})
+            elif key in _pending and not force_refresh:
+                futures[d] = _pending[key]
+            else:
+                futures[d] = _pending[key] = Future()
+                todo.append(d)
+    if todo:
+        new = [futures[d] for d in todo]
+        if background:
+            _prefetch_pool.submit(_resolve, supabase, t, todo, new, force_refresh)
+        else:
+            _resolve(supabase, t, todo, new, force_refresh)
+    return futures
+
+
+def prefetch_event_news(supabase: Any, ticker: str, dates: list[str]) -> dict[str, Future]:
+    """Start resolving event dates in the background (no-op for rows already known)."""
+    return event_news_futures(supabase, ticker, dates)
+
+
+def get_event_news(supabase: Any, ticker: str, dates: list[str], force_refresh: bool = False) -> list[dict[str, Any]]:
+    """get_or_fetch_event_news through the in-process rows and shared in-flight lookups."""
+    if not (ticker or "").strip() or not dates:
+        return []
+    futures = event_news_futures(supabase, ticker, dates, force_refresh=force_refresh, background=False)
+    return [future.result() for future in futures.values()]
+
+
+def resolved_event_news(futures: dict[str, Future], timeout: Optional[float]) -> list[dict[str, Any]]:
+    """Rows that settle within `timeout` seconds, in date order; the rest are left running."""
+    if futures:
+        wait(list(futures.values()), timeout=timeout)
+    return [f.result() for f in futures.values() if f.done() and f.exception() is None]
+
+
+def clear_memory() -> None:
+    with _memory_lock:
+        _memory.clear()
+
+
 def _empty_row(event_date: str, message: str) -> dict[str, Any]:
     return {
         "event_date": event_date,
@@ -1,9 +1,13 @@
+import asyncio
 import os
 import re
 import requests
 from fastapi import APIRouter, HTTPException, Query
 from dotenv import load_dotenv
 from models import KeyStatistics
+from services.request_context import request_memoized
+from services.blocking_io import run_blocking
+from services.metrics import time_upstream
 
 load_dotenv()
 
@@ -32,52 +36,61 @@ def _filter_search_results(data: dict) -> dict:
     return {"count": len(filtered), "result": filtered}
 
 
+def _finnhub_get(path: str, params: dict, timeout=None) -> requests.Response:
+    """GET a Finnhub endpoint, recording its latency under the endpoint path."""
+    with time_upstream("finnhub", path) as timer:
+        response = requests.get(f"{FINNHUB_BASE_URL}{path}", params=params, timeout=timeout)
+        timer.status = response.status_code
+    return response
+
+
+@request_memoized("finnhub.quote")
 def get_finnhub_quote(symbol: str):
-    url = f"{FINNHUB_BASE_URL}/quote"
     params = {"symbol": symbol, "token": FINNHUB_API_KEY}
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/quote", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch quote data")
     return response.json()
 
+@request_memoized("finnhub.metric")
 def get_finnhub_metric(symbol: str):
-    url = f"{FINNHUB_BASE_URL}/stock/metric"
     params = {"symbol": symbol, "metric": "all", "token": FINNHUB_API_KEY}
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/stock/metric", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch metric data")
     return response.json()
 
+@request_memoized("finnhub.profile")
 def get_finnhub_profile(symbol: str):
-    url = f"{FINNHUB_BASE_URL}/stock/profile2"
     params = {"symbol": symbol, "token": FINNHUB_API_KEY}
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/stock/profile2", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch profile data")
     return response.json()
 
+@request_memoized("finnhub.search")
 def get_finnhub_search(query: str):
-    url = f"{FINNHUB_BASE_URL}/search"
     params = {"q": query, "token": FINNHUB_API_KEY}
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/search", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to search stocks")
     return response.json()
 
+@request_memoized("finnhub.company_news")
 def get_company_news(symbol: str, from_date: str, to_date: str):
-    url = f"{FINNHUB_BASE_URL}/company-news"
     params = {
         "symbol": symbol,
         "from": from_date,
         "to": to_date,
         "token": FINNHUB_API_KEY
     }
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/company-news", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch company news")
     return response.json()
 
 
+@request_memoized("finnhub.company_news_safe")
 def get_company_news_safe(symbol: str, from_date: str, to_date: str) -> list:
     """
     Same as get_company_news but returns [] on failure (for non-route callers e.g. event-news pipeline).
@@ -85,14 +98,13 @@ def get_company_news_safe(symbol: str, from_date: str, to_date: str) -> list:
     if not FINNHUB_API_KEY:
         return []
     try:
-        url = f"{FINNHUB_BASE_URL}/company-news"
         params = {
             "symbol": symbol,
             "from": from_date,
             "to": to_date,
             "token": FINNHUB_API_KEY,
         }
-        response = requests.get(url, params=params, timeout=20)
+        response = _finnhub_get("/company-news", params, timeout=20)
         if response.status_code != 200:
             return []
         data = response.json()
@@ -101,29 +113,29 @@ def get_company_news_safe(symbol: str, from_date: str, to_date: str) -> list:
         print(f"get_company_news_safe failed: {e}")
         return []
 
+@request_memoized("finnhub.financials_reported")
 def get_financials_reported(symbol: str, freq: str = "quarterly"):
-    url = f"{FINNHUB_BASE_URL}/stock/financials-reported"
     params = {"symbol": symbol, "freq": freq, "token": FINNHUB_API_KEY}
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/stock/financials-reported", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail=f"Failed to fetch financials-reported for {symbol}")
     return response.json()
 
+@request_memoized("finnhub.earnings")
 def get_stock_earnings(symbol: str):
-    url = f"{FINNHUB_BASE_URL}/stock/earnings"
     params = {"symbol": symbol, "token": FINNHUB_API_KEY}
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/stock/earnings", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail=f"Failed to fetch earnings for {symbol}")
     return response.json()
 
+@request_memoized("finnhub.market_news")
 def get_market_news(category: str = "general"):
-    url = f"{FINNHUB_BASE_URL}/news"
     params = {
         "category": category,
         "token": FINNHUB_API_KEY
     }
-    response = requests.get(url, params=params)
+    response = _finnhub_get("/news", params)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch market news")
     return response.json()
@@ -133,7 +145,7 @@ async def search_stocks(q: str = Query(..., description="Search query")):
     if not FINNHUB_API_KEY:
         raise HTTPException(status_code=500, detail="API Key not configured")
     try:
-        return _filter_search_results(get_finnhub_search(q.strip()))
+        return _filter_search_results(await run_blocking(get_finnhub_search, q.strip()))
     except HTTPException:
         raise
     except Exception as e:
@@ -145,10 +157,12 @@ async def get_key_statistics(symbol: str = Query(..., description="Stock symbol"
         raise HTTPException(status_code=500, detail="API Key not configured")
     
     try:
-        # Fetch data from Finnhub
-        quote_data = get_finnhub_quote(symbol)
-        metric_data = get_finnhub_metric(symbol)
-        profile_data = get_finnhub_profile(symbol)
+        # Fetch data from Finnhub (independent calls, run concurrently off the event loop)
+        quote_data, metric_data, profile_data = await asyncio.gather(
+            run_blocking(get_finnhub_quote, symbol),
+            run_blocking(get_finnhub_metric, symbol),
+            run_blocking(get_finnhub_profile, symbol),
+        )
         
         metrics = metric_data.get("metric", {})
         
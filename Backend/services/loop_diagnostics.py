@@ -0,0 +1,227 @@
+"""
+Opt-in event-loop lag and blocking-call detector.
+
+Enable with LOOP_DIAGNOSTICS=1. Two cooperating parts:
+
+  * a probe coroutine on the event loop that wakes every LOOP_PROBE_INTERVAL_MS
+    and records how late it woke up (the loop lag), and
+  * a watchdog thread that notices when the probe has not run for longer than
+    LOOP_BLOCK_THRESHOLD_MS and samples the loop thread's stack while it is
+    still stuck.
+
+Each stall is attributed to the HTTP route being served (read from the ASGI
+scope on the stack) and to the innermost backend service function, aggregated
+per route/service, logged as a JSON line, and exposed via GET /debug/loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+from typing import Any, Optional
+
+ENABLED = os.getenv("LOOP_DIAGNOSTICS", "0").lower() in ("1", "true", "yes")
+PROBE_INTERVAL_MS = float(os.getenv("LOOP_PROBE_INTERVAL_MS", "100"))
+BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+
+# Modules whose frames identify "which service function was blocking"
+_SERVICE_MODULE_PREFIXES = ("services.", "database")
+_ROUTER_MODULE_PREFIXES = ("routers.", "main")
+_STACK_DEPTH = 25
+
+logger = logging.getLogger("loop_diagnostics")
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def attribute_stack(frame) -> dict[str, Any]:
+    """
+    Walk a frame stack (innermost first) and pick out the ASGI route, the
+    router handler and the innermost backend service function.
+    """
+    route = None
+    handler = None
+    service = None
+    f = frame
+    while f is not None:
+        module = f.f_globals.get("__name__", "")
+        if service is None and module.startswith(_SERVICE_MODULE_PREFIXES) and module != __name__:
+            service = f"{module}.{f.f_code.co_name}"
+        if handler is None and module.startswith(_ROUTER_MODULE_PREFIXES):
+            handler = f"{module}.{f.f_code.co_name}"
+        if route is None:
+            scope = f.f_locals.get("scope")
+            if isinstance(scope, dict) and scope.get("type") == "http":
+                route_obj = scope.get("route")
+                path = getattr(route_obj, "path", None) or scope.get("path")
+                route = f"{scope.get('method', '')} {path}".strip()
+        f = f.f_back
+    return {"route": route or "<no request>", "handler": handler, "service": service}
+
+
+class LoopMonitor:
+    def __init__(self, interval_ms: float = PROBE_INTERVAL_MS, threshold_ms: float = BLOCK_THRESHOLD_MS,
+                 max_events: int = 50, max_samples: int = 600):
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.lag_samples: deque[float] = deque(maxlen=max_samples)
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self.blocked_ms_by_route: dict[str, float] = defaultdict(float)
+        self.blocked_ms_by_service: dict[str, float] = defaultdict(float)
+        self.stalls_total = 0
+        self.max_lag_ms = 0.0
+
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._pending_sample: Optional[dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                            #
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        """Start the probe on the running loop and the watchdog thread."""
+        if self._probe_task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        # A fresh event per run: a watchdog from an earlier run can never be revived by clear()
+        self._stop = threading.Event()
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, args=(self._stop,), name="loop-watchdog",
+                                          daemon=True)
+        self._watchdog.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Cancel the probe and wait (briefly) for the watchdog thread to exit."""
+        self._stop.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._watchdog is not None:
+            if self._watchdog is not threading.current_thread():
+                self._watchdog.join(timeout)
+            self._watchdog = None
+
+    # ------------------------------------------------------------------ #
+    # Probe (event loop) and watchdog (thread)                             #
+    # ------------------------------------------------------------------ #
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._heartbeat = now
+                self.lag_samples.append(lag * 1000.0)
+                self.max_lag_ms = max(self.max_lag_ms, lag * 1000.0)
+                sample, self._pending_sample = self._pending_sample, None
+            if lag >= self.threshold:
+                self._record_stall(lag, sample)
+
+    def _watch(self, stop: threading.Event) -> None:
+        poll = max(self.threshold / 2.0, 0.005)
+        while not stop.wait(poll):
+            with self._lock:
+                stalled_for = time.monotonic() - self._heartbeat - self.interval
+                need_sample = stalled_for >= self.threshold and self._pending_sample is None
+            if not need_sample:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            sample = attribute_stack(frame)
+            sample["stack"] = traceback.format_stack(frame, limit=_STACK_DEPTH)
+            del frame
+            with self._lock:
+                if self._pending_sample is None:
+                    self._pending_sample = sample
+
+    def _record_stall(self, lag: float, sample: Optional[dict]) -> None:
+        sample = sample or {"route": "<unsampled>", "handler": None, "service": None, "stack": []}
+        blocked_ms = round(lag * 1000.0, 1)
+        event = {
+            "event": "loop_blocked",
+            "blocked_ms": blocked_ms,
+            "route": sample["route"],
+            "handler": sample["handler"],
+            "service": sample["service"],
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "stack": [line.rstrip() for line in sample["stack"]],
+        }
+        with self._lock:
+            self.stalls_total += 1
+            self.events.append(event)
+            self.blocked_ms_by_route[event["route"]] += blocked_ms
+            if event["service"]:
+                self.blocked_ms_by_service[event["service"]] += blocked_ms
+        logger.warning(json.dumps({k: v for k, v in event.items() if k != "stack"}))
+
+    # ------------------------------------------------------------------ #
+    # Reporting                                                            #
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = sorted(self.lag_samples)
+            current = self.lag_samples[-1] if self.lag_samples else 0.0
+            return {
+                "enabled": True,
+                "probe_interval_ms": self.interval * 1000.0,
+                "block_threshold_ms": self.threshold * 1000.0,
+                "lag_ms": {
+                    "current": round(current, 2),
+                    "p50": round(_percentile(samples, 50), 2),
+                    "p99": round(_percentile(samples, 99), 2),
+                    "max": round(self.max_lag_ms, 2),
+                    "samples": len(samples),
+                },
+                "stalls_total": self.stalls_total,
+                "blocked_ms_by_route": dict(sorted(self.blocked_ms_by_route.items(), key=lambda kv: -kv[1])),
+                "blocked_ms_by_service": dict(sorted(self.blocked_ms_by_service.items(), key=lambda kv: -kv[1])),
+                "recent_stalls": list(self.events)[::-1],
+            }
+
+
+monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_diagnostics() -> Optional[LoopMonitor]:
+    """Start the monitor on the running loop if LOOP_DIAGNOSTICS is enabled."""
+    global monitor
+    if not ENABLED:
+        return None
+    if monitor is None:
+        monitor = LoopMonitor()
+    monitor.start()
+    print(f"[LoopDiagnostics] Enabled — probe every {PROBE_INTERVAL_MS:.0f}ms, "
+          f"stalls >= {BLOCK_THRESHOLD_MS:.0f}ms are sampled")
+    return monitor
+
+
+def stop_loop_diagnostics() -> None:
+    if monitor is not None:
+        monitor.stop()
+
+
+def loop_diagnostics_snapshot() -> dict[str, Any]:
+    if monitor is None:
+        return {"enabled": False, "hint": "Set LOOP_DIAGNOSTICS=1 to enable event-loop lag tracking."}
+    return monitor.snapshot()
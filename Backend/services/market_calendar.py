@@ -0,0 +1,192 @@
+"""
+NYSE session calendar: regular hours, exchange holidays and 1 PM early closes.
+
+Sessions are precomputed per year from the exchange rules (observed fixed
+holidays, Monday holidays, Good Friday, Thanksgiving, one-off closures) into
+a list plus two per-calendar-day index tables, so last_close() and
+next_open() are constant-time lookups instead of walking back over weekends.
+The table grows on demand when asked about a year outside it.
+
+All times are America/New_York; naive datetimes are taken to be ET.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+
+import pytz
+
+ET = pytz.timezone("America/New_York")
+
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Unscheduled full-day closures (national days of mourning)
+SPECIAL_CLOSURES = {date(2018, 12, 5), date(2025, 1, 9)}
+
+
+class Session(NamedTuple):
+    day: date
+    open: datetime
+    close: datetime
+
+    @property
+    def early_close(self) -> bool:
+        return self.close.time() != REGULAR_CLOSE
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> Optional[date]:
+    """Saturday holidays move to Friday, Sunday ones to Monday."""
+    if day.weekday() == 5:
+        # NYSE does not close the preceding Friday when it falls in the prior year
+        return None if (day.month, day.day) == (1, 1) else day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def holidays(year: int) -> set[date]:
+    days = {
+        _observed(date(year, 1, 1)),
+        _nth_weekday(year, 1, 0, 3),            # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),            # Washington's Birthday
+        _easter(year) - timedelta(days=2),      # Good Friday
+        _last_weekday(year, 5, 0),              # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),            # Labor Day
+        _nth_weekday(year, 11, 3, 4),           # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    days.discard(None)
+    days.update(d for d in SPECIAL_CLOSURES if d.year == year)
+    return days
+
+
+def early_closes(year: int) -> set[date]:
+    closed = holidays(year)
+    candidates = {
+        date(year, 7, 3),                                   # Independence Day eve
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),   # day after Thanksgiving
+        date(year, 12, 24),                                 # Christmas Eve
+    }
+    return {d for d in candidates if d.weekday() < 5 and d not in closed}
+
+
+_lock = threading.Lock()
+_sessions: list[Session] = []
+_years: tuple[int, int] = (0, -1)   # first and last year covered
+_prev_index: list[int] = []   # per calendar day: last session on or before it (-1 if none)
+_next_index: list[int] = []   # per calendar day: first session on or after it
+
+
+def _build(first_year: int, last_year: int) -> None:
+    global _sessions, _years, _prev_index, _next_index
+    closed, short = set(), set()
+    for year in range(first_year, last_year + 1):
+        closed |= holidays(year)
+        short |= early_closes(year)
+    sessions, prev_index, next_index = [], [], []
+    day, end = date(first_year, 1, 1), date(last_year, 12, 31)
+    while day <= end:
+        is_session = day.weekday() < 5 and day not in closed
+        if is_session:
+            close_time = EARLY_CLOSE if day in short else REGULAR_CLOSE
+            sessions.append(Session(day, ET.localize(datetime.combine(day, REGULAR_OPEN)),
+                                    ET.localize(datetime.combine(day, close_time))))
+        prev_index.append(len(sessions) - 1)
+        next_index.append(len(sessions) - 1 if is_session else len(sessions))
+        day += timedelta(days=1)
+    _sessions, _years, _prev_index, _next_index = sessions, (first_year, last_year), prev_index, next_index
+
+
+def _locate(day: date) -> tuple[list[Session], int, int]:
+    """
+    (sessions, last session on or before `day`, first session on or after
+    `day`), extending the tables if needed.
+    """
+    with _lock:
+        first, last = _years
+        # Keep a year of margin on both sides so the neighbouring sessions exist
+        if not first < day.year < last:
+            first = min(first, day.year - 1) if last >= first else day.year - 1
+            last = max(last, day.year + 1)
+            _build(first, last)
+        offset = (day - date(first, 1, 1)).days
+        return _sessions, _prev_index[offset], _next_index[offset]
+
+
+def _to_et(now: Optional[datetime]) -> datetime:
+    if now is None:
+        return datetime.now(ET)
+    return ET.localize(now) if now.tzinfo is None else now.astimezone(ET)
+
+
+def session_for(day: date) -> Optional[Session]:
+    """The trading session on `day`, or None on weekends and holidays."""
+    sessions, i, _ = _locate(day)
+    return sessions[i] if i >= 0 and sessions[i].day == day else None
+
+
+def is_trading_day(day: date) -> bool:
+    return session_for(day) is not None
+
+
+def is_open(now: Optional[datetime] = None) -> bool:
+    now = _to_et(now)
+    session = session_for(now.date())
+    return session is not None and session.open <= now < session.close
+
+
+def previous_session(day: date) -> Session:
+    """The last session strictly before `day`."""
+    sessions, _, i = _locate(day)
+    return sessions[i - 1]
+
+
+def last_close(now: Optional[datetime] = None) -> datetime:
+    """The most recent session close at or before `now`."""
+    now = _to_et(now)
+    sessions, i, _ = _locate(now.date())
+    if sessions[i].day == now.date() and now < sessions[i].close:
+        i -= 1
+    return sessions[i].close
+
+
+def next_open(now: Optional[datetime] = None) -> datetime:
+    """The first session open after `now` (now itself if a session opens at this instant)."""
+    now = _to_et(now)
+    sessions, _, i = _locate(now.date())
+    if sessions[i].day == now.date() and now > sessions[i].open:
+        i += 1
+    return sessions[i].open
+
+
+# Cover the five-year chart lookback up front; other years are added on demand
+_build(datetime.now(ET).year - 6, datetime.now(ET).year + 2)
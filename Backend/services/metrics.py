@@ -0,0 +1,224 @@
+"""
+In-process metrics: counters and latency histograms, exported in Prometheus
+text format at GET /metrics.
+
+Hooks on the hot path are a dict lookup, a lock and a bisect — no I/O, no
+formatting — so they can sit on every upstream call and every request:
+
+    with time_upstream("finnhub", "quote"):
+        response = requests.get(...)
+
+    record_cache("bars", hit=True)
+    record_llm_tokens(model, data.get("usage"))
+
+Upstream services: finnhub, twelvedata, ai100, supabase, resend.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Upper bounds (seconds) for latency histograms; +Inf is implicit.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_str(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_label_str(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._series.items())
+        for values, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_label_str(self.labels, values, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_label_str(self.labels, values, le)} {n}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, values)} {n}")
+        return lines
+
+
+# ─── Registry ────────────────────────────────────────────────────────────────
+
+upstream_latency = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to upstream services.",
+    ("service", "endpoint", "outcome"),
+)
+cache_requests = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "LLM tokens reported by the AI100 endpoint.",
+    ("model", "kind"),
+)
+route_latency = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route template.",
+    ("method", "route", "status"),
+)
+
+REGISTRY = (upstream_latency, cache_requests, llm_tokens, route_latency)
+
+
+# ─── Hot-path hooks ──────────────────────────────────────────────────────────
+
+class _UpstreamTimer:
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status: Optional[int] = None
+
+
+@contextmanager
+def time_upstream(service: str, endpoint: str) -> Iterator[_UpstreamTimer]:
+    """
+    Time one upstream call. Set `timer.status` to the HTTP status code to
+    have non-2xx responses counted as errors; exceptions are counted as errors.
+    """
+    timer = _UpstreamTimer()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield timer
+        outcome = "ok" if timer.status is None or timer.status < 400 else "error"
+    finally:
+        upstream_latency.observe(time.perf_counter() - start, service, endpoint, outcome)
+
+
+def observe_upstream(service: str, endpoint: str, seconds: float, ok: bool = True) -> None:
+    upstream_latency.observe(seconds, service, endpoint, "ok" if ok else "error")
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    cache_requests.inc(cache, "hit" if hit else "miss")
+
+
+def record_llm_tokens(model: str, usage: Optional[dict]) -> None:
+    """Record the OpenAI-style `usage` block of a chat/completions response."""
+    if not usage:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        n = usage.get(kind)
+        if n:
+            llm_tokens.inc(model, kind.split("_")[0], amount=float(n))
+
+
+async def route_latency_middleware(request, call_next):
+    """Record latency per route template (not raw path, to bound cardinality)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        template = getattr(route, "path", None) or "<unmatched>"
+        route_latency.observe(time.perf_counter() - start, request.method, template, str(status))
+
+
+def _supabase_endpoint(request) -> str:
+    # /rest/v1/<table> or /rest/v1/rpc/<function>
+    path = request.url.path
+    tail = path.split("/rest/v1/", 1)[-1] or path
+    return f"{request.method} {tail}"
+
+
+def instrument_supabase_client(client) -> None:
+    """
+    Attach httpx event hooks to a Supabase client's PostgREST session so every
+    table/RPC call is timed under service="supabase".
+    """
+    try:
+        session = client.postgrest.session
+    except Exception:
+        return
+
+    def on_request(request):
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    def on_response(response):
+        start = response.request.extensions.get("metrics_start")
+        if start is None:
+            return
+        response.read()
+        observe_upstream("supabase", _supabase_endpoint(response.request),
+                         time.perf_counter() - start, ok=response.status_code < 400)
+
+    session.event_hooks["request"].append(on_request)
+    session.event_hooks["response"].append(on_response)
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
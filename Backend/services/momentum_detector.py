@@ -0,0 +1,177 @@
+"""
+Incremental sliding-window momentum detection (MOMENTUM_* notifications).
+
+For each symbol and window (e.g. 2h at >= 5%) the detector keeps two
+monotonic deques over the prices inside the window: lows in increasing
+order for the window minimum and highs in decreasing order for the maximum.
+Each update appends one point, pops dominated points from the tail and
+expired points from the head, so the window min and max cost O(1) amortized
+per update however many bars or ticks arrive.
+
+A move is measured from the window's extreme to the current price: up from
+the lowest low, down from the highest high. Both extremes precede the
+current price, so a swing inside the window is caught even when the first
+and last bars of the window are close together.
+
+Bars are fed as (ts, close, low, high) and ticks as (ts, price). update()
+records a point; peek() evaluates a tentative one (the still-forming last
+bar) without recording it, so a bar that is revised later is never counted
+twice.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
+
+
+class MomentumWindow(NamedTuple):
+    label: str          # e.g. "2h"; MOMENTUM_2H notifications
+    seconds: int
+    threshold_pct: float
+
+
+class MomentumSignal(NamedTuple):
+    symbol: str
+    window: MomentumWindow
+    pct: float
+    from_ts: int
+    from_price: float
+    from_time: Any
+    to_ts: int
+    to_price: float
+    to_time: Any
+
+
+_UNITS = {"m": 60, "h": 3600}
+
+
+def parse_windows(spec: str) -> list[MomentumWindow]:
+    """'30m:3,2h:5' -> a 30-minute window at >= 3% and a 2-hour window at >= 5%."""
+    windows = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        match = re.fullmatch(r"(\d+)([mh]):(\d+(?:\.\d+)?)", part)
+        if not match:
+            raise ValueError(f"Invalid momentum window {part!r}; expected e.g. '2h:5' or '30m:3'")
+        amount, unit, threshold = match.groups()
+        windows.append(MomentumWindow(f"{amount}{unit}", int(amount) * _UNITS[unit], float(threshold)))
+    return windows
+
+
+class _Window:
+    """Monotonic min/max deques over one symbol's points inside one window."""
+
+    __slots__ = ("spec", "lows", "highs")
+
+    def __init__(self, spec: MomentumWindow):
+        self.spec = spec
+        self.lows: deque[tuple[int, float, Any]] = deque()   # increasing prices
+        self.highs: deque[tuple[int, float, Any]] = deque()  # decreasing prices
+
+    def expire(self, ts: int) -> None:
+        start = ts - self.spec.seconds
+        while self.lows and self.lows[0][0] < start:
+            self.lows.popleft()
+        while self.highs and self.highs[0][0] < start:
+            self.highs.popleft()
+
+    def push(self, ts: int, low: float, high: float, at: Any) -> None:
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((ts, low, at))
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((ts, high, at))
+
+    def evaluate(self, symbol: str, ts: int, price: float, low: float, high: float,
+                 at: Any) -> Optional[MomentumSignal]:
+        """The strongest extreme-to-price move if it reaches the threshold (the point itself included)."""
+        lowest = self.lows[0] if self.lows and self.lows[0][1] < low else (ts, low, at)
+        highest = self.highs[0] if self.highs and self.highs[0][1] > high else (ts, high, at)
+        up = (price - lowest[1]) / lowest[1] * 100 if lowest[1] > 0 else 0.0
+        down = (price - highest[1]) / highest[1] * 100 if highest[1] > 0 else 0.0
+        pct, start = (up, lowest) if up >= -down else (down, highest)
+        if abs(pct) < self.spec.threshold_pct or pct == 0:
+            return None
+        return MomentumSignal(symbol, self.spec, pct, start[0], start[1], start[2], ts, price, at)
+
+
+class MomentumDetector:
+    """Sliding-window momentum for many symbols over the same set of windows."""
+
+    def __init__(self, windows: Sequence[MomentumWindow]):
+        self.windows = list(windows)
+        self._symbols: dict[str, list[_Window]] = {}
+        self._last_ts: dict[str, int] = {}
+
+    def _state(self, symbol: str) -> list[_Window]:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = [_Window(w) for w in self.windows]
+        return state
+
+    def last_ts(self, symbol: str) -> Optional[int]:
+        """Time of the last recorded point for the symbol."""
+        return self._last_ts.get(symbol)
+
+    def update(self, symbol: str, ts: int, price: float, low: Optional[float] = None,
+               high: Optional[float] = None, at: Any = None) -> list[MomentumSignal]:
+        """Record a bar or tick and return the windows whose move reaches their threshold."""
+        last = self._last_ts.get(symbol)
+        if last is not None and ts <= last:
+            return []  # already recorded (points must arrive in time order)
+        low = price if low is None else min(low, price)
+        high = price if high is None else max(high, price)
+        signals = []
+        for window in self._state(symbol):
+            window.expire(ts)
+            signal = window.evaluate(symbol, ts, price, low, high, at)
+            if signal:
+                signals.append(signal)
+            window.push(ts, low, high, at)
+        self._last_ts[symbol] = ts
+        return signals
+
+    def peek(self, symbol: str, ts: int, price: float, low: Optional[float] = None,
+             high: Optional[float] = None, at: Any = None) -> list[MomentumSignal]:
+        """Like update() for a point that may still change; nothing is recorded."""
+        low = price if low is None else min(low, price)
+        high = price if high is None else max(high, price)
+        signals = []
+        for window in self._state(symbol):
+            window.expire(ts)
+            signal = window.evaluate(symbol, ts, price, low, high, at)
+            if signal:
+                signals.append(signal)
+        return signals
+
+    def feed_bars(self, symbol: str, ts: Sequence[int], close: Sequence[float], low: Sequence[float],
+                  high: Sequence[float], times: Optional[Sequence[Any]] = None,
+                  partial_last: bool = True) -> list[MomentumSignal]:
+        """
+        Record bars in time order (already-recorded ones are skipped). With
+        partial_last the newest bar is only peeked at, since it may be revised.
+        """
+        n = len(ts)
+        done = n - 1 if partial_last else n
+        signals = []
+        for i in range(n):
+            at = times[i] if times is not None else None
+            point = (symbol, int(ts[i]), float(close[i]), float(low[i]), float(high[i]), at)
+            signals.extend(self.update(*point) if i < done else self.peek(*point))
+        return signals
+
+    def reset(self, symbols: Optional[Iterable[str]] = None) -> None:
+        for symbol in (list(self._symbols) if symbols is None else symbols):
+            self._symbols.pop(symbol, None)
+            self._last_ts.pop(symbol, None)
+
+
+def strongest(signals: Iterable[MomentumSignal]) -> dict[tuple[str, str], MomentumSignal]:
+    """The largest |move| per (symbol, window label)."""
+    best: dict[tuple[str, str], MomentumSignal] = {}
+    for s in signals:
+        key = (s.symbol, s.window.label)
+        if key not in best or abs(s.pct) > abs(best[key].pct):
+            best[key] = s
+    return best
@@ -0,0 +1,165 @@
+"""
+In-process notification event bus behind GET /notifications/stream (SSE).
+
+Publishers (the notification worker, news briefings, the price monitor and
+the dismiss/clear-all routes) call publish() from any thread; every connected
+stream receives the event on its own event loop. Event names:
+
+  notification  a new panel item (market move, news briefing or reminder alert)
+  dismiss       {"id": ...} was dismissed
+  clear         everything was cleared
+  reset         the client missed events it cannot replay: reload with GET /notifications
+
+The last NOTIFICATION_BUS_REPLAY events are kept so a reconnecting client
+(EventSource sends Last-Event-ID) gets what it missed; GET /notifications
+returns last_id() so the first connection can resume from the panel load too. Ids are
+`<boot>-<seq>`; an id from another process, or one older than the buffer,
+gets a reset instead. A subscriber that falls QUEUE_SIZE events behind is
+reset too rather than holding memory.
+
+The bus lives in one process: run a single API worker, or have every
+worker generate its own events.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Optional
+
+REPLAY_SIZE = int(os.getenv("NOTIFICATION_BUS_REPLAY", "500"))
+HEARTBEAT_S = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_S", "15"))
+QUEUE_SIZE = 256
+RETRY_MS = 3000  # EventSource reconnect delay
+
+_BOOT = format(int(time.time() * 1000), "x")
+
+
+class Event:
+    __slots__ = ("seq", "name", "data")
+
+    def __init__(self, seq: int, name: str, data: Any):
+        self.seq = seq
+        self.name = name
+        self.data = data
+
+    @property
+    def id(self) -> str:
+        return f"{_BOOT}-{self.seq}"
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.name}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+
+    def _put(self, event: Event) -> None:
+        """Runs on the subscriber's loop. When the queue is full, replace its backlog with a reset."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_reset(event.seq))
+
+
+_lock = threading.Lock()
+_seq = 0
+_history: deque[Event] = deque(maxlen=REPLAY_SIZE)
+_subscribers: set[Subscriber] = set()
+
+
+def _reset(seq: int) -> Event:
+    return Event(seq, "reset", {})
+
+
+def publish(name: str, data: Any) -> Event:
+    """Record an event and hand it to every subscriber (safe from any thread)."""
+    global _seq
+    with _lock:
+        _seq += 1
+        event = Event(_seq, name, data)
+        _history.append(event)
+        subscribers = list(_subscribers)
+    for sub in subscribers:
+        try:
+            sub.loop.call_soon_threadsafe(sub._put, event)
+        except RuntimeError:  # loop closed without unsubscribing
+            unsubscribe(sub)
+    return event
+
+
+def _parse_id(event_id: Optional[str]) -> Optional[int]:
+    """The sequence number of an id from this process, else None."""
+    boot, _, seq = (event_id or "").partition("-")
+    if boot != _BOOT or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def subscribe(last_event_id: Optional[str] = None) -> tuple[Subscriber, list[Event]]:
+    """
+    Register the calling loop for new events. Returns the events to send first:
+    those after last_event_id, or a single reset when they can't be replayed.
+    """
+    sub = Subscriber(asyncio.get_running_loop())
+    with _lock:
+        _subscribers.add(sub)
+        if not last_event_id:
+            return sub, []
+        seq = _parse_id(last_event_id)
+        oldest = _history[0].seq if _history else _seq + 1
+        if seq is None or seq > _seq or seq < oldest - 1:
+            return sub, [_reset(_seq)]
+        return sub, [e for e in _history if e.seq > seq]
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    with _lock:
+        _subscribers.discard(sub)
+
+
+async def sse_stream(last_event_id: Optional[str] = None, heartbeat: float = HEARTBEAT_S) -> AsyncIterator[str]:
+    """Server-sent events for one client: replay, then live events with keep-alive comments."""
+    sub, replay = subscribe(last_event_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        for event in replay:
+            yield event.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield event.encode()
+    finally:
+        unsubscribe(sub)
+
+
+def last_id() -> str:
+    """
+    Id of the newest event. A client that reads the panel with GET /notifications
+    connects with it as its Last-Event-ID, so events published in between are replayed.
+    """
+    with _lock:
+        return f"{_BOOT}-{_seq}"
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        return {"subscribers": len(_subscribers), "last_id": f"{_BOOT}-{_seq}", "buffered": len(_history)}
+
+
+def clear() -> None:
+    global _seq
+    with _lock:
+        _history.clear()
+        _subscribers.clear()
+        _seq = 0
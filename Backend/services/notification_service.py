@@ -1,27 +1,46 @@
 """
 Notification Service — Three Notification Types
 
-Uses existing bars_1m data in SQLite (no extra API calls).
+Uses existing bars_1m data in Supabase (no extra API calls). A poll is
+set-based: the three checks plan their due notifications, then one query
+reads which ids already exist, one bars_1m_window_stats RPC reads the
+first/last (and, for momentum, min/max) bars of every window, percent changes are computed for all
+symbols at once and new notifications are saved with one upsert.
 
 Types:
-  1. DAILY_EOD    — ≥ 0% move during the trading day. Triggered once after 4 PM ET.
-  2. MOMENTUM_2H  — ≥ 5% move in the last 2 hours. Checked every 15 min.
-  3. MORNING_GAP  — ≥ 0% gap (today open vs yesterday close). Triggered once after 9:45 AM ET.
-
-Each notification is generated once and persisted in `generated_notifications` table.
-If a stock is added to the watchlist after the trigger time, it still gets checked on the next poll.
+  1. DAILY_EOD    — ≥ 0% move during the trading day. Triggered once after the close
+                    (4 PM ET, 1 PM on early-close days).
+  2. MOMENTUM_2H  — ≥ 5% move within the last 2 hours (window extreme to latest price,
+                    services.momentum_detector). Checked every 15 min during the session;
+                    MOMENTUM_WINDOWS adds windows, e.g. "30m:3,2h:5".
+  3. MORNING_GAP  — ≥ 0% gap (today open vs previous session close). Triggered once after 9:45 AM ET.
+
+Trigger times come from services.market_calendar, so nothing fires on weekends
+or exchange holidays.
+
+Checks run in the background (services.notification_worker); GET /notifications
+only reads what they saved. Each notification is generated once and persisted in
+`generated_notifications` table. If a stock is added to the watchlist after the
+trigger time, it still gets checked on the next run.
 """
 
+import os
+import threading
 from datetime import datetime, timedelta
+from typing import Optional
 from database import (
     get_watchlist,
-    save_generated_notification, notification_exists,
-    get_generated_notifications_for_date,
-    get_bars_1m_range, get_bars_1m_row,
+    save_generated_notifications, get_existing_notification_ids,
+    get_generated_notifications_for_date, row_cursor,
+    get_bars_1m_window_stats,
 )
+from services.bar_cache import bar_cache
+from services.momentum_detector import MomentumDetector, MomentumSignal, parse_windows, strongest
 from services.stock_manager import manager as data_manager
+from services import market_calendar, notification_bus
 import pytz
 import json
+import numpy as np
 
 try:
     from services.email_service import send_notification_email
@@ -35,17 +54,12 @@ MOMENTUM_2H_THRESHOLD = 5.0    # percent
 MORNING_GAP_THRESHOLD = 0.0    # percent (Trigger on any gap)
 LOOKBACK_HOURS = 2
 MOMENTUM_INTERVAL_MIN = 15     # generate a new momentum check every 15 min
+MORNING_GAP_DELAY_MIN = 15     # the gap is checked this long after the open
 
-
-def _get_bars_1m_range_local(symbol: str, start: str, end: str = None):
-    """Get earliest and latest bars_1m rows for a symbol in a time range."""
-    return get_bars_1m_range(symbol, start, end)
-
-
-def _calc_pct_change(open_price: float, close_price: float) -> float:
-    if open_price == 0:
-        return 0.0
-    return ((close_price - open_price) / open_price) * 100
+# Momentum windows and thresholds, e.g. "30m:3,2h:5" (MOMENTUM_<LABEL> notifications)
+MOMENTUM_WINDOWS = parse_windows(os.getenv("MOMENTUM_WINDOWS", f"{LOOKBACK_HOURS}h:{MOMENTUM_2H_THRESHOLD:g}"))
+_momentum = MomentumDetector(MOMENTUM_WINDOWS)
+_momentum_lock = threading.Lock()
 
 
 def _format_time(dt_str: str) -> str:
@@ -133,125 +147,170 @@ def _make_notification(notif_id: str, notif_type: str, symbol: str, name: str,
     }
 
 
-# ===== 1. Daily End-of-Day (after 4 PM ET) =====
+def publish_notifications(notifications: list[dict]):
+    """Push just-saved notifications to connected /notifications/stream clients, in the panel shape."""
+    created_at = datetime.now().isoformat()
+    for n in notifications:
+        row = {**n, "percent_change": n["percentChange"], "created_at": created_at,
+               "articles_json": n.get("articles", "")}
+        notification_bus.publish("notification", _notification_from_row(row))
 
-def _check_daily_eod(watchlist) -> list[dict]:
+
+def _save_and_email(notifications: list[dict]):
+    save_generated_notifications(notifications)
+    publish_notifications(notifications)
+    if not send_notification_email:
+        return
+    for n in notifications:
+        try:
+            send_notification_email(n)
+        except Exception as e:
+            print(f"  [Email] Error sending notification email: {e}")
+
+
+def _candidate(item: dict, notif_id: str, notif_type: str, date_str: str, threshold: float,
+               windows: list[dict], base: tuple[str, str], target: tuple[str, str],
+               latest: str = None, move: MomentumSignal = None) -> dict:
     """
-    After 4 PM ET, compare 9:30 AM open to latest close for the day.
-    Triggered once per symbol per day.
+    One notification that is due unless it already exists. The move is the
+    `base` bar -> `target` bar, each a (window key, "first" | "last") edge of
+    the symbol's bars_1m windows; `latest` caps the target bar's time. A base
+    edge of "extreme" is the window's low or high, whichever the target moved
+    further from (the window must be read with extremes).
+    A detector signal passed as `move` is used as-is (no windows to read).
     """
-    now_et = datetime.now(ET)
-    today_str = now_et.strftime("%Y-%m-%d")
+    return {
+        "item": item, "id": notif_id, "type": notif_type, "date": date_str, "threshold": threshold,
+        "windows": windows, "base": base, "target": target, "latest": latest, "move": move,
+    }
 
-    # Only trigger after market close (4:00 PM ET)
-    market_close = now_et.replace(hour=16, minute=0, second=0, microsecond=0)
 
-    new_notifications = []
+def _added_after(item: dict, moment: datetime) -> bool:
+    """Whether the watchlist item was added after `moment` (compared in ET when `moment` is aware)."""
+    stock_added_at = item.get("added_at", "")
+    if not stock_added_at:
+        return False
+    try:
+        added_dt = datetime.fromisoformat(stock_added_at)
+        if moment.tzinfo:
+            return added_dt.astimezone(ET) > moment.astimezone(ET)
+        return added_dt > moment
+    except (ValueError, TypeError):
+        return False
 
-    for item in watchlist:
-        symbol = item["symbol"]
-        name = item.get("name", symbol)
-        notif_id = f"{symbol}_DAILY_EOD_{today_str}"
 
-        # Skip if already generated
-        if notification_exists(notif_id):
-            continue
+# ===== 1. Daily End-of-Day (after 4 PM ET) =====
 
-        # Only fire after market close, OR if stock was added after market close
-        stock_added_at = item.get("added_at", "")
-        added_after_close = False
-        if stock_added_at:
-            try:
-                added_dt = datetime.fromisoformat(stock_added_at)
-                if added_dt.astimezone(ET) > market_close.astimezone(ET) if market_close.tzinfo else added_dt > market_close.replace(tzinfo=None):
-                    added_after_close = True
-            except (ValueError, TypeError):
-                pass
-
-        if now_et < market_close and not added_after_close:
-            continue
+def _plan_daily_eod(watchlist) -> list[dict]:
+    """
+    After 4 PM ET, compare 9:30 AM open to latest close for the day.
+    Triggered once per symbol per day.
+    """
+    now_et = datetime.now(ET)
+    today_str = now_et.strftime("%Y-%m-%d")
 
-        # Compare 9:30 AM open to last close of the day
-        market_open_str = now_et.replace(hour=9, minute=30, second=0).strftime("%Y-%m-%d %H:%M:%S")
-        earliest, latest = _get_bars_1m_range_local(symbol, market_open_str)
+    session = market_calendar.session_for(now_et.date())
+    if session is None:
+        return []  # weekend or exchange holiday: no session to report
 
-        if not earliest or not latest:
-            continue
+    # Only trigger after market close (4:00 PM ET, 1:00 PM on early-close days),
+    # OR if the stock was added after the close
+    market_close = session.close
+    market_open_str = session.open.strftime("%Y-%m-%d %H:%M:%S")
 
-        open_price = float(earliest["close"])
-        close_price = float(latest["close"])
-        pct = _calc_pct_change(open_price, close_price)
+    return [
+        _candidate(item, f"{item['symbol']}_DAILY_EOD_{today_str}", "DAILY_EOD", today_str, DAILY_EOD_THRESHOLD,
+                   [{"key": "session", "symbol": item["symbol"], "start": market_open_str}],
+                   base=("session", "first"), target=("session", "last"))
+        for item in watchlist
+        if now_et >= market_close or _added_after(item, market_close)
+    ]
 
-        if abs(pct) >= DAILY_EOD_THRESHOLD:
-            n = _make_notification(
-                notif_id, "DAILY_EOD", symbol, name, today_str,
-                pct, open_price, close_price, earliest["datetime"], latest["datetime"]
-            )
-            save_generated_notification(n)
-            try:
-                if send_notification_email:
-                    send_notification_email(n)
-            except Exception as e:
-                print(f"  [Email] Error sending notification email: {e}")
-            new_notifications.append(n)
 
-    return new_notifications
+# ===== 2. Two-Hour Momentum (every 15 min) =====
 
+def _wall_ts(dt: datetime) -> int:
+    """ET wall time as epoch seconds, the bar cache's ts."""
+    return int(np.datetime64(dt.replace(tzinfo=None), "s").astype(np.int64))
 
-# ===== 2. Two-Hour Momentum (every 15 min) =====
 
-def _check_2h_momentum(watchlist) -> list[dict]:
+def _feed_momentum(symbol: str, now_et: datetime, session: market_calendar.Session) -> Optional[list]:
+    """
+    Feed the symbol's 1min bars that arrived since the last run to the
+    momentum detector and return today's signals. The window ends now and
+    starts no earlier than today's open, so a stale cache never reports an
+    earlier session's move. None when no cached bar falls in the window:
+    the caller reads the bars from the database instead.
+    """
+    latest = bar_cache.latest_timestamp("bars_1m", symbol)
+    if latest is None:
+        return None
+    session_open = _wall_ts(session.open)
+    start = max(_wall_ts(now_et) - max(w.seconds for w in MOMENTUM_WINDOWS), session_open)
+    if int(np.datetime64(latest, "s").astype(np.int64)) < start:
+        return None
+    with _momentum_lock:
+        last = _momentum.last_ts(symbol)
+        if last is not None:
+            start = max(start, last + 1)
+        cached = bar_cache.columns("bars_1m", symbol, start_ts=start)
+        if cached is None:
+            return None
+        _, cols = cached
+        # The newest bar may still be forming: evaluated now, recorded next run
+        signals = _momentum.feed_bars(symbol, cols["ts"], cols["close"], cols["low"], cols["high"], cols["time"])
+    return [s for s in signals if s.to_ts >= session_open]
+
+
+def _plan_momentum(watchlist) -> list[dict]:
     """
-    Check if any stock moved ≥ 5% in the last 2 hours.
+    Check if any stock moved ≥ 5% within the last 2 hours (or each MOMENTUM_WINDOWS window).
+    Cached bars go through the sliding-window detector; symbols without cached
+    bars measure the same extreme-to-latest move from the window's min/max in
+    the RPC. Either way a swing inside the window is caught.
     Uses 15-minute time buckets so we don't spam the same alert.
     """
-    now = datetime.now()
     now_et = datetime.now(ET)
+    now = now_et.replace(tzinfo=None)  # ET wall time, like bars_1m.datetime
     today_str = now_et.strftime("%Y-%m-%d")
 
+    # Only during the session (plus the bucket that covers the close)
+    session = market_calendar.session_for(now_et.date())
+    if session is None or not (
+        session.open <= now_et <= session.close + timedelta(minutes=MOMENTUM_INTERVAL_MIN)
+    ):
+        return []
+
     # Round to nearest 15-minute bucket
     minute_bucket = (now.minute // MOMENTUM_INTERVAL_MIN) * MOMENTUM_INTERVAL_MIN
     bucket_str = now.replace(minute=minute_bucket, second=0, microsecond=0).strftime("%H%M")
 
-    cutoff = (now - timedelta(hours=LOOKBACK_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
-
-    new_notifications = []
-
+    candidates = []
     for item in watchlist:
         symbol = item["symbol"]
-        name = item.get("name", symbol)
-        notif_id = f"{symbol}_MOMENTUM_2H_{today_str}_{bucket_str}"
-
-        if notification_exists(notif_id):
-            continue
-
-        earliest, latest = _get_bars_1m_range_local(symbol, cutoff)
-        if not earliest or not latest:
+        signals = _feed_momentum(symbol, now_et, session)
+        if signals is None:
+            for w in MOMENTUM_WINDOWS:
+                notif_type = f"MOMENTUM_{w.label.upper()}"
+                key = f"lookback_{w.label}"
+                cutoff = max(now - timedelta(seconds=w.seconds),
+                             session.open.replace(tzinfo=None)).strftime("%Y-%m-%d %H:%M:%S")
+                candidates.append(_candidate(
+                    item, f"{symbol}_{notif_type}_{today_str}_{bucket_str}", notif_type, today_str,
+                    w.threshold_pct, [{"key": key, "symbol": symbol, "start": cutoff, "extremes": True}],
+                    base=(key, "extreme"), target=(key, "last")))
             continue
-
-        open_price = float(earliest["close"])
-        close_price = float(latest["close"])
-        pct = _calc_pct_change(open_price, close_price)
-
-        if abs(pct) >= MOMENTUM_2H_THRESHOLD:
-            n = _make_notification(
-                notif_id, "MOMENTUM_2H", symbol, name, today_str,
-                pct, open_price, close_price, earliest["datetime"], latest["datetime"]
-            )
-            save_generated_notification(n)
-            try:
-                if send_notification_email:
-                    send_notification_email(n)
-            except Exception as e:
-                print(f"  [Email] Error sending notification email: {e}")
-            new_notifications.append(n)
-
-    return new_notifications
+        for signal in strongest(signals).values():
+            notif_type = f"MOMENTUM_{signal.window.label.upper()}"
+            candidates.append(_candidate(
+                item, f"{symbol}_{notif_type}_{today_str}_{bucket_str}", notif_type, today_str,
+                signal.window.threshold_pct, [], base=None, target=None, move=signal))
+    return candidates
 
 
 # ===== 3. Morning Gap (after 9:45 AM ET) =====
 
-def _check_morning_gap(watchlist) -> list[dict]:
+def _plan_morning_gap(watchlist) -> list[dict]:
     """
     After 9:45 AM ET, compare today's open (9:30 AM) vs yesterday's last close.
     Triggered once per symbol per day.
@@ -259,64 +318,123 @@ def _check_morning_gap(watchlist) -> list[dict]:
     now_et = datetime.now(ET)
     today_str = now_et.strftime("%Y-%m-%d")
 
-    # Only trigger after 9:45 AM ET
-    trigger_time = now_et.replace(hour=9, minute=45, second=0, microsecond=0)
+    session = market_calendar.session_for(now_et.date())
+    if session is None:
+        return []  # no open today; the last close is compared on the next session
 
-    new_notifications = []
+    # Only trigger after 9:45 AM ET, OR if the stock was added later (still check)
+    trigger_time = session.open + timedelta(minutes=MORNING_GAP_DELAY_MIN)
 
-    for item in watchlist:
-        symbol = item["symbol"]
-        name = item.get("name", symbol)
-        notif_id = f"{symbol}_MORNING_GAP_{today_str}"
+    market_open_str = session.open.strftime("%Y-%m-%d %H:%M:%S")
+    # Bounded below so the last-bar probe never walks the symbol's whole history
+    prev_open_str = market_calendar.previous_session(session.day).open.strftime("%Y-%m-%d %H:%M:%S")
+    today_end_str = trigger_time.strftime("%Y-%m-%d %H:%M:%S")
 
-        if notification_exists(notif_id):
-            continue
+    # Today's open (first bar at/after 9:30 AM, no later than 9:45) vs the last bar before it.
+    # The "session" window is the same one the EOD check reads.
+    return [
+        _candidate(item, f"{item['symbol']}_MORNING_GAP_{today_str}", "MORNING_GAP", today_str,
+                   MORNING_GAP_THRESHOLD,
+                   [{"key": "session", "symbol": item["symbol"], "start": market_open_str},
+                    {"key": "before_open", "symbol": item["symbol"], "start": prev_open_str,
+                     "end": market_open_str}],
+                   base=("before_open", "last"), target=("session", "first"), latest=today_end_str)
+        for item in watchlist
+        if now_et >= trigger_time or _added_after(item, trigger_time.replace(tzinfo=None))
+    ]
 
-        # Fire after 9:45 AM, OR if stock was added later (still check)
-        stock_added_at = item.get("added_at", "")
-        added_after_trigger = False
-        if stock_added_at:
-            try:
-                added_dt = datetime.fromisoformat(stock_added_at)
-                if added_dt > trigger_time.replace(tzinfo=None):
-                    added_after_trigger = True
-            except (ValueError, TypeError):
-                pass
-
-        if now_et < trigger_time and not added_after_trigger:
-            continue
 
-        # Today's open: first bar at/after 9:30 AM
-        market_open_str = now_et.replace(hour=9, minute=30, second=0).strftime("%Y-%m-%d %H:%M:%S")
-        today_end_str = now_et.replace(hour=9, minute=45, second=0).strftime("%Y-%m-%d %H:%M:%S")
+# ===== Set-based evaluation =====
 
-        today_open_row = get_bars_1m_row(symbol, "gte", market_open_str, order_asc=True)
-        if not today_open_row or today_open_row["datetime"] > today_end_str:
+def _window_extreme(window: dict, price: float) -> str:
+    """
+    "min_low" or "max_high": the window extreme `price` moved further from,
+    as in the momentum detector. "first" when the row has no extremes.
+    """
+    low, high = window.get("min_low"), window.get("max_high")
+    if low is None or high is None:
+        return "first"
+    up = (price - low) / low * 100 if low > 0 else 0.0
+    down = (price - high) / high * 100 if high > 0 else 0.0
+    return "min_low" if up >= -down else "max_high"
+
+
+def _evaluate(candidates: list[dict], stats: dict) -> list[dict]:
+    """Percent moves for every candidate at once; notifications for those over their threshold."""
+    n = len(candidates)
+    base = np.full(n, np.nan)
+    target = np.full(n, np.nan)
+    edges = [(None, None)] * n
+    for i, c in enumerate(candidates):
+        symbol = c["item"]["symbol"]
+        move = c["move"]
+        if move is not None:
+            base[i], target[i] = move.from_price, move.to_price
+            edges[i] = (move.from_time, move.to_time)
             continue
-
-        # Yesterday's close: last available bar BEFORE today's open
-        yesterday_close_row = get_bars_1m_row(symbol, "lt", market_open_str, order_asc=False)
-        if not yesterday_close_row:
+        base_window = stats.get((c["base"][0], symbol))
+        target_window = stats.get((c["target"][0], symbol))
+        if not base_window or not target_window:
+            continue
+        target_dt = target_window[f"{c['target'][1]}_datetime"]
+        if c["latest"] and target_dt > c["latest"]:
             continue
+        target[i] = float(target_window[f"{c['target'][1]}_close"])
+        base_edge = c["base"][1]
+        if base_edge == "extreme":
+            base_edge = _window_extreme(base_window, target[i])
+        base[i] = float(base_window[f"{base_edge}_close"] if base_edge in ("first", "last")
+                        else base_window[base_edge])
+        edges[i] = (base_window[f"{base_edge}_datetime"], target_dt)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(base == 0, 0.0, (target - base) / base * 100)
+    thresholds = np.array([c["threshold"] for c in candidates], dtype=float)
+    hits = np.flatnonzero(np.isfinite(pct) & (np.abs(pct) >= thresholds))
+
+    notifications = []
+    for i in hits.tolist():
+        c = candidates[i]
+        symbol = c["item"]["symbol"]
+        notifications.append(_make_notification(
+            c["id"], c["type"], symbol, c["item"].get("name", symbol), c["date"],
+            float(pct[i]), float(base[i]), float(target[i]), edges[i][0], edges[i][1],
+        ))
+    return notifications
+
+
+def _generate(candidates: list[dict]) -> list[dict]:
+    """
+    One read of the existing ids, one bars_1m_window_stats RPC for every
+    remaining window, vectorized percent changes, one upsert.
+    """
+    if not candidates:
+        return []
+    existing = get_existing_notification_ids(c["id"] for c in candidates)
+    candidates = [c for c in candidates if c["id"] not in existing]
+
+    windows = {}
+    for c in candidates:
+        for w in c["windows"]:
+            windows[(w["key"], w["symbol"])] = w
+    stats = get_bars_1m_window_stats(list(windows.values()))
+
+    notifications = _evaluate(candidates, stats)
+    _save_and_email(notifications)
+    return notifications
+
+
+def _check_daily_eod(watchlist) -> list[dict]:
+    return _generate(_plan_daily_eod(watchlist))
+
+
+def _check_momentum(watchlist) -> list[dict]:
+    return _generate(_plan_momentum(watchlist))
+
+
+def _check_morning_gap(watchlist) -> list[dict]:
+    return _generate(_plan_morning_gap(watchlist))
 
-        prev_close = float(yesterday_close_row["close"])
-        today_open = float(today_open_row["close"])
-        pct = _calc_pct_change(prev_close, today_open)
-
-        if abs(pct) >= MORNING_GAP_THRESHOLD:
-            n = _make_notification(
-                notif_id, "MORNING_GAP", symbol, name, today_str,
-                pct, prev_close, today_open, yesterday_close_row["datetime"], today_open_row["datetime"]
-            )
-            save_generated_notification(n)
-            try:
-                if send_notification_email:
-                    send_notification_email(n)
-            except Exception as e:
-                print(f"  [Email] Error sending notification email: {e}")
-            new_notifications.append(n)
-
-    return new_notifications
 
 # News briefing generation has been moved to routers/news_briefing.py
 # to avoid blocking the notification polling endpoint.
@@ -334,57 +452,112 @@ def _format_timestamp_display(iso_str: str) -> str:
     except ValueError:
         return iso_str
 
-# ===== Main Entry Point =====
+def _notification_from_row(r: dict) -> dict:
+    # Normalize column name from DB (percent_change -> percentChange)
+    item = {
+        "id": r["id"],
+        "type": r["type"],
+        "symbol": r["symbol"],
+        "title": r["title"],
+        "message": r["message"],
+        "direction": r["direction"],
+        "percentChange": r["percent_change"],
+        "timestamp": _format_timestamp_display(r["created_at"]),
+    }
+    # For NEWS_BRIEFING, include the articles array from DB
+    if r["type"] == "NEWS_BRIEFING":
+        articles_str = r.get("articles_json", "")
+        try:
+            item["articles"] = json.loads(articles_str) if articles_str else []
+        except (json.JSONDecodeError, TypeError):
+            item["articles"] = []
+    return item
+
+
+def alert_notification(alert: dict, reminder: dict) -> dict:
+    """A triggered reminder alert in the unified Notification shape (id ALERT_<alert id>)."""
+    ticker = alert.get("ticker", "")
+    message = alert.get("message", "")
+    triggered_at = alert.get("triggered_at", "")
+
+    # Build a human-readable title from the reminder condition
+    ctype = reminder.get("condition_type", "")
+    target = reminder.get("target_price")
+    pct = reminder.get("percent_change")
+    if ctype == "price_above" and target:
+        title = f"Price above ${target:.2f}"
+    elif ctype == "price_below" and target:
+        title = f"Price below ${target:.2f}"
+    elif ctype == "percent_change" and pct is not None:
+        title = f"{'▲' if pct > 0 else '▼'} {abs(pct):.1f}% move"
+    elif ctype == "time_based":
+        title = "Scheduled reminder"
+    else:
+        title = "Reminder triggered"
+
+    return {
+        "id": f"ALERT_{alert['id']}",
+        "type": "REMINDER_ALERT",
+        "symbol": ticker,
+        "title": title,
+        "message": message,
+        "direction": "neutral",
+        "percentChange": 0,
+        "timestamp": triggered_at[:16].replace("T", " ") if triggered_at else "",
+    }
+
 
-def generate_all_notifications() -> list[dict]:
+def publish_alert(alert: dict, reminder: dict):
+    """Push a just-created reminder alert to connected /notifications/stream clients."""
+    notification_bus.publish("notification", alert_notification(alert, reminder))
+
+
+# ===== Main Entry Points =====
+
+def run_checks(watchlist: Optional[list] = None) -> list[dict]:
     """
-    Run EOD, momentum, and morning gap notification generators, save new ones to DB,
-    return ALL notifications for today (from DB), including any news briefings.
-    News briefing generation is handled by a separate endpoint.
+    Run the EOD, momentum and morning gap checks once and save new notifications.
+    Returns the notifications created by this run. Called by services.notification_worker.
     """
-    watchlist = get_watchlist()
+    if watchlist is None:
+        watchlist = get_watchlist()
     if not watchlist:
         return []
 
     # Ensure bars_1m data exists for all watchlist symbols
-    # Uses existing Twelve Data pipeline with built-in caching (no redundant calls)
-    for item in watchlist:
-        try:
-            data_manager.get_stock_data(item["symbol"], "1min")
-        except Exception as e:
-            print(f"  [Notification] Could not prefetch data for {item['symbol']}: {e}")
+    # Stale symbols are refreshed with multi-symbol Twelve Data requests (fresh ones are skipped)
+    try:
+        data_manager.get_stock_data_batch([item["symbol"] for item in watchlist], "1min")
+    except Exception as e:
+        print(f"  [Notification] Could not prefetch watchlist data: {e}")
+
+    # Each planner applies its own trigger logic, then all of them share
+    # one id read, one bar-window RPC and one upsert
+    return _generate(_plan_daily_eod(watchlist) + _plan_momentum(watchlist) + _plan_morning_gap(watchlist))
 
-    # Generate new notifications (each function handles its own trigger logic)
-    _check_daily_eod(watchlist)
-    _check_2h_momentum(watchlist)
-    _check_morning_gap(watchlist)
-    # News briefing is NOT called here — it's triggered by a separate endpoint
 
-    # Return all generated notifications for today
+def get_today_notifications(since: Optional[str] = None,
+                            limit: Optional[int] = None) -> tuple[list[dict], Optional[str]]:
+    """
+    Today's generated notifications (including news briefings), newest first,
+    at most `limit`, without running any check. With `since`, the next page of
+    rows created after that cursor. Also returns the cursor for the next call
+    (the newest row returned, or `since` when nothing is new).
+    """
     today_str = datetime.now(ET).strftime("%Y-%m-%d")
-    rows = get_generated_notifications_for_date(today_str)
+    rows = get_generated_notifications_for_date(today_str, since, limit)
+    cursor = row_cursor(rows[0], "created_at") if rows else since
+    return [_notification_from_row(r) for r in rows], cursor
 
-    # Normalize column name from DB (percent_change -> percentChange)
-    results = []
-    for r in rows:
-        item = {
-            "id": r["id"],
-            "type": r["type"],
-            "symbol": r["symbol"],
-            "title": r["title"],
-            "message": r["message"],
-            "direction": r["direction"],
-            "percentChange": r["percent_change"],
-            "timestamp": _format_timestamp_display(r["created_at"]),
-        }
-        # For NEWS_BRIEFING, include the articles array from DB
-        if r["type"] == "NEWS_BRIEFING":
-            articles_str = r.get("articles_json", "")
-            try:
-                item["articles"] = json.loads(articles_str) if articles_str else []
-            except (json.JSONDecodeError, TypeError):
-                item["articles"] = []
-        results.append(item)
-
-    return results
 
+def generate_all_notifications() -> list[dict]:
+    """
+    Run EOD, momentum, and morning gap notification generators, save new ones to DB,
+    return ALL notifications for today (from DB), including any news briefings.
+    News briefing generation is handled by a separate endpoint.
+    """
+    watchlist = get_watchlist()
+    if not watchlist:
+        return []
+    run_checks(watchlist)
+    return get_today_notifications()[0]
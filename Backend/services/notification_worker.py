@@ -0,0 +1,123 @@
+"""
+Background notification generation.
+
+GET /notifications only reads generated_notifications; this worker runs the
+checks (notification_service.run_checks) at the times they can fire:
+
+  momentum     every MOMENTUM_INTERVAL_MIN bucket boundary from the open to the close
+  morning gap  MORNING_GAP_DELAY_MIN after the open
+  end of day   the close (1 PM on early-close days)
+
+Each run starts NOTIFICATION_WORKER_DELAY_S after its trigger so the bar for
+the trigger minute has been published. Between sessions the worker sleeps
+until the next one; weekends and holidays come from services.market_calendar.
+It also runs once at startup (catching up on triggers missed while the server
+was down) and whenever request_run() is called, e.g. after a watchlist add, so
+a late-added stock still gets the day's EOD and gap notifications.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+
+from services import market_calendar
+from services.blocking_io import run_blocking
+from services.notification_service import MOMENTUM_INTERVAL_MIN, MORNING_GAP_DELAY_MIN, run_checks
+
+ENABLED = os.getenv("NOTIFICATION_WORKER", "1").lower() in ("1", "true", "yes")
+DELAY_S = float(os.getenv("NOTIFICATION_WORKER_DELAY_S", "20"))
+
+_LOOKAHEAD_DAYS = 10  # longer than any run of weekends and holidays
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_wake: Optional[asyncio.Event] = None
+_task: Optional[asyncio.Task] = None
+_state: dict[str, Any] = {"last_run": None, "last_created": 0, "last_error": None, "next_run": None}
+
+
+def trigger_times(day: date) -> list[datetime]:
+    """The day's check times in ET, ascending (empty when the market is closed)."""
+    session = market_calendar.session_for(day)
+    if session is None:
+        return []
+    step = timedelta(minutes=MOMENTUM_INTERVAL_MIN)
+    times = {session.open + timedelta(minutes=MORNING_GAP_DELAY_MIN), session.close}
+    t = session.open
+    while t <= session.close:
+        times.add(t)
+        t += step
+    return sorted(times)
+
+
+def next_run_time(now: Optional[datetime] = None) -> datetime:
+    """When the next run is due: the first trigger (plus DELAY_S) after `now`."""
+    now = now or datetime.now(market_calendar.ET)
+    delay = timedelta(seconds=DELAY_S)
+    for offset in range(_LOOKAHEAD_DAYS):
+        for t in trigger_times(now.date() + timedelta(days=offset)):
+            if t + delay > now:
+                return t + delay
+    return market_calendar.next_open(now) + delay
+
+
+async def run_once() -> list[dict]:
+    """One pass of the checks off the event loop; errors are logged, never raised."""
+    try:
+        created = await run_blocking(run_checks)
+        _state["last_error"] = None
+    except Exception as e:
+        print(f"[Notifications] Worker run failed: {e}")
+        _state["last_error"] = str(e)
+        created = []
+    _state["last_run"] = datetime.now(market_calendar.ET).isoformat()
+    _state["last_created"] = len(created)
+    if created:
+        print(f"[Notifications] Generated {len(created)} notification(s)")
+    return created
+
+
+async def worker_loop():
+    """Runs indefinitely: once at startup, then at every trigger time or request_run()."""
+    global _loop, _wake
+    _loop = asyncio.get_running_loop()
+    _wake = asyncio.Event()
+    print(f"[Notifications] Worker started — next run at {next_run_time().strftime('%Y-%m-%d %H:%M:%S %Z')}")
+    while True:
+        await run_once()
+        run_at = next_run_time()
+        _state["next_run"] = run_at.isoformat()
+        wait = (run_at - datetime.now(market_calendar.ET)).total_seconds()
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=max(wait, 0.0))
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def request_run() -> None:
+    """Ask the worker for an extra run as soon as possible (safe from any thread)."""
+    if _loop is not None and _wake is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+def start_notification_worker() -> Optional[asyncio.Task]:
+    global _task
+    if not ENABLED:
+        print("[Notifications] Worker disabled (NOTIFICATION_WORKER=0); notifications will not be generated.")
+        return None
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(worker_loop())
+    return _task
+
+
+def stop_notification_worker() -> None:
+    global _task, _loop, _wake
+    if _task is not None:
+        _task.cancel()
+    _task = _loop = _wake = None
+
+
+def worker_state() -> dict[str, Any]:
+    return {"enabled": ENABLED, "running": _task is not None and not _task.done(), **_state}
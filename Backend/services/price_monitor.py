@@ -3,16 +3,29 @@ Background price monitor.
 
 Runs every 5 minutes, fetches the current price for every ticker that has
 at least one active reminder, evaluates conditions, and fires alerts when
-conditions are met.
+conditions are met. Price quotes are skipped while the market is closed
+(see services.market_calendar); time-based reminders are always checked.
 """
 
 import asyncio
 from datetime import datetime
+from typing import Optional
+
+from services import market_calendar
+from services.blocking_io import run_blocking
 
 
 MONITOR_INTERVAL = 300  # seconds between checks (5 minutes)
 
 
+def _quotes_may_have_moved(now: Optional[datetime] = None) -> bool:
+    """Quotes only move in session; the first pass after a close still picks up the closing price."""
+    now = now or datetime.now(market_calendar.ET)
+    if market_calendar.is_open(now):
+        return True
+    return (now - market_calendar.last_close(now)).total_seconds() <= MONITOR_INTERVAL
+
+
 def _check_condition(reminder: dict, current_price: float) -> bool:
     ct       = reminder["condition_type"]
     target   = reminder["target_price"]
@@ -84,34 +97,36 @@ async def check_single_reminder(reminder: dict):
     from database import update_reminder_status, create_alert
     from services.finnhub_client import get_finnhub_quote
     from services.email_service import send_alert_email
+    from services.notification_service import publish_alert
 
     if reminder["condition_type"] == "time_based":
         if _check_condition(reminder, 0):
-            update_reminder_status(reminder["id"], "triggered")
-            create_alert({
+            await run_blocking(update_reminder_status, reminder["id"], "triggered")
+            row = await run_blocking(create_alert, {
                 "reminder_id": reminder["id"],
                 "ticker":      reminder["ticker"] or "REMINDER",
                 "message":     _build_message(reminder, 0),
             })
+            publish_alert(row, reminder)
             print(f"[Monitor] Instant trigger — time-based reminder reached {reminder['trigger_time']}")
         return
 
     try:
-        quote = get_finnhub_quote(reminder["ticker"])
+        quote = await run_blocking(get_finnhub_quote, reminder["ticker"])
         current_price = quote.get("c")
     except Exception as e:
         print(f"[Monitor] Could not fetch price for {reminder['ticker']} on creation check: {e}")
         return
 
     if current_price and _check_condition(reminder, current_price):
-        update_reminder_status(reminder["id"], "triggered")
+        await run_blocking(update_reminder_status, reminder["id"], "triggered")
         alert = {
             "reminder_id": reminder["id"],
             "ticker":      reminder["ticker"],
             "message":     _build_message(reminder, current_price),
         }
-        create_alert(alert)
-        send_alert_email(alert, reminder)
+        publish_alert(await run_blocking(create_alert, alert), reminder)
+        await run_blocking(send_alert_email, alert, reminder)
         print(f"[Monitor] Instant trigger — {reminder['ticker']} condition already met at ${current_price:.2f}")
 
 
@@ -120,8 +135,9 @@ async def run_check():
     from database import get_all_reminders, update_reminder_status, create_alert, get_reminder_by_id
     from services.finnhub_client import get_finnhub_quote
     from services.email_service import send_alert_email
+    from services.notification_service import publish_alert
 
-    reminders = get_all_reminders()
+    reminders = await run_blocking(get_all_reminders)
     active = [r for r in reminders if r["status"] == "active"]
 
     if not active:
@@ -129,6 +145,9 @@ async def run_check():
 
     timed = [r for r in active if r["condition_type"] == "time_based"]
     market_based = [r for r in active if r["condition_type"] != "time_based"]
+    if market_based and not _quotes_may_have_moved():
+        # Market closed since the last pass: prices can't cross a threshold until the next open
+        market_based = []
 
     # Fetch prices once per unique ticker to stay within Finnhub rate limits
     tickers = list({r["ticker"] for r in market_based if r["ticker"]})
@@ -136,7 +155,7 @@ async def run_check():
 
     for ticker in tickers:
         try:
-            quote = get_finnhub_quote(ticker)
+            quote = await run_blocking(get_finnhub_quote, ticker)
             price = quote.get("c")
             if price:
                 prices[ticker] = price
@@ -147,12 +166,13 @@ async def run_check():
     triggered_count = 0
     for reminder in timed:
         if _check_condition(reminder, 0):
-            update_reminder_status(reminder["id"], "triggered")
-            create_alert({
+            await run_blocking(update_reminder_status, reminder["id"], "triggered")
+            row = await run_blocking(create_alert, {
                 "reminder_id": reminder["id"],
                 "ticker":      reminder["ticker"] or "REMINDER",
                 "message":     _build_message(reminder, 0),
             })
+            publish_alert(row, reminder)
             triggered_count += 1
             print(
                 f"[Monitor] TRIGGERED — time reminder "
@@ -165,14 +185,14 @@ async def run_check():
             continue
 
         if _check_condition(reminder, price):
-            update_reminder_status(reminder["id"], "triggered")
+            await run_blocking(update_reminder_status, reminder["id"], "triggered")
             alert = {
                 "reminder_id": reminder["id"],
                 "ticker":      reminder["ticker"],
                 "message":     _build_message(reminder, price),
             }
-            create_alert(alert)
-            send_alert_email(alert, reminder)
+            publish_alert(await run_blocking(create_alert, alert), reminder)
+            await run_blocking(send_alert_email, alert, reminder)
             triggered_count += 1
             print(
                 f"[Monitor] TRIGGERED — {reminder['ticker']} "
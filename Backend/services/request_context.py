@@ -0,0 +1,104 @@
+"""
+Request-scoped memoization for upstream data lookups.
+
+Every HTTP request gets a fresh RequestContext (opened by the middleware
+below). Functions decorated with @request_memoized return the value fetched
+earlier in the same request instead of calling the upstream API again, so a
+chat turn that builds a stock card, a report and a news relevance check only
+hits Finnhub once per (endpoint, symbol).
+
+Outside of a request (background monitor, scripts, tests) the decorator is a
+plain pass-through.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from services.metrics import record_cache
+
+DEDUP_HEADER = "X-Upstream-Dedup"
+
+
+class RequestContext:
+    """Memo table shared by every service invoked while serving one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, Future] = {}
+        self.upstream_calls = 0
+        self.dedup_count = 0
+
+    def get_or_call(self, key: tuple, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = Future()
+                self._entries[key] = entry
+                owner = True
+                self.upstream_calls += 1
+            else:
+                owner = False
+                self.dedup_count += 1
+        record_cache("request_memo", hit=not owner)
+
+        if not owner:
+            # Concurrent callers (e.g. threads spawned for the same request)
+            # wait for the first call instead of issuing their own.
+            return entry.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            # Failures are not memoized: a later call in the same request retries.
+            with self._lock:
+                self._entries.pop(key, None)
+            entry.set_exception(e)
+            raise
+        entry.set_result(value)
+        return value
+
+
+_current: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar(
+    "request_context", default=None
+)
+
+
+def current_request_context() -> Optional[RequestContext]:
+    return _current.get()
+
+
+def request_memoized(name: str):
+    """
+    Memoize a sync upstream lookup for the lifetime of the current request.
+    `name` identifies the upstream datum (e.g. 'finnhub.quote'); arguments
+    must be hashable.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            ctx = _current.get()
+            if ctx is None:
+                return fn(*args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return ctx.get_or_call(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+async def request_context_middleware(request, call_next):
+    """Open a RequestContext per request and report dedup hits in a debug header."""
+    ctx = RequestContext()
+    token = _current.set(ctx)
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    response.headers[DEDUP_HEADER] = str(ctx.dedup_count)
+    return response
@@ -1,7 +1,6 @@
 import math
 import re
 import datetime
-import requests
 from typing import Optional, Dict, Any
 
 from services.supabase_client import SupabaseClient
@@ -404,11 +403,6 @@ Rules:
 - Each RISK line: severity and message separated by |
 - Do NOT add any other text"""
 
-        url = f"{ai100_client.AI100_BASE_URL}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {ai100_client.AI100_API_KEY}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": ai100_client.AI100_MODEL,
             "messages": [
@@ -422,9 +416,9 @@ Rules:
 
         for attempt in range(1, 3):
             try:
-                response = requests.post(url, json=payload, headers=headers, timeout=60)
+                response, data = ai100_client.post_chat_completion(payload, timeout=60)
                 if response.status_code == 200:
-                    content = response.json()["choices"][0]["message"].get("content", "")
+                    content = data["choices"][0]["message"].get("content", "")
                     if content:
                         cleaned = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL).strip()
                         parsed = self._parse_llm_response(cleaned)
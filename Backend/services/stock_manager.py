@@ -1,60 +1,93 @@
 from twelvedata import TDClient
-from database import save_bars_1d, save_bars_1m, fetch_history, get_latest_timestamp
+from database import save_bars, fetch_history
+from services.metrics import record_cache, time_upstream
+from services import bar_store
+from services.bar_cache import bar_cache
+from services import market_calendar
+from services.td_scheduler import BACKGROUND, INTERACTIVE, scheduler
 import pandas as pd
+import logging
 import os
 from dotenv import load_dotenv
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
 import pytz
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
 API_KEY = os.getenv("TWELVE_DATA_API_KEY")
 
+# Multi-symbol requests: symbols per request (each costs one credit) and requests in flight
+TWELVEDATA_BATCH_SYMBOLS = int(os.getenv("TWELVEDATA_BATCH_SYMBOLS", "8"))
+TWELVEDATA_BATCH_CONCURRENCY = int(os.getenv("TWELVEDATA_BATCH_CONCURRENCY", "2"))
+
 ET = pytz.timezone("America/New_York")
 
-def is_market_open() -> bool:
-    """Check if US stock market is currently open (Mon-Fri 9:30 AM - 4:00 PM ET)."""
-    now_et = datetime.now(ET)
-    # Weekend check
-    if now_et.weekday() >= 5:  # Saturday=5, Sunday=6
-        return False
-    market_open = now_et.replace(hour=9, minute=30, second=0, microsecond=0)
-    market_close = now_et.replace(hour=16, minute=0, second=0, microsecond=0)
-    return market_open <= now_et <= market_close
+logger = logging.getLogger(__name__)
 
-_last_failed_attempt = {}
+def is_market_open() -> bool:
+    """Check if the NYSE is in session now (holidays and 1 PM early closes included)."""
+    return market_calendar.is_open()
 
+# The last bar of a session starts this long before the close (1day bars compare dates)
+_LAST_BAR_TOLERANCE = {"1min": timedelta(minutes=2), "1h": timedelta(hours=1)}
 
 class DataManager:
     def __init__(self):
         if not API_KEY:
              print("Warning: API_KEY not found in .env")
-        self.td = TDClient(apikey=API_KEY)
+        self._td = None
+        # In-flight refresh+load per (symbol, interval); concurrent callers wait on it
+        self._flights: dict[tuple[str, str], Future] = {}
+        self._flights_lock = threading.Lock()
 
-    def get_stock_data(self, symbol: str, timeframe: str):
+    @property
+    def td(self) -> TDClient:
+        # Created on first fetch: TDClient() calls the TwelveData API to load endpoint metadata
+        if self._td is None:
+            self._td = TDClient(apikey=API_KEY)
+        return self._td
+
+    def _warm(self, symbol: str, table_name: str) -> bool:
         """
-        Main entry point.
-        timeframe: '1min', '1h', '1day'
-        
+        Make sure the symbol's bars are in the in-memory cache. Cold start reads
+        the local bar store, and Supabase only if the store has no file either.
+        Returns False if there are no stored bars at all.
+        """
+        if bar_cache.contains(table_name, symbol):
+            return True
+        df = bar_store.read(table_name, symbol)
+        if df is None:
+            df = fetch_history(symbol, table_name)
+            if df.empty:
+                return False
+            bar_store.write(table_name, symbol, df)
+        bar_cache.put(table_name, symbol, df)
+        return True
+
+    def _latest_timestamp(self, symbol: str, table_name: str) -> Optional[str]:
+        if not self._warm(symbol, table_name):
+            return None
+        return bar_cache.latest_timestamp(table_name, symbol)
+
+    def _load_history(self, symbol: str, table_name: str, start: Optional[str] = None) -> pd.DataFrame:
+        if not self._warm(symbol, table_name):
+            return pd.DataFrame()
+        df = bar_cache.get(table_name, symbol, start=start)
+        return df if df is not None else fetch_history(symbol, table_name, start)
+
+    def _plan_fetch(self, symbol: str, interval: str, table_name: str) -> tuple[bool, Optional[str]]:
+        """
+        Decide whether the stored bars are stale. Returns (fetch_needed, start_date).
+
         Caching rules:
         - If market is OPEN: fetch if data > 2 min old
         - If market is CLOSED: fetch ONLY if we don't have the last market close data
         """
-        symbol = (symbol or "").strip().upper()
-        if not symbol:
-            return fetch_history(symbol, "bars_1m" if timeframe == "1min" else ("bars_1h" if timeframe == "1h" else "bars_1d"))
-
-        table_name = "bars_1m" if timeframe == "1min" else ("bars_1h" if timeframe == "1h" else "bars_1d")
-        interval = "1min" if timeframe == "1min" else ("1h" if timeframe == "1h" else "1day")
-        
-        # 0. Check if we recently failed due to rate limit
-        last_fail = _last_failed_attempt.get((symbol, interval))
-        if last_fail and (datetime.now() - last_fail).total_seconds() < 60:
-             print(f"  [SKIPPED] Fetch for {symbol} skipped due to recent API limit failure.")
-             return fetch_history(symbol, table_name)
-
-        # 1. Check local DB for latest data
-        latest_ts = get_latest_timestamp(symbol, table_name)
+        # 1. Check local store (or DB) for latest data
+        latest_ts = self._latest_timestamp(symbol, table_name)
         
         # 2. Determine if we need to fetch updates
         fetch_needed = False
@@ -86,66 +119,274 @@ class DataManager:
                     start_date = latest_ts # Increment logic handled by API start_date usually inclusive? 
                     # TwelveData start_date is inclusive. We can just ask for latest.
                 else:
-                    print(f"  [OPEN] Data fresh ({int(diff_seconds)}s old). Cache HIT.")
+                    logger.debug("[OPEN] %s %s fresh (%ds old), cache hit", symbol, interval, int(diff_seconds))
             else:
                 # Market CLOSED: Check if we have the last close
-                # Last market close is usually today 16:00 or yesterday 16:00
-                
-                # Find the most recent hypothetical market close time
-                cursor = now_et.replace(hour=16, minute=0, second=0, microsecond=0)
-                if now_et < cursor:
-                    cursor -= timedelta(days=1)
-                
-                # Roll back weekends to Friday
-                while cursor.weekday() >= 5:
-                    cursor -= timedelta(days=1)
-                
-                last_market_close = cursor
-                # Exception: Early close days? Ignoring for MVP.
-                
+                # (skips weekends and holidays; early closes end at 1 PM)
+                last_market_close = market_calendar.last_close(now_et)
+
                 # If our data is OLDER than the last close, we need to fetch
-                # Use 2-min tolerance: 1-min bars end at 3:59 PM, not 4:00 PM
-                staleness_tolerance = timedelta(minutes=2)
-                if last_dt < (last_market_close - staleness_tolerance):
-                    print(f"  [CLOSED] Data stale (Last: {last_dt}, Market Close: {last_market_close}). Fetching...")
+                # 1-min bars end at 3:59 PM and 1h bars start at 3:30 PM, not 4:00 PM
+                if interval == "1day":
+                    stale = last_dt.date() < last_market_close.date()
+                else:
+                    stale = last_dt < last_market_close - _LAST_BAR_TOLERANCE[interval]
+                if stale:
+                    logger.debug("[CLOSED] %s %s stale (last %s, close %s)", symbol, interval, last_dt, last_market_close)
                     fetch_needed = True
                     start_date = latest_ts
                 else:
-                    print(f"  [CLOSED] Data complete (Last: {last_dt} ~= Close: {last_market_close}). Cache HIT.")
+                    logger.debug("[CLOSED] %s %s complete (last %s ~= close %s), cache hit",
+                                 symbol, interval, last_dt, last_market_close)
+
+        record_cache(f"bars_{interval}", hit=not fetch_needed)
+        return fetch_needed, start_date
+
+    def _store_fetched(self, symbol: str, interval: str, table_name: str, df: Optional[pd.DataFrame]) -> None:
+        if df is None or df.empty:
+            return
+        save_bars(symbol, df, table_name)
+        # Supabase is durable; mirror into the local store and memory only after it succeeded
+        bar_store.append(table_name, symbol, df)
+        bar_cache.append(table_name, symbol, df)
+
+    def _record_failure(self, error: Exception) -> None:
+        print(f"Error fetching data: {error}")
+        if "API credits" in str(error):
+            # The key is shared or the budget is off: stop spending until the window resets
+            scheduler.record_exhausted(str(error))
+
+    def _time_series_params(self, symbols: list[str], interval: str, start_date: Optional[str]) -> dict:
+        params = {
+            "symbol": ",".join(symbols),
+            "interval": interval,
+            "timezone": "America/New_York",
+            "order": "asc",
+            "outputsize": 5000
+        }
+        if start_date:
+            params["start_date"] = start_date
+        return params
+
+    def _claim_flight(self, key: tuple[str, str]) -> tuple[bool, Future]:
+        """Returns (owner, flight). The owner must land the flight; others wait on it."""
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = Future()
+        record_cache("bars_inflight", hit=not owner)
+        return owner, flight
+
+    def _land_flight(self, key: tuple[str, str], flight: Future, result=None,
+                     error: Optional[BaseException] = None) -> None:
+        with self._flights_lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def _join_flight(self, flight: Future, symbol: str, table_name: str, start: Optional[str]) -> pd.DataFrame:
+        """Use another caller's refresh: share its frame if it loaded the same range."""
+        flight_start, df = flight.result()
+        if flight_start == start and df is not None:
+            return df.copy()
+        return self._load_history(symbol, table_name, start)
+
+    def get_stock_data(self, symbol: str, timeframe: str, start: Optional[str] = None,
+                       priority: str = INTERACTIVE):
+        """
+        Main entry point.
+        timeframe: '1min', '1h', '1day'
+        start: optional inclusive lower bound on the returned bars (date/datetime text)
+        priority: td_scheduler priority; without credits the stored (stale) bars are returned
+
+        Concurrent calls for the same symbol and timeframe are coalesced: the
+        first one refreshes and loads, the rest wait and reuse its result.
+        """
+        symbol = (symbol or "").strip().upper()
+        table_name, interval = _table_and_interval(timeframe)
+        if not symbol:
+            return fetch_history(symbol, table_name, start)
 
-        if fetch_needed:
-            print(f"Fetching {symbol} {interval} from {start_date}...")
+        key = (symbol, interval)
+        owner, flight = self._claim_flight(key)
+        if not owner:
+            return self._join_flight(flight, symbol, table_name, start)
+        try:
+            self._refresh(symbol, interval, table_name, priority)
+            df = self._load_history(symbol, table_name, start)
+        except BaseException as e:
+            self._land_flight(key, flight, error=e)
+            raise
+        self._land_flight(key, flight, (start, df))
+        # The flight's frame is shared with waiters; hand out copies only
+        return df.copy()
+
+    def ensure_fresh(self, symbol: str, timeframe: str, priority: str = INTERACTIVE) -> str:
+        """
+        Refresh a symbol's bars into the bar cache without building a frame
+        (coalesced with concurrent loads). Returns the bar table name.
+        """
+        symbol = (symbol or "").strip().upper()
+        table_name, interval = _table_and_interval(timeframe)
+        key = (symbol, interval)
+        owner, flight = self._claim_flight(key)
+        if not owner:
+            flight.result()
+            return table_name
+        try:
+            self._refresh(symbol, interval, table_name, priority)
+        except BaseException as e:
+            self._land_flight(key, flight, error=e)
+            raise
+        # No frame to share: waiters that want one load it from the warm cache
+        self._land_flight(key, flight, (None, None))
+        return table_name
+
+    def _refresh(self, symbol: str, interval: str, table_name: str, priority: str) -> None:
+        fetch_needed, start_date = self._plan_fetch(symbol, interval, table_name)
+        if fetch_needed and not scheduler.acquire(1, priority):
+            print(f"  [DEFERRED] {symbol} {interval} refresh: no TwelveData credits, serving stored bars.")
+        elif fetch_needed:
+            logger.debug("Fetching %s %s from %s", symbol, interval, start_date)
             try:
-                params = {
-                    "symbol": symbol,
-                    "interval": interval,
-                    "timezone": "America/New_York",
-                    "order": "asc",
-                    "outputsize": 5000
-                }
-                if start_date:
-                    params["start_date"] = start_date
-
-                ts = self.td.time_series(**params)
-                df = ts.as_pandas()
-                
-                if df is not None and not df.empty:
-                     from database import save_bars_1h
-                     if interval == "1min":
-                        save_bars_1m(symbol, df)
-                     elif interval == "1h":
-                        save_bars_1h(symbol, df)
-                     else:
-                        save_bars_1d(symbol, df)
-                     
-                     # Clear failure status on success
-                     if (symbol, interval) in _last_failed_attempt:
-                         del _last_failed_attempt[(symbol, interval)]
+                with time_upstream("twelvedata", "time_series"):
+                    ts = self.td.time_series(**self._time_series_params([symbol], interval, start_date))
+                    df = ts.as_pandas()
+                self._store_fetched(symbol, interval, table_name, df)
             except Exception as e:
-                print(f"Error fetching data: {e}")
-                if "API credits" in str(e):
-                    _last_failed_attempt[(symbol, interval)] = datetime.now()
-        
-        return fetch_history(symbol, table_name)
+                self._record_failure(e)
+
+    def get_stock_data_batch(self, symbols: list[str], timeframe: str, start: Optional[str] = None,
+                             priority: str = BACKGROUND) -> dict[str, pd.DataFrame]:
+        """
+        Refresh many symbols with multi-symbol TwelveData requests, then return
+        {symbol: bars} like get_stock_data would for each.
+
+        Stale symbols are grouped by start date (a request shares one
+        start_date, so each group asks from its earliest), chunked into
+        TWELVEDATA_BATCH_SYMBOLS symbols per request (one credit per symbol),
+        and independent requests run TWELVEDATA_BATCH_CONCURRENCY at a time.
+        Symbols the credit budget can't cover are deferred to a later call.
+        Symbols another caller is already refreshing are waited on, not refetched.
+        """
+        table_name, interval = _table_and_interval(timeframe)
+        symbols = list(dict.fromkeys((s or "").strip().upper() for s in symbols if (s or "").strip()))
+
+        owned: dict[str, Future] = {}
+        joined: dict[str, Future] = {}
+        for symbol in symbols:
+            owner, flight = self._claim_flight((symbol, interval))
+            (owned if owner else joined)[symbol] = flight
+
+        try:
+            results = self._refresh_batch(list(owned), interval, table_name, start, priority)
+        except BaseException as e:
+            for symbol, flight in owned.items():
+                self._land_flight((symbol, interval), flight, error=e)
+            raise
+        for symbol, flight in owned.items():
+            self._land_flight((symbol, interval), flight, (start, results[symbol]))
+            results[symbol] = results[symbol].copy()
+
+        for symbol, flight in joined.items():
+            try:
+                results[symbol] = self._join_flight(flight, symbol, table_name, start)
+            except Exception as e:
+                print(f"  [Batch] Could not load {symbol} {interval}: {e}")
+                results[symbol] = pd.DataFrame()
+        return {symbol: results[symbol] for symbol in symbols}
+
+    def _refresh_batch(self, symbols: list[str], interval: str, table_name: str, start: Optional[str],
+                       priority: str) -> dict[str, pd.DataFrame]:
+        stale: dict[str, Optional[str]] = {}
+        for symbol in symbols:
+            try:
+                fetch_needed, start_date = self._plan_fetch(symbol, interval, table_name)
+            except Exception as e:
+                print(f"  [Batch] Could not check {symbol} {interval}: {e}")
+                continue
+            if fetch_needed:
+                stale[symbol] = start_date
+
+        granted, deferred = scheduler.acquire_batch([(s, interval) for s in stale], priority)
+        if deferred:
+            print(f"  [DEFERRED] {len(deferred)} {interval} refreshes: no TwelveData credits, serving stored bars.")
+
+        groups: dict[str, list[tuple[str, Optional[str]]]] = {}
+        for symbol, _ in granted:
+            start_date = stale[symbol]
+            # Group incremental refreshes by day; cold symbols share the default lookback
+            groups.setdefault((start_date or "")[:10], []).append((symbol, start_date))
+
+        requests_to_send = []
+        for members in groups.values():
+            group_start = min((d for _, d in members if d), default=None)
+            names = [symbol for symbol, _ in members]
+            for i in range(0, len(names), TWELVEDATA_BATCH_SYMBOLS):
+                requests_to_send.append((names[i:i + TWELVEDATA_BATCH_SYMBOLS], group_start))
+
+        if requests_to_send:
+            with ThreadPoolExecutor(max_workers=TWELVEDATA_BATCH_CONCURRENCY,
+                                    thread_name_prefix="td-batch") as pool:
+                list(pool.map(lambda req: self._fetch_group(req[0], interval, table_name, req[1]),
+                              requests_to_send))
+
+        results = {}
+        for symbol in symbols:
+            try:
+                results[symbol] = self._load_history(symbol, table_name, start)
+            except Exception as e:
+                print(f"  [Batch] Could not load {symbol} {interval}: {e}")
+                results[symbol] = pd.DataFrame()
+        return results
+
+    def _fetch_group(self, symbols: list[str], interval: str, table_name: str, start_date: Optional[str]) -> None:
+        logger.debug("Fetching %s %s from %s", ",".join(symbols), interval, start_date)
+        try:
+            with time_upstream("twelvedata", "time_series"):
+                ts = self.td.time_series(**self._time_series_params(symbols, interval, start_date))
+                frames = ts.as_pandas() if len(symbols) == 1 else _batch_json_to_frames(ts.as_json())
+        except Exception as e:
+            self._record_failure(e)
+            return
+
+        if len(symbols) == 1:
+            frames = {symbols[0]: frames}
+        for symbol in symbols:
+            df = frames.get(symbol)
+            if df is None:
+                print(f"  [Batch] No {interval} data returned for {symbol}")
+                continue
+            try:
+                self._store_fetched(symbol, interval, table_name, df)
+            except Exception as e:
+                print(f"  [Batch] Could not store {symbol} {interval}: {e}")
+
+
+def _table_and_interval(timeframe: str) -> tuple[str, str]:
+    table_name = "bars_1m" if timeframe == "1min" else ("bars_1h" if timeframe == "1h" else "bars_1d")
+    interval = "1min" if timeframe == "1min" else ("1h" if timeframe == "1h" else "1day")
+    return table_name, interval
+
+
+def _batch_json_to_frames(payload: dict) -> dict[str, pd.DataFrame]:
+    """
+    Split a multi-symbol time_series as_json() payload ({symbol: rows}) into
+    per-symbol frames shaped like as_pandas() (DatetimeIndex, float columns).
+    Symbols TwelveData reported as errors are already left out of the payload.
+    """
+    frames = {}
+    for symbol, rows in (payload or {}).items():
+        rows = list(rows.values()) if isinstance(rows, dict) else list(rows)
+        if not rows:
+            continue
+        df = pd.DataFrame(rows)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("datetime")), name="datetime")
+        frames[symbol.upper()] = df.apply(pd.to_numeric, errors="coerce")
+    return frames
+
 
 manager = DataManager()
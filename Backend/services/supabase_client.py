@@ -1,5 +1,6 @@
 import os
 from supabase import create_client, Client
+from services.metrics import instrument_supabase_client
 from typing import Optional, Dict, Any
 import datetime
 
@@ -12,6 +13,7 @@ class SupabaseClient:
         if self.url and self.key:
             try:
                 self.client = create_client(self.url, self.key)
+                instrument_supabase_client(self.client)
             except Exception as e:
                 print(f"Failed to initialize Supabase client: {e}")
         else:
@@ -238,6 +240,27 @@ class SupabaseClient:
             print(f"Error fetching stock_event_news: {e}")
             return None
 
+    def get_stock_event_news_bulk(self, ticker: str, event_dates: list) -> Dict[str, Dict[str, Any]]:
+        """Cached rows for many calendar days of one ticker in one query, keyed by event_date."""
+        if not self.client:
+            return {}
+        try:
+            t = (ticker or "").strip().upper()
+            days = sorted({(d or "")[:10] for d in event_dates if d})
+            if not t or not days:
+                return {}
+            resp = (
+                self.client.table("stock_event_news")
+                .select("*")
+                .eq("ticker", t)
+                .in_("event_date", days)
+                .execute()
+            )
+            return {str(row.get("event_date"))[:10]: row for row in (resp.data or [])}
+        except Exception as e:
+            print(f"Error fetching stock_event_news: {e}")
+            return {}
+
     def upsert_stock_event_news(self, row: Dict[str, Any]):
         if not self.client:
             return
@@ -245,3 +268,12 @@ class SupabaseClient:
             self.client.table("stock_event_news").upsert(row, on_conflict="ticker,event_date").execute()
         except Exception as e:
             print(f"Error upserting stock_event_news: {e}")
+
+    def upsert_stock_event_news_bulk(self, rows: list):
+        """One upsert for many (ticker, event_date) rows."""
+        if not self.client or not rows:
+            return
+        try:
+            self.client.table("stock_event_news").upsert(rows, on_conflict="ticker,event_date").execute()
+        except Exception as e:
+            print(f"Error upserting stock_event_news: {e}")
@@ -0,0 +1,206 @@
+"""
+Credit budget for TwelveData requests.
+
+TwelveData meters every time_series call in credits (one per symbol) against
+a per-minute and a per-day allowance. The scheduler tracks spend over a
+sliding 60-second window and the current UTC day, and decides per request:
+
+  interactive — a chart someone is waiting on. Granted while credits are
+                left, waiting up to TD_INTERACTIVE_WAIT_S for the minute
+                window to free up.
+  background  — prefetches (notification checks). Never waits and never
+                spends the TD_INTERACTIVE_RESERVE credits kept for charts.
+                A batch is trimmed to what is left; the rest is deferred.
+
+Deferred (symbol, interval) refreshes are merged — asking ten times defers
+one refresh — and go first the next time a background batch runs. A deferral
+nobody has asked for in TD_DEFERRED_TTL_S (e.g. a symbol removed from the
+watchlist) is dropped, and all of them are dropped when the day budget resets.
+
+A denied request is not an error: DataManager serves the bars it already has,
+slightly stale. When TwelveData reports exhausted credits anyway (another
+process sharing the key), the scheduler blocks until the window resets.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Hashable, Iterable
+
+CREDITS_PER_MINUTE = int(os.getenv("TD_CREDITS_PER_MINUTE", "8"))
+CREDITS_PER_DAY = int(os.getenv("TD_CREDITS_PER_DAY", "800"))
+INTERACTIVE_RESERVE = int(os.getenv("TD_INTERACTIVE_RESERVE", "2"))
+INTERACTIVE_WAIT_S = float(os.getenv("TD_INTERACTIVE_WAIT_S", "3"))
+DEFERRED_TTL_S = float(os.getenv("TD_DEFERRED_TTL_S", "3600"))
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_MINUTE = 60.0
+_DAY = 86400
+
+
+class CreditScheduler:
+    def __init__(self, per_minute: int = CREDITS_PER_MINUTE, per_day: int = CREDITS_PER_DAY,
+                 reserve: int = INTERACTIVE_RESERVE, interactive_wait: float = INTERACTIVE_WAIT_S,
+                 deferred_ttl: float = DEFERRED_TTL_S, clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.reserve = min(reserve, max(per_minute - 1, 0))
+        self.interactive_wait = interactive_wait
+        self.deferred_ttl = deferred_ttl
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._spent: deque[tuple[float, int]] = deque()  # (time, credits) inside the last minute
+        self._day = int(clock() // _DAY)
+        self._day_spent = 0
+        self._blocked_until = 0.0
+        self._deferred: dict[Hashable, dict[str, Any]] = {}
+        self._counts = {INTERACTIVE: {"granted": 0, "denied": 0}, BACKGROUND: {"granted": 0, "denied": 0}}
+
+    # ── Internal accounting (callers hold self._lock) ─────────────────────────
+
+    def _roll(self, now: float) -> None:
+        while self._spent and now - self._spent[0][0] >= _MINUTE:
+            self._spent.popleft()
+        day = int(now // _DAY)
+        if day != self._day:
+            self._day = day
+            self._day_spent = 0
+            self._deferred.clear()
+        stale = [k for k, v in self._deferred.items() if now - v["last"] > self.deferred_ttl]
+        for key in stale:
+            del self._deferred[key]
+
+    def _available(self, now: float, priority: str) -> int:
+        if now < self._blocked_until:
+            return 0
+        minute_left = self.per_minute - sum(c for _, c in self._spent)
+        if priority == BACKGROUND:
+            minute_left -= self.reserve
+        return max(0, min(minute_left, self.per_day - self._day_spent))
+
+    def _spend(self, now: float, credits: int) -> None:
+        self._spent.append((now, credits))
+        self._day_spent += credits
+
+    def _wait_for(self, now: float, credits: int) -> float:
+        """Seconds until `credits` fit in the minute window (inf if the day is used up)."""
+        if self.per_day - self._day_spent < credits:
+            return float("inf")
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        used = sum(c for _, c in self._spent)
+        for ts, c in self._spent:
+            used -= c
+            if self.per_minute - used >= credits:
+                return ts + _MINUTE - now
+        return float("inf")
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    def acquire(self, credits: int = 1, priority: str = INTERACTIVE) -> bool:
+        """
+        Spend credits for one request. Interactive requests wait briefly for
+        the window to free up; background requests are granted or denied now.
+        """
+        deadline = self._clock() + (self.interactive_wait if priority == INTERACTIVE else 0.0)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._roll(now)
+                if self._available(now, priority) >= credits:
+                    self._spend(now, credits)
+                    self._counts[priority]["granted"] += 1
+                    return True
+                wait = self._wait_for(now, credits)
+                if priority != INTERACTIVE or now + wait > deadline:
+                    self._counts[priority]["denied"] += 1
+                    return False
+            self._sleep(max(wait, 0.01))
+
+    def acquire_batch(self, keys: Iterable[Hashable], priority: str = BACKGROUND) -> tuple[list, list]:
+        """
+        Grant as many one-credit keys as the budget allows, previously deferred
+        keys first. Returns (granted, deferred); deferred keys are remembered
+        and merged with any earlier deferral of the same key.
+        """
+        keys = list(dict.fromkeys(keys))
+        if priority == INTERACTIVE:
+            return (keys, []) if self.acquire(len(keys), INTERACTIVE) else ([], keys)
+        with self._lock:
+            now = self._clock()
+            self._roll(now)
+            keys.sort(key=lambda k: k not in self._deferred)
+            n = min(len(keys), self._available(now, BACKGROUND))
+            granted, deferred = keys[:n], keys[n:]
+            if granted:
+                self._spend(now, len(granted))
+                self._counts[BACKGROUND]["granted"] += 1
+            if deferred:
+                self._counts[BACKGROUND]["denied"] += 1
+            for key in granted:
+                self._deferred.pop(key, None)
+            for key in deferred:
+                entry = self._deferred.setdefault(key, {"since": now, "requests": 0})
+                entry["requests"] += 1
+                entry["last"] = now
+            return granted, deferred
+
+    def record_exhausted(self, message: str = "") -> None:
+        """TwelveData rejected a request for credits: block until the window resets."""
+        with self._lock:
+            now = self._clock()
+            if "day" in message.lower():
+                self._blocked_until = (int(now // _DAY) + 1) * _DAY
+                self._day_spent = max(self._day_spent, self.per_day)
+            else:
+                self._blocked_until = max(self._blocked_until, now + _MINUTE)
+
+    def is_blocked(self) -> bool:
+        with self._lock:
+            return self._clock() < self._blocked_until
+
+    def pending(self) -> list:
+        with self._lock:
+            self._roll(self._clock())
+            return list(self._deferred)
+
+    def state(self) -> dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            self._roll(now)
+            minute_used = sum(c for _, c in self._spent)
+            return {
+                "minute": {"limit": self.per_minute, "used": minute_used,
+                           "remaining": max(0, self.per_minute - minute_used)},
+                "day": {"limit": self.per_day, "used": self._day_spent,
+                        "remaining": max(0, self.per_day - self._day_spent)},
+                "interactive_reserve": self.reserve,
+                "blocked_for_s": round(max(0.0, self._blocked_until - now), 1),
+                "deferred": [
+                    {"key": list(k) if isinstance(k, tuple) else k,
+                     "waiting_s": round(now - v["since"], 1), "requests": v["requests"]}
+                    for k, v in self._deferred.items()
+                ],
+                "requests": {p: dict(c) for p, c in self._counts.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spent.clear()
+            self._day_spent = 0
+            self._blocked_until = 0.0
+            self._deferred.clear()
+            for c in self._counts.values():
+                c["granted"] = c["denied"] = 0
+
+
+scheduler = CreditScheduler()
+
+
+def budget_state() -> dict[str, Any]:
+    return scheduler.state()
@@ -0,0 +1,25 @@
+-- Notification panel alerts: unread, non-dismissed alerts with their reminder's
+-- condition fields, filtered and joined in the database. Run in Supabase SQL editor
+-- after supabase_migration_notification_reads.sql (its partial index on
+-- alerts(triggered_at) WHERE is_read = 0 serves this view's ORDER BY ... LIMIT).
+
+CREATE OR REPLACE VIEW unread_alert_notifications AS
+SELECT
+    a.id,
+    a.reminder_id,
+    a.ticker,
+    a.message,
+    a.triggered_at,
+    a.is_read,
+    r.condition_type,
+    r.target_price,
+    r.percent_change
+FROM alerts a
+LEFT JOIN reminders r ON r.id = a.reminder_id
+WHERE a.is_read = 0
+  AND NOT EXISTS (
+      SELECT 1 FROM dismissed_notifications d
+      WHERE d.notification_id = 'ALERT_' || a.id
+  );
+
+GRANT SELECT ON unread_alert_notifications TO anon, authenticated, service_role;
@@ -0,0 +1,87 @@
+-- Notification checks: first/last/min/max bars for many (symbol, window) pairs in one call.
+-- Run in Supabase SQL editor. Replaces the per-symbol earliest/latest bars_1m queries.
+--
+-- windows: JSON array of {"key": text, "symbol": text, "start_at": text|null, "end_at": text|null,
+--                         "extremes": bool}
+--   start_at is inclusive, end_at is exclusive; null leaves that side open.
+--   Times use the bars_1m.datetime text format ('YYYY-MM-DD HH:MM:SS', ET).
+--   extremes: also return the window's lowest low / highest high (with their
+--   times) and bar count. Only honoured when start_at is set, so the
+--   aggregate always reads a bounded range; otherwise those columns are null.
+-- Windows with no bars produce no row.
+-- first/last cost one primary-key index probe each; only extremes windows read their bars.
+
+-- The return type changed across revisions, which CREATE OR REPLACE cannot do on its own
+DROP FUNCTION IF EXISTS bars_1m_window_stats(JSONB);
+
+CREATE FUNCTION bars_1m_window_stats(windows JSONB)
+RETURNS TABLE (
+    window_key TEXT,
+    symbol TEXT,
+    first_datetime TEXT,
+    first_close DOUBLE PRECISION,
+    last_datetime TEXT,
+    last_close DOUBLE PRECISION,
+    min_low DOUBLE PRECISION,
+    min_low_datetime TEXT,
+    max_high DOUBLE PRECISION,
+    max_high_datetime TEXT,
+    bar_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH w AS (
+        SELECT x.key, x.symbol, x.start_at, x.end_at, COALESCE(x.extremes, FALSE) AS extremes
+        FROM jsonb_to_recordset(windows) AS x(key TEXT, symbol TEXT, start_at TEXT, end_at TEXT, extremes BOOLEAN)
+    )
+    SELECT
+        w.key,
+        w.symbol,
+        f.datetime,
+        f.close,
+        l.datetime,
+        l.close,
+        agg.min_low,
+        agg.min_low_datetime,
+        agg.max_high,
+        agg.max_high_datetime,
+        agg.bar_count
+    FROM w
+    -- first/last use the (symbol, datetime) primary key index: one index probe each
+    CROSS JOIN LATERAL (
+        SELECT b.datetime, b.close
+        FROM bars_1m b
+        WHERE b.symbol = w.symbol
+          AND (w.start_at IS NULL OR b.datetime >= w.start_at)
+          AND (w.end_at IS NULL OR b.datetime < w.end_at)
+        ORDER BY b.datetime ASC
+        LIMIT 1
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT b.datetime, b.close
+        FROM bars_1m b
+        WHERE b.symbol = w.symbol
+          AND (w.start_at IS NULL OR b.datetime >= w.start_at)
+          AND (w.end_at IS NULL OR b.datetime < w.end_at)
+        ORDER BY b.datetime DESC
+        LIMIT 1
+    ) l
+    -- Extremes: a range scan of the bounded window, skipped (one-time false filter) otherwise
+    LEFT JOIN LATERAL (
+        SELECT
+            MIN(b.low) AS min_low,
+            (ARRAY_AGG(b.datetime ORDER BY b.low ASC, b.datetime ASC))[1] AS min_low_datetime,
+            MAX(b.high) AS max_high,
+            (ARRAY_AGG(b.datetime ORDER BY b.high DESC, b.datetime ASC))[1] AS max_high_datetime,
+            COUNT(*) AS bar_count
+        FROM bars_1m b
+        WHERE w.extremes
+          AND w.start_at IS NOT NULL
+          AND b.symbol = w.symbol
+          AND b.datetime >= w.start_at
+          AND (w.end_at IS NULL OR b.datetime < w.end_at)
+    ) agg ON w.extremes AND w.start_at IS NOT NULL;
+$$;
+
+GRANT EXECUTE ON FUNCTION bars_1m_window_stats(JSONB) TO anon, authenticated, service_role;
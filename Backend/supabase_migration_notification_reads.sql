@@ -0,0 +1,39 @@
+-- Notification panel reads and clear-all. Run in Supabase SQL editor.
+--
+-- GET /notifications reads today's generated_notifications (optionally only rows
+-- created after a `since` cursor) and the unread alerts; both are index range scans.
+-- Notifications are generated by the background worker, not on read.
+
+CREATE INDEX IF NOT EXISTS idx_generated_notifications_date_created
+    ON generated_notifications(date, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_unread_triggered
+    ON alerts(triggered_at DESC) WHERE is_read = 0;
+
+-- POST /notifications/clear-all: dismiss the day's notifications and read + dismiss
+-- every unread alert in one statement. Returns the number of newly dismissed ids.
+CREATE OR REPLACE FUNCTION clear_all_notifications(p_date TEXT, p_dismissed_at TEXT)
+RETURNS INTEGER
+LANGUAGE sql
+VOLATILE
+AS $$
+    WITH read_alerts AS (
+        UPDATE alerts SET is_read = 1
+        WHERE is_read = 0
+        RETURNING 'ALERT_' || id AS notification_id
+    ),
+    ids AS (
+        SELECT id AS notification_id FROM generated_notifications WHERE date = p_date
+        UNION
+        SELECT notification_id FROM read_alerts
+    ),
+    dismissed AS (
+        INSERT INTO dismissed_notifications (notification_id, dismissed_at)
+        SELECT notification_id, p_dismissed_at FROM ids
+        ON CONFLICT (notification_id) DO NOTHING
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM dismissed;
+$$;
+
+GRANT EXECUTE ON FUNCTION clear_all_notifications(TEXT, TEXT) TO anon, authenticated, service_role;
@@ -6,6 +6,9 @@ import pytest
 # Make all Backend modules importable from within the tests/ subdirectory.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# The app's startup hooks must not run real notification checks during tests
+os.environ.setdefault("NOTIFICATION_WORKER", "0")
+
 
 # ── Shared data fixtures ──────────────────────────────────────────────────────
 
@@ -0,0 +1,121 @@
+"""
+5 tests for volatility-normalized chart events (/history?events=adaptive):
+  z-scores per symbol (1), runs and gaps (2), incremental cached state (1),
+  ids shared with the fixed-floor events (1).
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import adaptive_events, bar_store
+from services.bar_cache import bar_cache
+from services.chart_series import ChartSeries
+
+
+def _minute_frame(closes, opens=None, sessions=1):
+    per_day = len(closes) // sessions
+    days = pd.bdate_range("2024-03-04", periods=sessions)
+    index = (days.values[:, None] + pd.timedelta_range("09:30:00", periods=per_day, freq="min").values).ravel()
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "symbol": "ZZ", "datetime": pd.DatetimeIndex(index).strftime("%Y-%m-%d %H:%M:%S"),
+        "open": closes if opens is None else opens, "high": closes, "low": closes, "close": closes,
+        "volume": 100,
+    })
+
+
+def _series(df):
+    return ChartSeries("ZZ", "datetime", df["datetime"].to_numpy(dtype=object),
+                       {c: df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume")})
+
+
+def _walk(n, vol, seed=0):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).standard_normal(n) * vol))
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", "")
+    bar_cache.clear()
+    adaptive_events.clear()
+    yield
+    bar_cache.clear()
+    adaptive_events.clear()
+
+
+class TestScores:
+
+    def test_the_same_move_is_an_event_only_on_the_quiet_symbol(self):
+        events = {}
+        for name, vol in (("quiet", 0.0002), ("volatile", 0.004)):
+            closes = _walk(200, vol)
+            closes[150:] *= 1.003  # +0.3% in one bar
+            events[name] = adaptive_events.adaptive_events(_series(_minute_frame(closes)), "1D")
+        assert [(e["time"][-8:], e["kind"], e["bars"]) for e in events["quiet"]] == [("12:00:00", "move", 1)]
+        assert events["quiet"][0]["z_score"] > 10 and events["quiet"][0]["pct_change"] == pytest.approx(0.3, abs=0.1)
+        assert events["volatile"] == []
+
+
+class TestKinds:
+
+    def test_a_steady_five_bar_run_is_scored_as_one_move(self):
+        closes = _walk(200, 0.0005, seed=1)
+        closes[150:155] *= np.cumprod(np.full(5, 1.0012))  # five moderate steps the same way
+        closes[155:] *= 1.0012 ** 5
+        events = adaptive_events.adaptive_events(_series(_minute_frame(closes)), "1D")
+        assert [(e["kind"], e["bars"]) for e in events] == [("run", 5)]
+        assert events[0]["time"].endswith("12:04:00")
+
+    def test_session_open_gaps_are_scored_against_past_gaps(self):
+        sessions, per_day = 8, 60
+        closes = _walk(sessions * per_day, 0.0003, seed=2)
+        opens = closes.copy()
+        rng = np.random.default_rng(5)
+        for d in range(1, sessions):
+            jump = 1.05 if d == sessions - 1 else 1 + rng.normal(0, 0.002)
+            closes[d * per_day:] *= jump
+            opens[d * per_day:] *= jump
+        df = _minute_frame(closes, opens, sessions=sessions)
+        events = adaptive_events.adaptive_events(_series(df), "5D")
+        gaps = [e for e in events if e["kind"] == "gap"]
+        assert [e["time"] for e in gaps] == [df["datetime"].iloc[(sessions - 1) * per_day]]
+        assert gaps[0]["pct_change"] == pytest.approx(5.0, abs=0.01)
+
+
+class TestCachedState:
+
+    def test_appended_bars_continue_from_the_stored_ewma(self):
+        df = _minute_frame(_walk(780, 0.0004, seed=3), sessions=2)
+        bar_cache.put("bars_1m", "ZZ", df.iloc[:700])
+        adaptive_events.adaptive_events(_series(df.iloc[:700]), "1D")
+        assert ("bars_1m", "ZZ") in adaptive_events._scores
+
+        bar_cache.append("bars_1m", "ZZ", df.iloc[700:])
+        with patch.object(adaptive_events, "_score", wraps=adaptive_events._score) as score:
+            adaptive_events.adaptive_events(_series(df), "1D")
+        # The revised last bar, the 80 new ones and RUN_BARS rows of context
+        assert len(score.call_args.args[0]["ts"]) == adaptive_events.RUN_BARS + 81
+        incremental = adaptive_events._scores[("bars_1m", "ZZ")].bars
+
+        adaptive_events.clear()
+        adaptive_events.adaptive_events(_series(df), "1D")
+        full = adaptive_events._scores[("bars_1m", "ZZ")].bars
+        np.testing.assert_allclose(incremental["z"], full["z"], rtol=1e-9, equal_nan=True)
+
+
+class TestIds:
+
+    def test_events_carry_the_chart_event_id_for_their_bar(self):
+        closes = _walk(200, 0.0002)
+        closes[150:] *= 1.003
+        df = _minute_frame(closes)
+        events = adaptive_events.adaptive_events(_series(df), "1D")
+        assert [e["id"] for e in events] == ["ZZ:1min:2024-03-04 12:00:00"]
+        weeks = pd.date_range("2020-01-03", periods=120, freq="W-FRI").strftime("%Y-%m-%d").to_numpy(dtype=object)
+        closes = _walk(120, 0.01, seed=4)
+        closes[100:] *= 1.2
+        weekly = adaptive_events.adaptive_events(
+            ChartSeries("ZZ", "date", weeks, {c: closes for c in ("open", "high", "low", "close", "volume")}), "5Y")
+        assert f"ZZ:1week:{weeks[100]}" in [e["id"] for e in weekly]
@@ -0,0 +1,106 @@
+"""
+7 tests for the in-memory bar cache and its use in DataManager:
+  reads (2), in-place append (2), LRU bounds (2), DataManager warm path (1).
+"""
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from services.bar_cache import BarCache
+
+
+def _rows(times, closes, symbol="AAPL"):
+    return pd.DataFrame({
+        "symbol": symbol, "datetime": times,
+        "open": closes, "high": closes, "low": closes, "close": closes,
+        "volume": [10] * len(times),
+    })
+
+
+def _minutes(n, start="2024-01-02 09:30:00"):
+    return [t.strftime("%Y-%m-%d %H:%M:%S") for t in pd.date_range(start, periods=n, freq="min")]
+
+
+class TestBarCacheReads:
+
+    def test_get_slices_from_start_and_returns_a_copy(self):
+        cache = BarCache()
+        cache.put("bars_1m", "AAPL", _rows(_minutes(5), [1.0, 2.0, 3.0, 4.0, 5.0]))
+        df = cache.get("bars_1m", "AAPL", start="2024-01-02 09:32:00")
+        assert df["close"].tolist() == [3.0, 4.0, 5.0]
+        df.loc[0, "close"] = 999.0
+        assert cache.get("bars_1m", "AAPL")["close"].tolist()[2] == 3.0
+
+    def test_miss_returns_none_and_counts(self):
+        cache = BarCache()
+        assert cache.get("bars_1m", "MSFT") is None
+        assert cache.stats()["misses"] == 1
+
+
+class TestBarCacheAppend:
+
+    def test_append_writes_into_spare_capacity(self):
+        cache = BarCache()
+        cache.put("bars_1m", "AAPL", _rows(_minutes(3), [1.0, 2.0, 3.0]))
+        series = cache._entries[("bars_1m", "AAPL")]
+        buffer_before = series.arrays["close"]
+        cache.append("bars_1m", "AAPL", _rows(_minutes(2, "2024-01-02 09:33:00"), [4.0, 5.0]))
+        assert series.arrays["close"] is buffer_before
+        assert cache.get("bars_1m", "AAPL")["close"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert cache.latest_timestamp("bars_1m", "AAPL") == "2024-01-02 09:34:00"
+
+    def test_overlapping_append_revises_last_bar_and_grows(self):
+        cache = BarCache()
+        cache.put("bars_1m", "AAPL", _rows(_minutes(3), [1.0, 2.0, 3.0]))
+        refetch = _rows(_minutes(400, "2024-01-02 09:32:00"), [3.5] + [4.0] * 399)
+        cache.append("bars_1m", "AAPL", refetch)
+        df = cache.get("bars_1m", "AAPL")
+        assert len(df) == 402
+        assert df["close"].tolist()[:4] == [1.0, 2.0, 3.5, 4.0]
+        assert df["volume"].dtype == "int64"
+
+
+class TestBarCacheBounds:
+
+    def test_least_recently_used_symbol_is_evicted(self):
+        cache = BarCache(max_symbols=2)
+        cache.put("bars_1m", "A", _rows(_minutes(2), [1.0, 2.0], "A"))
+        cache.put("bars_1m", "B", _rows(_minutes(2), [1.0, 2.0], "B"))
+        cache.get("bars_1m", "A")
+        cache.put("bars_1m", "C", _rows(_minutes(2), [1.0, 2.0], "C"))
+        assert not cache.contains("bars_1m", "B")
+        assert cache.contains("bars_1m", "A") and cache.contains("bars_1m", "C")
+        assert cache.stats()["evictions"] == 1
+
+    def test_memory_budget_is_enforced(self):
+        cache = BarCache(max_symbols=100, max_bytes=200_000)
+        for sym in ("A", "B", "C"):
+            cache.put("bars_1m", sym, _rows(_minutes(1000), [1.0] * 1000, sym))
+        assert cache.memory_bytes() <= 200_000
+        assert cache.contains("bars_1m", "C")
+        assert cache.stats()["evictions"] >= 1
+
+
+class TestDataManagerWarmPath:
+
+    def test_supabase_is_read_once_then_served_from_memory(self, monkeypatch):
+        from services import bar_store, stock_manager
+        from services.bar_cache import bar_cache
+
+        monkeypatch.setattr(bar_store, "BAR_STORE_DIR", "")
+        bar_cache.clear()
+        now_et = datetime.now(stock_manager.ET).strftime("%Y-%m-%d %H:%M:%S")
+        rows = _rows(["2024-01-02 09:30:00", now_et], [1.0, 2.0], "ZZZT")
+
+        dm = stock_manager.DataManager()
+        dm._td = MagicMock()
+        with patch.object(stock_manager, "fetch_history", return_value=rows) as fetch, \
+             patch.object(stock_manager, "is_market_open", return_value=False):
+            first = dm.get_stock_data("ZZZT", "1min")
+            second = dm.get_stock_data("ZZZT", "1min")
+
+        assert fetch.call_count == 1
+        dm._td.time_series.assert_not_called()
+        assert first["close"].tolist() == second["close"].tolist() == [1.0, 2.0]
+        bar_cache.clear()
@@ -0,0 +1,77 @@
+"""
+4 tests for the vectorized bar-ingest path in database.save_bars:
+  record encoding (2), batched upload (2).
+"""
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import database
+
+
+class _FakeClient:
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        self._table = name
+        return self
+
+    def upsert(self, batch, on_conflict):
+        with self._lock:
+            self.batches.append((self._table, on_conflict, batch))
+            self.threads.add(threading.get_ident())
+        return self
+
+    def execute(self):
+        return None
+
+
+def _twelvedata_frame(n):
+    idx = pd.date_range("2024-01-02 09:30:00", periods=n, freq="min", name="datetime")
+    return pd.DataFrame({
+        "open": np.arange(n, dtype=float), "high": np.arange(n, dtype=float) + 1,
+        "low": np.arange(n, dtype=float) - 1, "close": np.arange(n, dtype=float),
+        "volume": np.full(n, 1500.0),
+    }, index=idx)
+
+
+class TestBarEncoding:
+
+    def test_records_are_json_native(self):
+        df = _twelvedata_frame(2)
+        df.loc[df.index[1], "close"] = np.nan
+        batch = next(database._bar_record_batches("AAPL", df, "datetime"))
+        assert batch[0] == {"symbol": "AAPL", "datetime": "2024-01-02 09:30:00",
+                            "open": 0.0, "high": 1.0, "low": -1.0, "close": 0.0, "volume": 1500}
+        assert type(batch[0]["volume"]) is int and type(batch[0]["open"]) is float
+        assert batch[1]["close"] is None
+
+    def test_daily_frame_with_datetime_column(self):
+        df = pd.DataFrame({"date": pd.to_datetime(["2024-01-02"]), "open": [1.0], "high": [1.0],
+                           "low": [1.0], "close": [1.0], "volume": [7]})
+        batch = next(database._bar_record_batches("MSFT", df, "date"))
+        assert batch[0]["date"] == "2024-01-02"
+
+
+class TestBatchedUpload:
+
+    def test_small_frame_is_one_inline_upsert(self):
+        client = _FakeClient()
+        with patch.object(database, "_get_client", return_value=client):
+            database.save_bars("AAPL", _twelvedata_frame(10), "bars_1m")
+        assert [(t, c, len(b)) for t, c, b in client.batches] == [("bars_1m", "symbol,datetime", 10)]
+        assert client.threads == {threading.get_ident()}
+
+    def test_large_frame_is_split_into_concurrent_batches(self):
+        client = _FakeClient()
+        with patch.object(database, "_get_client", return_value=client):
+            database.save_bars("AAPL", _twelvedata_frame(5000), "bars_1m")
+        sizes = sorted(len(b) for _, _, b in client.batches)
+        assert sizes == [database.BAR_UPLOAD_BATCH_SIZE] * 10
+        uploaded = sorted(r["datetime"] for _, _, b in client.batches for r in b)
+        assert len(set(uploaded)) == 5000
@@ -0,0 +1,78 @@
+"""
+5 tests for the local Arrow bar store:
+  round trip (2), range queries (1), incremental append (2).
+"""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from services import bar_store
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _supabase_rows(times, closes):
+    return pd.DataFrame({
+        "symbol": "AAPL",
+        "datetime": times,
+        "open": closes, "high": closes, "low": closes, "close": closes,
+        "volume": [100] * len(times),
+    })
+
+
+def _twelvedata_frame(times, closes):
+    idx = pd.DatetimeIndex(pd.to_datetime(times), name="datetime")
+    return pd.DataFrame({"open": closes, "high": closes, "low": closes, "close": closes,
+                         "volume": [200] * len(times)}, index=idx)
+
+
+class TestRoundTrip:
+
+    def test_read_returns_supabase_shaped_frame(self):
+        rows = _supabase_rows(["2024-01-02 09:30:00", "2024-01-02 10:30:00"], [1.0, 2.0])
+        bar_store.write("bars_1h", "AAPL", rows)
+        df = bar_store.read("bars_1h", "AAPL")
+        assert list(df.columns) == ["symbol", "datetime", "open", "high", "low", "close", "volume"]
+        assert df["datetime"].tolist() == ["2024-01-02 09:30:00", "2024-01-02 10:30:00"]
+        assert bar_store.latest_timestamp("bars_1h", "AAPL") == "2024-01-02 10:30:00"
+
+    def test_missing_symbol_reads_none(self):
+        assert bar_store.read("bars_1d", "MSFT") is None
+        assert bar_store.latest_timestamp("bars_1d", "MSFT") is None
+
+
+class TestRangeQueries:
+
+    def test_start_and_end_bound_the_slice(self):
+        days = [f"2024-01-{d:02d}" for d in range(1, 11)]
+        bar_store.write("bars_1d", "AAPL", pd.DataFrame({
+            "symbol": "AAPL", "date": days, "open": 1.0, "high": 1.0, "low": 1.0,
+            "close": [float(i) for i in range(10)], "volume": 1,
+        }))
+        df = bar_store.read("bars_1d", "AAPL", start="2024-01-04", end="2024-01-07")
+        assert df["date"].tolist() == ["2024-01-04", "2024-01-05", "2024-01-06"]
+
+
+class TestAppend:
+
+    def test_append_extends_twelvedata_frame(self):
+        bar_store.append("bars_1m", "AAPL", _twelvedata_frame(["2024-01-02 09:30:00"], [1.0]))
+        bar_store.append("bars_1m", "AAPL", _twelvedata_frame(["2024-01-02 09:31:00", "2024-01-02 09:32:00"], [2.0, 3.0]))
+        df = bar_store.read("bars_1m", "AAPL")
+        assert df["close"].tolist() == [1.0, 2.0, 3.0]
+        assert df["volume"].tolist() == [200, 200, 200]
+
+    def test_overlapping_append_revises_bars_in_its_span(self):
+        bar_store.write("bars_1h", "AAPL", _supabase_rows(
+            ["2024-01-02 09:30:00", "2024-01-02 10:30:00", "2024-01-02 11:30:00"], [1.0, 2.0, 3.0]))
+        # start_date is inclusive: the refetch repeats the latest stored bar with a revised close
+        bar_store.append("bars_1h", "AAPL", _twelvedata_frame(
+            ["2024-01-02 11:30:00", "2024-01-02 12:30:00"], [3.5, 4.0]))
+        df = bar_store.read("bars_1h", "AAPL")
+        assert df["datetime"].tolist()[-2:] == ["2024-01-02 11:30:00", "2024-01-02 12:30:00"]
+        assert df["close"].tolist() == [1.0, 2.0, 3.5, 4.0]
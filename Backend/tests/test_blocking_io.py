@@ -0,0 +1,68 @@
+"""
+3 tests for the bounded blocking-I/O pool:
+  back-to-back app lifespans (1), pool rebuilt after shutdown (1),
+  sentiment routes off the event loop (1).
+"""
+import asyncio
+import threading
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import blocking_io
+
+
+def _thread_name():
+    return threading.current_thread().name
+
+
+class TestLifespans:
+
+    def test_second_app_lifespan_can_still_run_blocking_work(self):
+        from main import app
+
+        for _ in range(2):
+            with TestClient(app) as c:
+                assert c.portal.call(blocking_io.run_blocking, _thread_name).startswith("blocking-io")
+                # asyncio.to_thread goes through the installed default executor
+                assert c.portal.call(asyncio.to_thread, _thread_name).startswith("blocking-io")
+
+
+class TestShutdown:
+
+    def test_shutdown_drops_the_pool_and_the_next_call_builds_a_new_one(self):
+        first = blocking_io._pool()
+        blocking_io.shutdown()
+        assert blocking_io._executor is None
+        assert asyncio.run(blocking_io.run_blocking(lambda: 7)) == 7
+        assert blocking_io._pool() is not first
+
+
+class TestRoutes:
+
+    def test_sentiment_routes_call_their_services_on_the_pool(self):
+        from routers import sentiment
+
+        threads = []
+
+        def record(value):
+            def call(*_args, **_kwargs):
+                threads.append(threading.current_thread().name)
+                return value
+            return call
+
+        app = FastAPI()
+        app.include_router(sentiment.router)
+        with patch.object(sentiment, "financial_data_service") as svc, \
+             patch.object(sentiment, "sentiment_engine") as engine:
+            svc.ingest_ticker.side_effect = record({"status": "ok"})
+            svc.get_ticker_data.side_effect = record([])
+            svc.get_latest_llm_input.side_effect = record({"ticker": "AAPL"})
+            engine.generate_report.side_effect = record({"ticker": "AAPL"})
+            client = TestClient(app)
+            assert client.post("/sentiment/ingest/aapl").status_code == 200
+            assert client.get("/sentiment/data/aapl").status_code == 200
+            assert client.get("/sentiment/llm-input/aapl").status_code == 200
+            assert client.get("/sentiment/report/aapl").status_code == 200
+        assert len(threads) == 4 and all(name.startswith("blocking-io") for name in threads)
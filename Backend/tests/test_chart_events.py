@@ -0,0 +1,60 @@
+"""
+4 tests for the array-based chart event engine:
+  selection rules (2), ties (1), records vs arrays (1).
+"""
+import numpy as np
+
+from services.chart_events import (
+    bar_pct_changes_for_inspection, compute_price_events, price_events_from_arrays,
+)
+
+
+def _day_bars(day, closes, start_minute=0):
+    return [{"time": f"{day} 10:{start_minute + i:02d}:00", "close": c} for i, c in enumerate(closes)]
+
+
+class TestSelection:
+
+    def test_one_event_per_day_capped_at_eight_in_time_order(self):
+        records = []
+        for d in range(1, 11):
+            # Day d has a +d% move and a smaller +0.5% move later on
+            records += _day_bars(f"2024-01-{d:02d}", [100.0, 100.0 + d, (100.0 + d) * 1.005])
+        events = compute_price_events(records, "5D")
+        assert [e["event_date"] for e in events] == [f"2024-01-{d:02d}" for d in range(3, 11)]
+        assert [e["label"] for e in events] == [f"Event {n}" for n in range(1, 9)]
+        assert events[0] == {"index": 1, "label": "Event 1", "time": "2024-01-03 10:01:00",
+                             "event_date": "2024-01-03", "price": 103.0, "pct_change": 3.0}
+
+    def test_1d_keeps_the_last_session_and_skips_non_positive_closes(self):
+        records = _day_bars("2024-01-02", [100.0, 150.0]) + _day_bars("2024-01-03", [0.0, 100.0, 100.5, 100.6])
+        events = compute_price_events(records, "1D")
+        assert [(e["time"], e["pct_change"]) for e in events] == [("2024-01-03 10:02:00", 0.5)]
+        inspection = bar_pct_changes_for_inspection(records, "1D")
+        assert [row["pct_change"] for row in inspection] == [None, 0.5, 0.099502]
+
+
+class TestTies:
+
+    def test_equal_moves_go_to_the_earlier_bar(self):
+        # The same +2% move twice on each day: the first bar of the day wins
+        records = []
+        for d in range(1, 10):
+            records += _day_bars(f"2024-02-{d:02d}", [100.0, 102.0, 100.0, 102.0])
+        events = compute_price_events(records, "1Y")
+        assert all(e["time"].endswith("10:01:00") for e in events)
+        # Nine equally strong days compete for eight slots: the latest day drops out
+        assert [e["event_date"][-2:] for e in events] == [f"{d:02d}" for d in range(1, 9)]
+
+
+class TestArrays:
+
+    def test_arrays_match_records_even_when_unsorted(self):
+        rng = np.random.default_rng(3)
+        times = np.array([f"2024-03-{1 + i // 60:02d} 10:{i % 60:02d}:00" for i in range(600)], dtype=object)
+        closes = np.round(100 + rng.standard_normal(600).cumsum(), 1)
+        shuffled = rng.permutation(600)
+        records = [{"time": t, "close": c} for t, c in zip(times[shuffled].tolist(), closes[shuffled].tolist())]
+        expected = price_events_from_arrays(times, closes, "3M")
+        assert expected and compute_price_events(records, "3M") == expected
+        assert price_events_from_arrays(times[shuffled], closes[shuffled], "3M") == expected
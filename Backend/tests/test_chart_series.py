@@ -0,0 +1,115 @@
+"""
+6 tests for the precomputed chart series behind /history:
+  window timeframes (2), weekly 5Y level (2), LTTB downsampling (1), records (1).
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import bar_store, chart_series, stock_manager
+from services.bar_cache import bar_cache
+
+NOW = datetime(2026, 10, 16, 17, 0)
+
+
+def _bars(times, col, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(len(times)).cumsum()
+    return pd.DataFrame({
+        "symbol": "ZZ", col: times, "open": close + 0.1, "high": close + 1, "low": close - 1,
+        "close": close, "volume": rng.integers(1, 1000, len(times)),
+    })
+
+
+def _daily(start="2021-09-01", end=NOW):
+    days = pd.bdate_range(start, end)
+    return _bars(days.strftime("%Y-%m-%d").tolist(), "date")
+
+
+def _pandas_weekly(df, cutoff):
+    d = df.assign(dt=pd.to_datetime(df["date"]))
+    d = d[d["dt"] >= cutoff].set_index("dt")
+    return d.resample("W-FRI").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna()
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", "")
+    bar_cache.clear()
+    chart_series.clear()
+    with patch.object(stock_manager.DataManager, "_refresh", lambda *a, **k: None):
+        yield
+    bar_cache.clear()
+    chart_series.clear()
+
+
+class TestWindows:
+
+    def test_month_view_is_the_hourly_window_since_the_cutoff(self):
+        hours = pd.date_range("2026-08-01 09:30", NOW, freq="h")
+        bar_cache.put("bars_1h", "ZZ", _bars(hours.strftime("%Y-%m-%d %H:%M:%S").tolist(), "datetime"))
+        series = chart_series.load_chart_series("ZZ", "1M", now=NOW)
+        assert series.time[0] >= (NOW - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+        assert series.time[-1] == hours[-1].strftime("%Y-%m-%d %H:%M:%S")
+        assert len(series) == int((hours >= NOW - timedelta(days=30)).sum())
+
+    def test_five_day_view_keeps_the_last_five_dates(self):
+        hours = [t for t in pd.date_range("2026-10-01 09:30", NOW, freq="h") if t.weekday() < 5 and 9 <= t.hour < 16]
+        bar_cache.put("bars_1h", "ZZ", _bars([t.strftime("%Y-%m-%d %H:%M:%S") for t in hours], "datetime"))
+        series = chart_series.load_chart_series("ZZ", "5D", now=NOW)
+        assert sorted({t[:10] for t in series.time}) == ["2026-10-12", "2026-10-13", "2026-10-14",
+                                                          "2026-10-15", "2026-10-16"]
+
+
+class TestWeekly:
+
+    def test_five_year_view_matches_a_pandas_weekly_resample(self):
+        daily = _daily()
+        bar_cache.put("bars_1d", "ZZ", daily)
+        series = chart_series.load_chart_series("ZZ", "5Y", now=NOW)
+        # The five-year cutoff lands mid-week, so the first week is partial
+        expected = _pandas_weekly(daily, NOW - timedelta(days=365 * 5))
+        assert series.time.tolist() == expected.index.strftime("%Y-%m-%d").tolist()
+        for col in ("open", "high", "low", "close", "volume"):
+            np.testing.assert_allclose(series.columns[col], expected[col].to_numpy(dtype=float))
+
+    def test_appended_bars_only_reaggregate_the_last_week(self):
+        daily = _daily(end="2026-10-14")
+        bar_cache.put("bars_1d", "ZZ", daily)
+        chart_series.load_chart_series("ZZ", "5Y", now=NOW)
+        weeks_before = chart_series._weekly_lods["ZZ"].weeks["label"].copy()
+
+        new_days = _bars(["2026-10-15", "2026-10-16", "2026-10-19"], "date", seed=7)
+        bar_cache.append("bars_1d", "ZZ", new_days)
+        with patch.object(chart_series, "_weekly", wraps=chart_series._weekly) as weekly:
+            series = chart_series.load_chart_series("ZZ", "5Y", now=NOW + timedelta(days=3))
+
+        assert len(weekly.call_args_list[0].args[0]["ts"]) == 6  # Oct 12-16 and Oct 19 only
+        assert len(chart_series._weekly_lods["ZZ"].weeks["label"]) == len(weeks_before) + 1
+        expected = _pandas_weekly(pd.concat([daily, new_days]), NOW + timedelta(days=3) - timedelta(days=365 * 5))
+        np.testing.assert_allclose(series.columns["close"], expected["close"].to_numpy())
+        assert series.time[-1] == "2026-10-23"
+
+
+class TestOutput:
+
+    def test_lttb_keeps_endpoints_and_the_spike(self):
+        y = np.sin(np.linspace(0, 6, 1000))
+        y[500] = 10.0
+        idx = chart_series.lttb_indices(y, 50)
+        assert len(idx) == 50 and idx[0] == 0 and idx[-1] == 999
+        assert 500 in idx
+        assert np.all(np.diff(idx) > 0)
+
+    def test_records_are_plain_python_rows(self):
+        bar_cache.put("bars_1d", "ZZ", _daily(start="2026-01-01"))
+        records = chart_series.load_chart_series("ZZ", "1Y", now=NOW).downsample(20).records()
+        assert len(records) == 20
+        first = records[0]
+        assert set(first) == {"symbol", "date", "open", "high", "low", "close", "volume", "time"}
+        assert first["time"] == first["date"] == "2026-01-01"
+        assert type(first["close"]) is float and type(first["volume"]) is int
@@ -0,0 +1,101 @@
+"""
+5 tests for POST /chat with a server-side conversation_id:
+  follow-up answered from the stored session (1), follow-up without usable
+  context and failed news fetch fall back to the full turn (1), stored history
+  over the client's copy (1), rejected message and expired session (2).
+"""
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import chat
+from services.conversation_store import ConversationStore
+from services.prompt_router import ResolvedContext
+
+NEWS = [{"headline": "Apple beats estimates", "source": "Reuters", "summary": "Revenue up 8%."}]
+
+
+@pytest.fixture
+def store():
+    fresh = ConversationStore(max_sessions=8, sqlite_path=None)
+    with patch.object(chat, "conversation_store", fresh):
+        yield fresh
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def _news_intent(*_args, **_kwargs):
+    return ResolvedContext(intent="FINANCIAL_NEWS", ticker="AAPL", contextual_reference=None)
+
+
+class TestFollowups:
+
+    def test_second_turn_with_the_same_id_is_answered_from_the_session(self, client, store):
+        with patch.object(chat, "classify_and_resolve_prompt", side_effect=_news_intent) as classify, \
+             patch.object(chat, "fetch_standard_stock_card_data", return_value=None), \
+             patch.object(chat.news_processor, "fetch_and_process_news", return_value=NEWS), \
+             patch.object(chat, "generate_aggregated_summary", return_value="Strong quarter."), \
+             patch.object(chat, "get_chat_response", return_value="They say Apple grew.") as answer:
+            first = client.post("/api/v1/chat", json={"message": "Latest AAPL news"}).json()
+            conversation_id = first["conversation_id"]
+            second = client.post("/api/v1/chat", json={"message": "Summarize them",
+                                                       "conversation_id": conversation_id}).json()
+
+        assert first["source"] == "finnhub_news"
+        assert second["source"] == "ai100_session" and second["conversation_id"] == conversation_id
+        assert classify.call_count == 1
+        assert "Apple beats estimates" in answer.call_args.args[0]
+        assert [m["role"] for m in store.get(conversation_id)["history"]] == ["user", "assistant"] * 2
+
+    def test_failed_fetch_leaves_no_context_so_the_followup_takes_the_full_path(self, client, store):
+        with patch.object(chat, "classify_and_resolve_prompt", side_effect=_news_intent) as classify, \
+             patch.object(chat, "fetch_standard_stock_card_data", return_value=None), \
+             patch.object(chat.news_processor, "fetch_and_process_news", side_effect=RuntimeError("finnhub down")), \
+             patch.object(chat, "get_chat_response", return_value="Here is what I know."):
+            first = client.post("/api/v1/chat", json={"message": "Latest AAPL news", "history": [],
+                                                      "conversation_id": "c1"}).json()
+            second = client.post("/api/v1/chat", json={"message": "Summarize them",
+                                                       "conversation_id": "c1"}).json()
+
+        assert first["source"] == "ai100" and first["conversation_id"] == "c1"
+        assert second["source"] != "ai100_session" and second["conversation_id"] == "c1"
+        assert classify.call_count == 2
+        assert len(store.get("c1")["history"]) == 4
+
+
+class TestHistory:
+
+    def test_a_live_session_uses_its_stored_history_not_the_clients(self, client, store):
+        store.update("c1", history=[{"role": "user", "content": "stored"}])
+        with patch.object(chat, "classify_and_resolve_prompt", side_effect=_news_intent) as classify, \
+             patch.object(chat, "fetch_standard_stock_card_data", return_value=None), \
+             patch.object(chat.news_processor, "fetch_and_process_news", return_value=[]):
+            client.post("/api/v1/chat", json={"message": "Latest AAPL news", "conversation_id": "c1",
+                                              "history": [{"role": "user", "content": "client copy"}]})
+        assert classify.call_args.args[1] == [{"role": "user", "content": "stored"}]
+
+
+class TestErrors:
+
+    def test_blank_message_is_rejected_without_touching_the_session(self, client, store):
+        store.update("c1", ticker="AAPL")
+        resp = client.post("/api/v1/chat", json={"message": "   ", "conversation_id": "c1"})
+        assert resp.status_code == 400
+        assert store.get("c1")["history"] == []
+
+    def test_expired_session_asks_for_history_then_is_seeded_from_it(self, client, store):
+        body = {"message": "Hello", "conversation_id": "gone"}
+        expired = client.post("/api/v1/chat", json=body)
+        assert expired.status_code == 409 and expired.json()["detail"] == chat.SESSION_EXPIRED_DETAIL
+
+        history = [{"role": "user", "content": "Latest AAPL news"}, {"role": "assistant", "content": "..."}]
+        resent = client.post("/api/v1/chat", json={**body, "history": history})
+        assert resent.status_code == 200 and resent.json()["conversation_id"] == "gone"
+        assert [m["content"] for m in store.get("gone")["history"]][:2] == ["Latest AAPL news", "..."]
@@ -0,0 +1,63 @@
+"""
+6 tests for the server-side chat session store:
+  LRU behaviour (2), SQLite spill (1), TTL (1), stored fields (2).
+"""
+import time
+
+from services.conversation_store import ConversationStore, MAX_HISTORY_MESSAGES
+
+
+class TestConversationStoreLRU:
+
+    def test_unknown_conversation_returns_none(self):
+        store = ConversationStore(max_sessions=2, sqlite_path=None)
+        assert store.get("missing") is None
+
+    def test_least_recently_used_session_is_evicted(self):
+        store = ConversationStore(max_sessions=2, sqlite_path=None)
+        store.update("a", ticker="AAPL")
+        store.update("b", ticker="MSFT")
+        store.get("a")                       # touch a → b becomes LRU
+        store.update("c", ticker="NVDA")
+        assert store.get("b") is None
+        assert store.get("a")["ticker"] == "AAPL"
+        assert store.get("c")["ticker"] == "NVDA"
+
+
+class TestConversationStoreSpill:
+
+    def test_evicted_session_is_promoted_back_from_sqlite(self, tmp_path):
+        store = ConversationStore(max_sessions=1, sqlite_path=str(tmp_path / "sessions.db"))
+        store.update("a", ticker="AAPL", news_items=[{"headline": "Apple beats"}])
+        store.update("b", ticker="MSFT")     # spills a
+        session = store.get("a")
+        assert session["ticker"] == "AAPL"
+        assert session["news_items"] == [{"headline": "Apple beats"}]
+        assert len(store) == 1               # b was spilled in turn
+
+
+class TestConversationStoreTTL:
+
+    def test_expired_session_is_dropped(self):
+        store = ConversationStore(max_sessions=4, ttl_seconds=60, sqlite_path=None)
+        store.update("a", ticker="AAPL")
+        store._sessions["a"]["updated_at"] = time.time() - 120
+        assert store.get("a") is None
+
+
+class TestConversationStoreFields:
+
+    def test_news_items_drop_embeddings(self):
+        store = ConversationStore(sqlite_path=None)
+        store.update("a", news_items=[{"headline": "h", "summary": "s", "embedding": [0.1] * 384}])
+        item = store.get("a")["news_items"][0]
+        assert "embedding" not in item
+        assert item["headline"] == "h"
+
+    def test_history_is_capped(self):
+        store = ConversationStore(sqlite_path=None)
+        for i in range(MAX_HISTORY_MESSAGES):
+            store.append_turn("a", f"question {i}", f"answer {i}")
+        history = store.get("a")["history"]
+        assert len(history) == MAX_HISTORY_MESSAGES
+        assert history[-1] == {"role": "assistant", "content": f"answer {MAX_HISTORY_MESSAGES - 1}"}
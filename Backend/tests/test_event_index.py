@@ -0,0 +1,103 @@
+"""
+4 tests for the per-day event index behind /history events:
+  same events as a full scan (1), incremental refresh (1), persisted index (1),
+  stable ids (1).
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import bar_store, event_index
+from services.bar_cache import bar_cache
+from services.chart_events import price_events_from_arrays
+from services.chart_series import ChartSeries
+
+
+def _hourly(sessions=60, seed=0):
+    days = pd.bdate_range("2025-01-02", periods=sessions)
+    index = (days.values[:, None] + pd.timedelta_range("09:30:00", periods=7, freq="h").values).ravel()
+    close = np.round(100 * np.exp(np.cumsum(np.random.default_rng(seed).standard_normal(len(index)) * 0.005)), 1)
+    return pd.DataFrame({
+        "symbol": "ZZ", "datetime": pd.DatetimeIndex(index).strftime("%Y-%m-%d %H:%M:%S"),
+        "open": close, "high": close, "low": close, "close": close, "volume": 10,
+    })
+
+
+def _series(df):
+    return ChartSeries("ZZ", "datetime", df["datetime"].to_numpy(dtype=object),
+                       {c: df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume")})
+
+
+def _without_ids(events):
+    return [{k: v for k, v in e.items() if k != "id"} for e in events]
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", str(tmp_path))
+    bar_cache.clear()
+    event_index.clear()
+    yield tmp_path
+    bar_cache.clear()
+    event_index.clear()
+
+
+class TestEquivalence:
+
+    def test_windows_match_a_full_scan_as_bars_arrive(self):
+        df = _hourly()
+        bar_cache.put("bars_1h", "ZZ", df.iloc[:200])
+        cached = 200
+        for end in (200, 207, 215, 240, len(df)):
+            # Each append also revises the last cached bar
+            bar_cache.append("bars_1h", "ZZ", df.iloc[cached - 1:end])
+            cached = end
+            for start in (0, 3, 50, end - 30):
+                window = _series(df.iloc[start:end])
+                for timeframe in ("5D", "1M", "3M"):
+                    expected = price_events_from_arrays(window.time, window.columns["close"], timeframe)
+                    assert _without_ids(event_index.chart_events(window, timeframe)) == expected
+
+
+class TestRefresh:
+
+    def test_appended_bars_rescan_from_the_last_indexed_day_only(self):
+        df = _hourly()
+        bar_cache.put("bars_1h", "ZZ", df.iloc[:-10])
+        event_index.day_peaks("bars_1h", "ZZ")
+        bar_cache.append("bars_1h", "ZZ", df.iloc[-10:])
+        with patch.object(event_index, "_day_peaks", wraps=event_index._day_peaks) as scan:
+            peaks = event_index.day_peaks("bars_1h", "ZZ")
+            event_index.day_peaks("bars_1h", "ZZ")
+        # The partial last day (4 of its 7 bars indexed) plus the 10 new bars, once
+        assert scan.call_count == 1 and len(scan.call_args.args[0]) == 14
+        assert len(peaks["date"]) == df["datetime"].str[:10].nunique()
+
+    def test_the_index_is_persisted_and_resumed_after_a_restart(self, store):
+        df = _hourly()
+        bar_cache.put("bars_1h", "ZZ", df.iloc[:-7])
+        before = event_index.day_peaks("bars_1h", "ZZ")
+        assert (store / "events" / "bars_1h" / "ZZ.json").exists()
+
+        event_index.clear()
+        bar_cache.put("bars_1h", "ZZ", df)  # the process restarts with one more session of bars
+        with patch.object(event_index, "_day_peaks", wraps=event_index._day_peaks) as scan:
+            after = event_index.day_peaks("bars_1h", "ZZ")
+        assert len(scan.call_args.args[0]) == 14
+        assert after["time"][:-2].tolist() == before["time"][:-1].tolist()
+
+
+class TestIds:
+
+    def test_ids_are_stable_across_requests_and_timeframes(self):
+        df = _hourly()
+        bar_cache.put("bars_1h", "ZZ", df)
+        month = event_index.chart_events(_series(df.iloc[-150:]), "1M")
+        quarter = event_index.chart_events(_series(df), "3M")
+        again = event_index.chart_events(_series(df.iloc[-150:]), "1M")
+        assert [e["id"] for e in month] == [e["id"] for e in again]
+        assert month[0]["id"] == f"ZZ:1h:{month[0]['time']}"
+        shared = {e["time"] for e in month} & {e["time"] for e in quarter}
+        assert shared and all(f"ZZ:1h:{t}" in {e["id"] for e in quarter} for t in shared)
@@ -0,0 +1,132 @@
+"""
+7 tests for the batched chart event-news pipeline:
+  bulk cache read (1), clustered Finnhub calls + UTC bucketing + one upsert (1),
+  capped responses (1), lazy profile lookup (1), force refresh (1), in-process rows and shared lookups (2).
+"""
+import threading
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import event_news_service as ens
+
+
+def _ts(day, hour=15):
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(hour=hour, tzinfo=timezone.utc).timestamp())
+
+
+def _article(day, headline, hour=15):
+    return {"datetime": _ts(day, hour), "headline": headline, "summary": "", "url": f"https://x/{day}/{hour}",
+            "source": "wire"}
+
+
+@pytest.fixture(autouse=True)
+def memory():
+    ens.clear_memory()
+    yield
+    ens.clear_memory()
+
+
+def _db(cached=None):
+    db = MagicMock()
+    db.get_stock_event_news_bulk.return_value = cached or {}
+    return db
+
+
+class TestBulkRead:
+
+    def test_fully_cached_dates_touch_neither_finnhub_nor_the_profile(self):
+        db = _db({d: {"headline": f"h{d}", "url": "u"} for d in ("2024-01-02", "2024-03-05")})
+        with patch.object(ens, "get_company_news_safe") as news, patch.object(ens, "get_finnhub_profile") as prof:
+            rows = ens.get_or_fetch_event_news(db, "aapl", ["2024-03-05", "2024-01-02", "2024-03-05T10:00"])
+        db.get_stock_event_news_bulk.assert_called_once_with("AAPL", ["2024-03-05", "2024-01-02"])
+        assert [(r["event_date"], r["from_cache"]) for r in rows] == [("2024-03-05", True), ("2024-01-02", True)]
+        news.assert_not_called()
+        prof.assert_not_called()
+        db.upsert_stock_event_news_bulk.assert_not_called()
+
+
+class TestMisses:
+
+    def test_nearby_misses_share_one_request_and_are_bucketed_by_utc_day(self):
+        db = _db({"2024-01-03": {"headline": "cached"}})
+        january = [_article("2024-01-02", "AAPL jumps"), _article("2024-01-09", "AAPL slides", hour=23),
+                   _article("2024-01-10", "Other news", hour=1)]
+        with patch.object(ens, "get_company_news_safe", side_effect=[january, []]) as news, \
+             patch.object(ens, "get_finnhub_profile", return_value={"name": "Apple Inc"}):
+            rows = ens.get_or_fetch_event_news(db, "AAPL", ["2024-01-02", "2024-01-03", "2024-01-09", "2024-06-14"])
+        assert [c.args for c in news.call_args_list] == [("AAPL", "2024-01-02", "2024-01-09"),
+                                                         ("AAPL", "2024-06-14", "2024-06-14")]
+        assert [r["headline"] for r in rows] == ["AAPL jumps", "cached", "AAPL slides", None]
+        assert rows[3]["summary"] == "No articles from Finnhub for this date"
+        saved = db.upsert_stock_event_news_bulk.call_args.args[0]
+        assert [(r["ticker"], r["event_date"]) for r in saved] == [("AAPL", "2024-01-02"), ("AAPL", "2024-01-09")]
+
+    def test_dates_a_capped_response_did_not_reach_are_requested_again(self):
+        # The capped response for Jan 02..12 only reaches back to Jan 10
+        capped = [_article("2024-01-12", "AAPL late"), _article("2024-01-10", "AAPL mid")]
+        earlier = [_article("2024-01-02", "AAPL early")]
+        with patch.object(ens, "get_company_news_safe", side_effect=[capped, earlier]) as news, \
+             patch.object(ens, "get_finnhub_profile", return_value={"name": "Apple Inc"}):
+            rows = ens.get_or_fetch_event_news(_db(), "AAPL", ["2024-01-02", "2024-01-05", "2024-01-10",
+                                                                "2024-01-12"])
+        assert [c.args for c in news.call_args_list] == [("AAPL", "2024-01-02", "2024-01-12"),
+                                                         ("AAPL", "2024-01-02", "2024-01-05")]
+        assert [r["headline"] for r in rows] == ["AAPL early", None, "AAPL mid", "AAPL late"]
+        assert rows[1]["summary"] == "No articles from Finnhub for this date"
+
+    def test_profile_is_fetched_once_and_only_without_a_ticker_match(self):
+        day = [_article("2024-02-01", "Apple unveils a headset"), _article("2024-02-01", "Markets wrap", hour=18)]
+        other = [_article("2024-02-02", "Apple supplier update")]
+        with patch.object(ens, "get_company_news_safe", return_value=day + other), \
+             patch.object(ens, "get_finnhub_profile", return_value={"name": "Apple Inc"}) as prof:
+            rows = ens.get_or_fetch_event_news(_db(), "AAPL", ["2024-02-01", "2024-02-02"])
+        assert [r["headline"] for r in rows] == ["Apple unveils a headset", "Apple supplier update"]
+        prof.assert_called_once_with("AAPL")
+
+
+class TestForceRefresh:
+
+    def test_force_refresh_skips_the_cache_read(self):
+        db = _db()
+        with patch.object(ens, "get_company_news_safe", return_value=[_article("2024-01-02", "AAPL beat")]), \
+             patch.object(ens, "get_finnhub_profile"):
+            rows = ens.get_or_fetch_event_news(db, "AAPL", ["2024-01-02"], force_refresh=True)
+        db.get_stock_event_news_bulk.assert_not_called()
+        assert rows[0]["headline"] == "AAPL beat" and rows[0]["from_cache"] is False
+
+
+class TestInProcess:
+
+    def test_prefetched_rows_make_the_follow_up_a_memory_read(self):
+        db = _db()
+        with patch.object(ens, "get_company_news_safe", return_value=[_article("2024-01-02", "AAPL beat")]), \
+             patch.object(ens, "get_finnhub_profile"):
+            futures = ens.prefetch_event_news(db, "aapl", ["2024-01-02", "2024-01-05"])
+            assert [r["headline"] for r in ens.resolved_event_news(futures, 5)] == ["AAPL beat", None]
+            rows = ens.get_event_news(db, "AAPL", ["2024-01-02"])
+        assert rows == [{"event_date": "2024-01-02", "headline": "AAPL beat", "summary": "AAPL beat",
+                         "url": "https://x/2024-01-02/15", "source": "wire", "from_cache": True}]
+        assert db.get_stock_event_news_bulk.call_count == 1
+
+    def test_a_caller_joins_the_lookup_already_in_flight(self):
+        gate, started = threading.Event(), threading.Event()
+
+        def slow_news(*args):
+            started.set()
+            gate.wait(5)
+            return [_article("2024-01-02", "AAPL beat")]
+
+        db = _db()
+        with patch.object(ens, "get_company_news_safe", side_effect=slow_news) as news, \
+             patch.object(ens, "get_finnhub_profile"):
+            ens.prefetch_event_news(db, "AAPL", ["2024-01-02"])
+            assert started.wait(5)
+            out = []
+            follower = threading.Thread(target=lambda: out.extend(ens.get_event_news(db, "AAPL", ["2024-01-02"])))
+            follower.start()
+            gate.set()
+            follower.join(5)
+        assert news.call_count == 1
+        assert out[0]["headline"] == "AAPL beat" and out[0]["from_cache"] is False
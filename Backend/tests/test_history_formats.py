@@ -0,0 +1,110 @@
+"""
+7 tests for /history response formats:
+  records default (1), columnar arrays (1), Arrow IPC (1), gzip + downsampling (1),
+  adaptive events (1), embedded event news (1), missing values without orjson (1).
+"""
+import io
+import json
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+from routers import stock_data
+from services.chart_series import ChartSeries
+
+
+def _series(n=5):
+    close = 100 + np.arange(n, dtype=float)
+    close[n // 2] += 5  # one notable move for the events list
+    times = pd.date_range("2024-01-02 09:30", periods=n, freq="min").strftime("%Y-%m-%d %H:%M:%S")
+    times = times.to_numpy(dtype=object)
+    return ChartSeries("AAPL", "datetime", times, {
+        "open": close - 0.5, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.full(n, 100.0),
+    })
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(stock_data, "PREFETCH_EVENT_NEWS", False)
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    app.include_router(stock_data.router)
+    return TestClient(app)
+
+
+class TestFormats:
+
+    def test_records_stay_the_default(self, client):
+        with patch.object(stock_data, "load_chart_history", return_value=_series()):
+            body = client.get("/history/aapl?timeframe=1D").json()
+        assert body["symbol"] == "AAPL"
+        assert body["data"][0] == {"symbol": "AAPL", "datetime": "2024-01-02 09:30:00", "open": 99.5,
+                                   "high": 101.0, "low": 99.0, "close": 100.0, "volume": 100,
+                                   "time": "2024-01-02 09:30:00"}
+        assert body["events"] and body["events"][0]["time"] == "2024-01-02 09:32:00"
+
+    def test_columnar_returns_parallel_arrays(self, client):
+        with patch.object(stock_data, "load_chart_history", return_value=_series()):
+            body = client.get("/history/AAPL?timeframe=1D&format=columnar").json()
+        assert set(body) == {"symbol", "time_key", "t", "o", "h", "l", "c", "v", "events"}
+        assert body["t"][1] == "2024-01-02 09:31:00" and body["c"] == [100.0, 101.0, 107.0, 103.0, 104.0]
+        assert body["v"] == [100] * 5
+
+    def test_missing_values_are_null_with_or_without_orjson(self):
+        series = _series()
+        series.columns["close"][1] = np.nan
+        for fmt in ("records", "columnar"):
+            fast, _ = stock_data.encode_history(series, "1D", fmt, events=[])
+            with patch.object(stock_data, "orjson", None):
+                plain, _ = stock_data.encode_history(series, "1D", fmt, events=[])
+            assert b"NaN" not in plain
+            assert json.loads(plain) == json.loads(fast)
+        assert json.loads(plain)["c"][1] is None
+
+    def test_arrow_stream_round_trips_with_events(self, client):
+        pa = pytest.importorskip("pyarrow")
+        with patch.object(stock_data, "load_chart_history", return_value=_series()):
+            response = client.get("/history/AAPL?timeframe=1D&format=arrow")
+        assert response.headers["content-type"] == stock_data.ARROW_MEDIA_TYPE
+        table = pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+        assert table.column_names == ["t", "o", "h", "l", "c", "v"]
+        assert table.column("c").to_pylist()[2] == 107.0
+        assert json.loads(table.schema.metadata[b"events"])[0]["pct_change"] > 4
+
+    def test_large_bodies_are_gzipped_and_points_downsample(self, client):
+        with patch.object(stock_data, "load_chart_history", return_value=_series(60)):
+            full = client.get("/history/AAPL?timeframe=1D", headers={"Accept-Encoding": "gzip"})
+            small = client.get("/history/AAPL?timeframe=1D&format=columnar&points=10")
+        assert full.headers["content-encoding"] == "gzip"
+        assert len(full.json()["data"]) == 60
+        body = small.json()
+        assert len(body["t"]) == 10 and body["t"][0] == "2024-01-02 09:30:00"
+        assert body["events"][0]["time"] == "2024-01-02 10:00:00"
+
+    def test_adaptive_events_carry_z_scores(self, client):
+        with patch.object(stock_data, "load_chart_history", return_value=_series(60)), \
+             patch.object(stock_data, "adaptive_events", return_value=[{"time": "x", "z_score": 5.0}]) as adaptive:
+            body = client.get("/history/AAPL?timeframe=1D&format=columnar&events=adaptive").json()
+            fixed = client.get("/history/AAPL?timeframe=1D&format=columnar").json()
+        assert body["events"] == [{"time": "x", "z_score": 5.0}]
+        assert adaptive.call_count == 1 and adaptive.call_args.args[1] == "1D"
+        assert "z_score" not in fixed["events"][0]
+
+    def test_include_event_news_embeds_rows_resolved_within_the_wait(self, client):
+        done, running = Future(), Future()
+        done.set_result({"event_date": "2024-01-02", "headline": "AAPL jumps"})
+        with patch.object(stock_data, "load_chart_history", return_value=_series()), \
+             patch.object(stock_data, "prefetch_event_news", return_value={"2024-01-02": done, "x": running}) as pre, \
+             patch.object(stock_data, "EVENT_NEWS_WAIT_S", 0.05):
+            body = client.get("/history/AAPL?timeframe=1D&include=event_news").json()
+            plain = client.get("/history/AAPL?timeframe=1D").json()
+        assert pre.call_args.args[1:] == ("AAPL", ["2024-01-02"])
+        assert body["event_news"] == [{"event_date": "2024-01-02", "headline": "AAPL jumps"}]
+        assert "event_news" not in plain and pre.call_count == 1
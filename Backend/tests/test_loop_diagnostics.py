@@ -0,0 +1,97 @@
+"""
+5 tests for the event-loop lag / blocking-call detector:
+  stack attribution (2), stall detection (1), restart (1), snapshot when disabled (1).
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from services import loop_diagnostics
+from services.loop_diagnostics import LoopMonitor, attribute_stack
+
+
+def _frame_from(module_name: str, source: str):
+    namespace = {"__name__": module_name, "sys": sys}
+    exec(source, namespace)
+    return namespace
+
+
+class TestAttributeStack:
+
+    def test_picks_innermost_service_and_http_route(self):
+        svc = _frame_from("services.fake_service", "def slow_call():\n    return sys._getframe()\n")
+        rtr = _frame_from(
+            "routers.fake_router",
+            "def handler(slow):\n"
+            "    scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/history/AAPL'}\n"
+            "    return slow()\n",
+        )
+        frame = rtr["handler"](svc["slow_call"])
+        info = attribute_stack(frame)
+        assert info["service"] == "services.fake_service.slow_call"
+        assert info["handler"] == "routers.fake_router.handler"
+        assert info["route"] == "GET /api/v1/history/AAPL"
+
+    def test_route_template_is_preferred_over_raw_path(self):
+        class _Route:
+            path = "/api/v1/history/{symbol}"
+
+        ns = _frame_from(
+            "routers.fake_router",
+            "def handler(route):\n"
+            "    scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/history/AAPL', 'route': route}\n"
+            "    return sys._getframe()\n",
+        )
+        info = attribute_stack(ns["handler"](_Route()))
+        assert info["route"] == "GET /api/v1/history/{symbol}"
+        assert info["service"] is None
+
+
+class TestStallDetection:
+
+    def test_blocking_call_is_recorded_with_its_service(self):
+        svc = _frame_from("services.fake_service", "import time\ndef block():\n    time.sleep(0.25)\n")
+
+        async def scenario():
+            monitor = LoopMonitor(interval_ms=20, threshold_ms=80)
+            monitor.start()
+            await asyncio.sleep(0.06)
+            svc["block"]()
+            await asyncio.sleep(0.06)
+            monitor.stop()
+            return monitor.snapshot()
+
+        snap = asyncio.run(scenario())
+        assert snap["stalls_total"] >= 1
+        stall = snap["recent_stalls"][0]
+        assert stall["blocked_ms"] >= 150
+        assert stall["service"] == "services.fake_service.block"
+        assert snap["lag_ms"]["max"] >= 150
+
+
+class TestRestart:
+
+    def test_stop_joins_the_watchdog_so_a_restart_runs_only_one(self):
+        async def scenario():
+            monitor = LoopMonitor(interval_ms=20, threshold_ms=80)
+            monitor.start()
+            first = monitor._watchdog
+            monitor.stop()
+            first_alive = first.is_alive()
+            monitor.start()
+            await asyncio.sleep(0.05)
+            watchdogs = [t for t in threading.enumerate() if t.name == "loop-watchdog"]
+            monitor.stop()
+            return first_alive, watchdogs
+
+        first_alive, watchdogs = asyncio.run(scenario())
+        assert not first_alive
+        assert len(watchdogs) == 1
+
+
+class TestSnapshot:
+
+    def test_disabled_snapshot(self, monkeypatch):
+        monkeypatch.setattr(loop_diagnostics, "monitor", None)
+        assert loop_diagnostics.loop_diagnostics_snapshot()["enabled"] is False
@@ -0,0 +1,59 @@
+"""
+6 tests for the NYSE session calendar and its use by the price monitor:
+  holidays and early closes (2), last close / next open (3), price monitor gate (1).
+"""
+from datetime import date, datetime
+
+from services import market_calendar as mc
+from services import price_monitor
+
+
+def _et(*args):
+    return mc.ET.localize(datetime(*args))
+
+
+class TestSessions:
+
+    def test_2025_holidays_match_the_exchange_schedule(self):
+        assert sorted(mc.holidays(2025)) == [
+            date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17),
+            date(2025, 4, 18), date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4),
+            date(2025, 9, 1), date(2025, 11, 27), date(2025, 12, 25),
+        ]
+        # July 4th 2026 is a Saturday: observed Friday, and no early close on the 2nd
+        assert date(2026, 7, 3) in mc.holidays(2026)
+        assert mc.session_for(date(2026, 7, 2)).close == _et(2026, 7, 2, 16, 0)
+
+    def test_early_close_ends_the_session_at_one(self):
+        session = mc.session_for(date(2025, 11, 28))
+        assert session.early_close and session.close == _et(2025, 11, 28, 13, 0)
+        assert mc.is_open(datetime(2025, 11, 28, 12, 59))
+        assert not mc.is_open(datetime(2025, 11, 28, 13, 0))
+
+
+class TestLookups:
+
+    def test_last_close_skips_holidays_and_weekends(self):
+        # Good Friday 2026 is April 3: Monday morning's last close is Thursday's
+        assert mc.last_close(_et(2026, 4, 6, 8, 0)) == _et(2026, 4, 2, 16, 0)
+        assert mc.last_close(_et(2025, 12, 26, 10, 0)) == _et(2025, 12, 24, 13, 0)
+        assert mc.last_close(_et(2026, 4, 2, 16, 0)) == _et(2026, 4, 2, 16, 0)
+
+    def test_next_open_after_a_long_weekend(self):
+        assert mc.next_open(_et(2026, 1, 16, 16, 30)) == _et(2026, 1, 20, 9, 30)
+        assert mc.next_open(_et(2026, 1, 20, 9, 30)) == _et(2026, 1, 20, 9, 30)
+        assert mc.previous_session(date(2026, 1, 2)).day == date(2025, 12, 31)
+
+    def test_years_outside_the_table_are_added_on_demand(self):
+        assert mc.last_close(_et(2040, 1, 2, 8, 0)) == _et(2039, 12, 30, 16, 0)
+        assert mc.next_open(_et(2010, 12, 31, 17, 0)) == _et(2011, 1, 3, 9, 30)
+        assert mc.is_trading_day(date(2026, 10, 19))
+
+
+class TestPriceMonitorGate:
+
+    def test_quotes_are_skipped_while_closed(self):
+        assert price_monitor._quotes_may_have_moved(_et(2026, 10, 19, 11, 0))
+        assert price_monitor._quotes_may_have_moved(_et(2026, 10, 19, 16, 4))
+        assert not price_monitor._quotes_may_have_moved(_et(2026, 10, 19, 18, 0))
+        assert not price_monitor._quotes_may_have_moved(_et(2026, 11, 26, 11, 0))  # Thanksgiving
@@ -0,0 +1,75 @@
+"""
+6 tests for the in-process metrics subsystem:
+  histogram/exposition (2), upstream hooks (3), route latency middleware (1).
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import metrics
+from services.metrics import Counter, Histogram
+
+
+class TestExposition:
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = Histogram("t_seconds", "test", ("service",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v, "x")
+        text = "\n".join(h.render())
+        assert 't_seconds_bucket{service="x",le="0.1"} 2' in text
+        assert 't_seconds_bucket{service="x",le="1"} 3' in text
+        assert 't_seconds_bucket{service="x",le="+Inf"} 4' in text
+        assert 't_seconds_count{service="x"} 4' in text
+
+    def test_counter_labels_are_escaped(self):
+        c = Counter("t_total", "test", ("name",))
+        c.inc('a"b')
+        assert 't_total{name="a\\"b"} 1' in c.render()
+
+
+class TestUpstreamHooks:
+
+    def test_time_upstream_counts_http_errors(self):
+        before = metrics.upstream_latency.count("unit", "ep", "error")
+        with metrics.time_upstream("unit", "ep") as timer:
+            timer.status = 503
+        assert metrics.upstream_latency.count("unit", "ep", "error") == before + 1
+
+    def test_finnhub_calls_are_timed_per_endpoint(self):
+        from services import finnhub_client
+
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"c": 1.0}
+        before = metrics.upstream_latency.count("finnhub", "/quote", "ok")
+        with patch.object(finnhub_client.requests, "get", return_value=response):
+            finnhub_client.get_finnhub_quote("AAPL")
+        assert metrics.upstream_latency.count("finnhub", "/quote", "ok") == before + 1
+
+    def test_supabase_session_hooks_time_each_table_call(self):
+        session = httpx.Client(transport=httpx.MockTransport(lambda req: httpx.Response(200, json=[])))
+        metrics.instrument_supabase_client(SimpleNamespace(postgrest=SimpleNamespace(session=session)))
+        before = metrics.upstream_latency.count("supabase", "GET bars_1m", "ok")
+        session.get("https://db.example/rest/v1/bars_1m", params={"symbol": "eq.AAPL"})
+        assert metrics.upstream_latency.count("supabase", "GET bars_1m", "ok") == before + 1
+
+
+class TestRouteLatency:
+
+    def test_route_template_is_used_as_label(self):
+        app = FastAPI()
+        app.middleware("http")(metrics.route_latency_middleware)
+
+        @app.get("/items/{item_id}")
+        def read_item(item_id: str):
+            return {"id": item_id}
+
+        before = metrics.route_latency.count("GET", "/items/{item_id}", "200")
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        assert metrics.route_latency.count("GET", "/items/{item_id}", "200") == before + 2
+        assert "http_request_duration_seconds_bucket" in metrics.render_prometheus()
@@ -0,0 +1,128 @@
+"""
+6 tests for the sliding-window momentum detector:
+  window config (1), deques match a brute-force scan (1), intra-window swings (1),
+  peek vs update (1), MOMENTUM_2H from cached bars (2).
+"""
+from datetime import date, datetime, time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services import market_calendar
+from services import notification_service as ns
+from services.momentum_detector import MomentumDetector, MomentumWindow, parse_windows, strongest
+
+TWO_H = MomentumWindow("2h", 7200, 5.0)
+
+
+def _brute_force(ts, close, low, high, i, window):
+    """Strongest extreme-to-close move over bars within `window` seconds of bar i."""
+    inside = [j for j in range(i + 1) if ts[j] >= ts[i] - window.seconds]
+    lo, hi = min(low[j] for j in inside), max(high[j] for j in inside)
+    up, down = (close[i] - lo) / lo * 100, (close[i] - hi) / hi * 100
+    pct = up if up >= -down else down
+    return pct if abs(pct) >= window.threshold_pct and pct != 0 else None
+
+
+class TestDetector:
+
+    def test_windows_parse_from_config(self):
+        assert parse_windows("30m:3, 2h:5") == [MomentumWindow("30m", 1800, 3.0), TWO_H]
+        with pytest.raises(ValueError):
+            parse_windows("2d:5")
+
+    def test_monotonic_deques_match_a_full_rescan(self):
+        rng = np.random.default_rng(7)
+        n = 600
+        ts = np.cumsum(rng.integers(30, 120, n))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, n)))
+        low, high = close * (1 - rng.uniform(0, 0.004, n)), close * (1 + rng.uniform(0, 0.004, n))
+        windows = [MomentumWindow("30m", 1800, 1.0), MomentumWindow("2h", 7200, 2.5)]
+        detector = MomentumDetector(windows)
+        for i in range(n):
+            got = {s.window.label: s.pct for s in detector.update("X", int(ts[i]), close[i], low[i], high[i])}
+            for w in windows:
+                expected = _brute_force(ts, close, low, high, i, w)
+                assert (w.label in got) == (expected is not None)
+                if expected is not None:
+                    assert got[w.label] == pytest.approx(expected)
+
+    def test_swing_inside_the_window_fires_when_endpoints_are_flat(self):
+        detector = MomentumDetector([TWO_H])
+        prices = [100, 103, 106, 104, 101, 100.5]  # first vs last: +0.5%
+        signals = []
+        for i, p in enumerate(prices):
+            signals += detector.update("AAPL", i * 600, p, at=f"t{i}")
+        best = strongest(signals)[("AAPL", "2h")]
+        # The 6% run-up is the strongest move; the slide back from 106 also qualified
+        assert best.pct == pytest.approx(6.0)
+        assert (best.from_time, best.to_time) == ("t0", "t2")
+        assert any(s.pct < -5 for s in signals)
+
+    def test_peek_does_not_record_a_forming_bar(self):
+        detector = MomentumDetector([TWO_H])
+        detector.update("AAPL", 0, 100.0)
+        assert detector.peek("AAPL", 60, 106.0)[0].pct == pytest.approx(6.0)
+        assert detector.last_ts("AAPL") == 0
+        # The bar was revised down before it closed: the 106 never counts
+        assert detector.update("AAPL", 60, 101.0) == []
+
+
+DAY = date(2024, 3, 5)
+SESSION = market_calendar.Session(DAY, ns.ET.localize(datetime.combine(DAY, time(9, 30))),
+                                  ns.ET.localize(datetime.combine(DAY, time(16, 0))))
+
+
+def _clock(at):
+    """ns.datetime with now() pinned to `at` (ET wall time)."""
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return tz.localize(at) if tz else at
+    return Clock
+
+
+def _cols(times, close):
+    times = np.array(times, dtype=object)
+    close = np.array(close, dtype=float)
+    return {"ts": np.asarray(times.astype(str), dtype="datetime64[s]").astype(np.int64),
+            "time": times, "close": close, "low": close, "high": close}
+
+
+class TestMomentumNotifications:
+
+    def _check(self, cols, now):
+        def columns(_table, _symbol, start_ts=None):
+            keep = cols["ts"] >= start_ts
+            return (1, 1), {name: values[keep] for name, values in cols.items()}
+
+        ns._momentum.reset()
+        with patch.object(ns, "datetime", _clock(now)), \
+             patch.object(ns.market_calendar, "session_for", return_value=SESSION), \
+             patch.object(ns.bar_cache, "latest_timestamp", return_value=cols["time"][-1]), \
+             patch.object(ns.bar_cache, "columns", side_effect=columns), \
+             patch.object(ns, "get_existing_notification_ids", return_value=set()), \
+             patch.object(ns, "get_bars_1m_window_stats", return_value={}) as rpc, \
+             patch.object(ns, "save_generated_notifications"), \
+             patch.object(ns, "send_notification_email", None):
+            result = ns._check_momentum([{"symbol": "AAPL"}])
+        ns._momentum.reset()
+        return rpc, result
+
+    def test_cached_bars_skip_the_window_rpc(self):
+        cols = _cols([f"{DAY} 10:{m:02d}:00" for m in range(0, 50, 10)], [100.0, 104.0, 107.0, 103.0, 100.0])
+        rpc, result = self._check(cols, datetime.combine(DAY, time(10, 45)))
+        assert rpc.call_args[0][0] == []
+        assert len(result) == 1 and result[0]["type"] == "MOMENTUM_2H"
+        # 100 -> 107 happened inside the window even though the last bar is back at 100
+        assert result[0]["percentChange"] == 7.0
+        assert result[0]["message"].startswith("From 10:00 AM to 10:20 AM")
+
+    def test_a_cache_holding_only_the_previous_session_reports_nothing(self):
+        # Yesterday's close ran up 7%; today's refresh hasn't landed yet
+        cols = _cols([f"2024-03-04 15:{m:02d}:00" for m in range(10, 60, 10)], [100.0, 104.0, 107.0, 107.0, 107.0])
+        rpc, result = self._check(cols, datetime.combine(DAY, time(9, 35)))
+        assert result == []
+        # The window is read from the database instead, starting at today's open
+        assert [(w["key"], w["start"]) for w in rpc.call_args[0][0]] == [("lookback_2h", f"{DAY} 09:30:00")]
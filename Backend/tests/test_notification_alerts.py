@@ -0,0 +1,166 @@
+"""
+7 tests for the panel's alert and dismissed-id reads:
+  joined view read with a page bound (2), cursor paging past the limit (2),
+  dismissed-id cache (3).
+"""
+import re
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import database
+from routers import notifications
+from services.notification_service import ET, get_today_notifications
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    database._invalidate_dismissed()
+    yield
+    database._invalidate_dismissed()
+
+
+class _Table:
+    """Just enough of a PostgREST query over in-memory rows for the paged reads."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.keys = []
+        self.n = None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def gt(self, column, value):
+        self.rows = [r for r in self.rows if r[column] > value]
+        return self
+
+    def or_(self, filters):
+        col, value, last_id = re.fullmatch(r'(\w+)\.gt\."(.*?)",and\(\1\.eq\."\2",id\.gt\."(.*)"\)', filters).groups()
+        self.rows = [r for r in self.rows if r[col] > value or (r[col] == value and r["id"] > last_id)]
+        return self
+
+    def order(self, column, desc=False):
+        self.keys.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        rows = self.rows
+        for column, desc in reversed(self.keys):
+            rows = sorted(rows, key=lambda r: r[column], reverse=desc)
+        return MagicMock(data=rows[:self.n])
+
+
+def _tables(**tables):
+    client = MagicMock()
+    client.table.side_effect = lambda name: _Table(tables[name])
+    return client
+
+
+def _dismissed_client(pages):
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.order.return_value.range.return_value
+    query.execute.side_effect = [MagicMock(data=[{"notification_id": i} for i in page]) for page in pages]
+    return client
+
+
+class TestAlertView:
+
+    def test_alerts_come_from_the_view_newest_first_and_bounded(self):
+        rows = [{"id": f"a{i}", "triggered_at": f"2024-03-05T15:0{i}:00"} for i in range(5)]
+        client = _tables(unread_alert_notifications=rows)
+        with patch.object(database, "_get_client", return_value=client):
+            alerts = database.get_unread_alerts(limit=3)
+        assert client.table.call_args.args == ("unread_alert_notifications",)
+        assert [a["id"] for a in alerts] == ["a4", "a3", "a2"]
+
+    def test_joined_rows_become_notifications_without_reading_reminders(self):
+        row = {"id": "a1", "reminder_id": "r1", "ticker": "AAPL", "message": "m", "is_read": 0,
+               "triggered_at": "2024-03-05T15:30:00", "condition_type": "price_above",
+               "target_price": 190.0, "percent_change": None}
+        app = FastAPI()
+        app.include_router(notifications.router)
+        with patch.object(notifications, "get_today_notifications", return_value=([], None)), \
+             patch.object(notifications, "get_dismissed_notification_ids", return_value=frozenset()), \
+             patch.object(notifications, "get_unread_alerts", return_value=[row]) as unread:
+            client = TestClient(app)
+            body = client.get("/notifications?limit=10").json()
+            too_many = client.get(f"/notifications?limit={notifications.MAX_PAGE_SIZE + 1}")
+        assert body[0]["id"] == "ALERT_a1" and body[0]["title"] == "Price above $190.00"
+        assert unread.call_args.args == (None, 10)
+        assert too_many.status_code == 422
+
+
+class TestCursorPaging:
+
+    def test_polls_page_through_more_new_rows_than_the_limit(self):
+        # One bulk upsert stamps every row with the same created_at
+        today = datetime.now(ET).strftime("%Y-%m-%d")
+        rows = [{"id": f"N{i:02d}", "date": today, "created_at": "2024-03-05T15:00:00", "type": "DAILY_EOD",
+                 "symbol": "AAPL", "title": "t", "message": "m", "direction": "up", "percent_change": 1.0}
+                for i in range(7)]
+        seen, cursor = [], "2024-03-05T14:00:00"
+        with patch.object(database, "_get_client", return_value=_tables(generated_notifications=rows)):
+            for _ in range(4):
+                page, cursor = get_today_notifications(cursor, 3)
+                seen += [n["id"] for n in page]
+        assert sorted(seen) == [r["id"] for r in rows]
+        assert cursor == "2024-03-05T15:00:00|N06"
+
+    def test_alert_cursor_points_at_the_last_row_read_not_the_newest_overall(self):
+        rows = [{"id": f"a{i}", "triggered_at": f"2024-03-05T15:0{i}:00", "message": "m", "ticker": "AAPL"}
+                for i in range(5)]
+        app = FastAPI()
+        app.include_router(notifications.router)
+        with patch.object(database, "_get_client", return_value=_tables(unread_alert_notifications=rows)), \
+             patch.object(notifications, "get_today_notifications", return_value=([], None)), \
+             patch.object(notifications, "get_dismissed_notification_ids", return_value=frozenset()):
+            client = TestClient(app)
+            first = client.get("/notifications?alerts_since=2024-03-05T15:00:00&limit=2")
+            cursor = first.headers[notifications.ALERTS_CURSOR_HEADER]
+            second = client.get("/notifications", params={"alerts_since": cursor, "limit": 2})
+        assert [n["id"] for n in first.json()] == ["ALERT_a2", "ALERT_a1"]
+        assert cursor == "2024-03-05T15:02:00|a2"
+        assert [n["id"] for n in second.json()] == ["ALERT_a4", "ALERT_a3"]
+
+
+class TestDismissedCache:
+
+    def test_ids_are_loaded_once_across_pages(self):
+        client = _dismissed_client([["a", "b"], ["c"]])
+        with patch.object(database, "_get_client", return_value=client), \
+             patch.object(database, "DISMISSED_PAGE_ROWS", 2):
+            first = database.get_dismissed_notification_ids()
+            second = database.get_dismissed_notification_ids()
+        assert first == second == {"a", "b", "c"}
+        assert client.table.return_value.select.return_value.order.return_value.range.call_count == 2
+
+    def test_dismiss_updates_the_cached_set_without_a_reload(self):
+        client = _dismissed_client([["a"]])
+        with patch.object(database, "_get_client", return_value=client):
+            database.get_dismissed_notification_ids()
+            database.dismiss_notification("b")
+            ids = database.get_dismissed_notification_ids()
+        assert ids == {"a", "b"}
+        assert client.table.return_value.select.return_value.order.return_value.range.call_count == 1
+
+    def test_bulk_writes_invalidate_the_cache(self):
+        client = _dismissed_client([["a"], ["a", "x"], []])
+        with patch.object(database, "_get_client", return_value=client):
+            database.get_dismissed_notification_ids()
+            database.clear_all_notifications("2024-03-05")
+            after_clear = database.get_dismissed_notification_ids()
+            database.clear_all_dismissed()
+            after_reset = database.get_dismissed_notification_ids()
+        assert after_clear == {"a", "x"} and after_reset == set()
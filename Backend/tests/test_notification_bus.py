@@ -0,0 +1,136 @@
+"""
+6 tests for the notification event bus behind /notifications/stream:
+  Last-Event-ID replay (2), cross-thread delivery and backlog reset (2),
+  publishing from the notification checks (1), resuming from the panel load (1).
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from unittest.mock import patch
+
+import pytest
+
+from services import notification_bus as bus
+from services import notification_service as ns
+
+
+@pytest.fixture(autouse=True)
+def fresh_bus():
+    bus.clear()
+    yield
+    bus.clear()
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["id"], fields["event"], json.loads(fields["data"])
+
+
+async def _take(stream, n):
+    return [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(n)]
+
+
+class TestReplay:
+
+    def test_reconnect_replays_only_events_after_the_last_id(self):
+        first = bus.publish("notification", {"id": "A"})
+        bus.publish("dismiss", {"id": "A"})
+        bus.publish("notification", {"id": "B"})
+
+        async def run():
+            stream = bus.sse_stream(first.id)
+            retry, *events = await _take(stream, 3)
+            await stream.aclose()
+            return retry, events
+
+        retry, events = asyncio.run(run())
+        assert retry == f"retry: {bus.RETRY_MS}\n\n"
+        assert [_parse(e)[1:] for e in events] == [("dismiss", {"id": "A"}), ("notification", {"id": "B"})]
+        assert bus.stats()["subscribers"] == 0
+
+    def test_ids_from_another_process_or_past_the_buffer_get_a_reset(self):
+        bus.publish("notification", {"id": "A"})
+
+        async def run(last_id):
+            sub, replay = bus.subscribe(last_id)
+            bus.unsubscribe(sub)
+            return [(e.name, e.id) for e in replay]
+
+        latest = bus.stats()["last_id"]
+        assert asyncio.run(run("0-1")) == [("reset", latest)]
+        with patch.object(bus, "_history", deque(maxlen=1)):
+            bus.publish("notification", {"id": "B"})
+            bus.publish("notification", {"id": "C"})
+            assert asyncio.run(run(latest))[0][0] == "reset"
+        assert asyncio.run(run(None)) == []
+
+
+class TestDelivery:
+
+    def test_events_published_from_a_worker_thread_reach_the_stream(self):
+        async def run():
+            stream = bus.sse_stream(heartbeat=0.05)
+            await _take(stream, 1)  # retry hint; the subscription is live now
+            assert await _take(stream, 1) == [": keep-alive\n\n"]
+            threading.Thread(target=bus.publish, args=("clear", {})).start()
+            event = await _take(stream, 1)
+            await stream.aclose()
+            return _parse(event[0])
+
+        _, name, data = asyncio.run(run())
+        assert (name, data) == ("clear", {})
+
+    def test_a_subscriber_that_falls_behind_is_reset(self):
+        async def run():
+            sub, _ = bus.subscribe()
+            with patch.object(sub, "queue", asyncio.Queue(2)):
+                for i in range(3):
+                    bus.publish("notification", {"id": i})
+                await asyncio.sleep(0)
+                names = [sub.queue.get_nowait().name for _ in range(sub.queue.qsize())]
+            bus.unsubscribe(sub)
+            return names
+
+        assert asyncio.run(run()) == ["reset"]
+
+
+class TestPublishers:
+
+    def test_saved_notifications_are_published_in_the_panel_shape(self):
+        n = {"id": "AAPL_DAILY_EOD_2024-03-05", "type": "DAILY_EOD", "symbol": "AAPL", "date": "2024-03-05",
+             "title": "AAPL ↑ 1.0%", "message": "m", "direction": "up", "percentChange": 1.0}
+        with patch.object(ns, "save_generated_notifications") as save, \
+             patch.object(ns, "send_notification_email", None):
+            ns._save_and_email([n])
+        assert save.call_count == 1
+        event = bus._history[-1]
+        assert event.name == "notification"
+        assert event.data["id"] == n["id"] and event.data["percentChange"] == 1.0
+        assert event.data["timestamp"] and "date" not in event.data
+
+
+class TestPanelLoad:
+
+    def test_first_connection_replays_what_was_published_after_the_get(self):
+        from fastapi import Response
+        from routers import notifications
+
+        bus.publish("notification", {"id": "before"})
+        response = Response()
+        with patch.object(notifications, "get_dismissed_notification_ids", return_value=set()), \
+             patch.object(notifications, "get_today_notifications", return_value=([], None)), \
+             patch.object(notifications, "get_unread_alerts", return_value=[]):
+            notifications.get_notifications(response, since=None, alerts_since=None, limit=10)
+        event_id = response.headers[notifications.EVENT_ID_HEADER]
+        # Published between the panel load and the stream connecting
+        bus.publish("notification", {"id": "gap"})
+
+        async def run():
+            stream = (await notifications.stream_notifications(None, event_id)).body_iterator
+            _, event = await _take(stream, 2)
+            await stream.aclose()
+            return _parse(event)
+
+        _, name, data = asyncio.run(run())
+        assert (name, data) == ("notification", {"id": "gap"})
@@ -0,0 +1,171 @@
+"""
+8 tests for the set-based notification engine:
+  RPC wrapper (1), bulk id read and upsert (1), one RPC per check (4),
+  one id read / RPC / upsert per poll (2).
+"""
+from datetime import datetime, time
+from unittest.mock import MagicMock, patch
+
+import database
+from services import market_calendar
+from services import notification_service as ns
+
+FUTURE = "2999-01-01T00:00:00"   # added_at after any trigger time -> always due
+
+
+def _session(open_at=time(9, 30), close_at=time(16, 0)):
+    """A session for today, whatever day the tests run on."""
+    today = datetime.now(ns.ET).date()
+    return market_calendar.Session(today, ns.ET.localize(datetime.combine(today, open_at)),
+                                   ns.ET.localize(datetime.combine(today, close_at)))
+
+
+def _window(first_dt, first_close, last_dt, last_close):
+    return {"first_datetime": first_dt, "first_close": first_close,
+            "last_datetime": last_dt, "last_close": last_close}
+
+
+class TestWindowStatsRpc:
+
+    def test_rows_are_keyed_by_window_and_symbol(self):
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value.data = [
+            {"window_key": "today", "symbol": "AAPL", "first_close": 1.0},
+        ]
+        with patch.object(database, "_get_client", return_value=client):
+            stats = database.get_bars_1m_window_stats([
+                {"key": "today", "symbol": "AAPL", "start": "2024-01-02 09:30:00"},
+                {"key": "today", "symbol": "MSFT", "start": "2024-01-02 09:30:00"},
+            ])
+        name, params = client.rpc.call_args[0]
+        assert name == "bars_1m_window_stats"
+        assert params["windows"][1] == {"key": "today", "symbol": "MSFT",
+                                        "start_at": "2024-01-02 09:30:00", "end_at": None,
+                                        "extremes": False}
+        assert stats == {("today", "AAPL"): {"window_key": "today", "symbol": "AAPL", "first_close": 1.0}}
+
+
+class TestBulkNotificationRows:
+
+    def test_existing_ids_are_read_in_chunks_and_saved_in_one_upsert(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [{"id": "A_1"}]
+        ids = [f"A_{i}" for i in range(database.NOTIFICATION_ID_CHUNK + 1)]
+        with patch.object(database, "_get_client", return_value=client):
+            existing = database.get_existing_notification_ids(ids + ids[:5])
+            database.save_generated_notifications([
+                {"id": i, "type": "DAILY_EOD", "symbol": "A", "date": "2024-01-02", "title": "t", "message": "m",
+                 "direction": "up", "percentChange": 1.0} for i in ("A_1", "A_2")
+            ])
+            database.save_generated_notifications([])
+        assert existing == {"A_1"}
+        chunks = [c.args[1] for c in client.table.return_value.select.return_value.in_.call_args_list]
+        assert [len(c) for c in chunks] == [database.NOTIFICATION_ID_CHUNK, 1]
+        upsert = client.table.return_value.upsert
+        assert upsert.call_count == 1 and upsert.call_args.kwargs == {"on_conflict": "id"}
+        rows = upsert.call_args.args[0]
+        assert [r["id"] for r in rows] == ["A_1", "A_2"] and rows[0]["created_at"] == rows[1]["created_at"]
+
+
+class TestChecksUseOneRpc:
+
+    def _run(self, check, stats, watchlist, session=None, existing=()):
+        with patch.object(ns.market_calendar, "session_for", return_value=session or _session()), \
+             patch.object(ns, "_feed_momentum", return_value=None), \
+             patch.object(ns, "get_bars_1m_window_stats", return_value=stats) as rpc, \
+             patch.object(ns, "get_existing_notification_ids", return_value=set(existing)), \
+             patch.object(ns, "save_generated_notifications") as save, \
+             patch.object(ns, "send_notification_email", None):
+            result = check(watchlist)
+        return rpc, save, result
+
+    def test_momentum_without_cached_bars_reads_every_symbol_in_one_call(self):
+        watchlist = [{"symbol": "AAPL"}, {"symbol": "MSFT"}, {"symbol": "NVDA"}]
+        stats = {
+            ("lookback_2h", "AAPL"): _window("2024-01-02 10:00:00", 100.0, "2024-01-02 12:00:00", 106.0),
+            ("lookback_2h", "MSFT"): _window("2024-01-02 10:00:00", 100.0, "2024-01-02 12:00:00", 101.0),
+        }
+        all_day = _session(time(0, 0), time(23, 59))
+        rpc, save, result = self._run(ns._check_momentum, stats, watchlist, all_day)
+        assert rpc.call_count == 1
+        assert [w["symbol"] for w in rpc.call_args[0][0]] == ["AAPL", "MSFT", "NVDA"]
+        assert [n["symbol"] for n in result] == ["AAPL"]
+        assert result[0]["percentChange"] == 6.0
+
+    def test_momentum_fallback_measures_from_the_window_extreme(self):
+        # First and last bar are 1% apart, but the price fell to 95 in between
+        stats = {("lookback_2h", "AAPL"): {
+            **_window("2024-01-02 10:00:00", 100.0, "2024-01-02 12:00:00", 101.0),
+            "min_low": 95.0, "min_low_datetime": "2024-01-02 10:30:00",
+            "max_high": 102.0, "max_high_datetime": "2024-01-02 11:50:00", "bar_count": 121}}
+        all_day = _session(time(0, 0), time(23, 59))
+        rpc, _, result = self._run(ns._check_momentum, stats, [{"symbol": "AAPL"}], all_day)
+        assert rpc.call_args[0][0][0]["extremes"] is True
+        assert result[0]["percentChange"] == round((101.0 - 95.0) / 95.0 * 100, 2)
+        assert result[0]["message"].startswith("From 10:30 AM to 12:00 PM")
+
+    def test_morning_gap_uses_before_open_and_session_windows(self):
+        today = datetime.now(ns.ET).strftime("%Y-%m-%d")
+        watchlist = [{"symbol": "AAPL", "added_at": FUTURE}]
+        stats = {
+            ("session", "AAPL"): _window(f"{today} 09:30:00", 102.0, f"{today} 09:44:00", 103.0),
+            ("before_open", "AAPL"): _window("2023-12-29 09:30:00", 99.0, "2023-12-29 15:59:00", 100.0),
+        }
+        rpc, save, result = self._run(ns._check_morning_gap, stats, watchlist)
+        windows = rpc.call_args[0][0]
+        assert sorted(w["key"] for w in windows) == ["before_open", "session"]
+        before_open = next(w for w in windows if w["key"] == "before_open")
+        prev_open = market_calendar.previous_session(datetime.now(ns.ET).date()).open
+        assert before_open["start"] == prev_open.strftime("%Y-%m-%d %H:%M:%S")
+        assert before_open["end"] == f"{today} 09:30:00"
+        assert result[0]["percentChange"] == 2.0
+        assert result[0]["message"].startswith("Overnight gap from 3:59 PM (prev close)")
+
+    def test_daily_eod_skips_symbols_without_bars(self):
+        watchlist = [{"symbol": "AAPL", "added_at": FUTURE}, {"symbol": "MSFT", "added_at": FUTURE}]
+        stats = {("session", "MSFT"): _window("2024-01-02 09:30:00", 50.0, "2024-01-02 15:59:00", 49.0)}
+        rpc, save, result = self._run(ns._check_daily_eod, stats, watchlist)
+        assert rpc.call_count == 1
+        assert [n["symbol"] for n in result] == ["MSFT"]
+        assert save.call_count == 1 and [n["symbol"] for n in save.call_args[0][0]] == ["MSFT"]
+
+
+class TestPollIsSetBased:
+
+    def _poll(self, stats, existing=()):
+        watchlist = [{"symbol": "AAPL", "added_at": FUTURE}, {"symbol": "MSFT", "added_at": FUTURE}]
+        with patch.object(ns.market_calendar, "session_for", return_value=_session(time(0, 0), time(23, 59))), \
+             patch.object(ns, "get_watchlist", return_value=watchlist), \
+             patch.object(ns.data_manager, "get_stock_data_batch"), \
+             patch.object(ns, "_feed_momentum", return_value=None), \
+             patch.object(ns, "get_generated_notifications_for_date", return_value=[]), \
+             patch.object(ns, "get_bars_1m_window_stats", return_value=stats) as rpc, \
+             patch.object(ns, "get_existing_notification_ids", return_value=set(existing)) as ids, \
+             patch.object(ns, "save_generated_notifications") as save, \
+             patch.object(ns, "send_notification_email", None):
+            ns.generate_all_notifications()
+        return rpc, ids, save
+
+    def test_all_checks_share_one_id_read_rpc_and_upsert(self):
+        today = datetime.now(ns.ET).strftime("%Y-%m-%d")
+        stats = {
+            ("session", "AAPL"): _window(f"{today} 00:00:00", 100.0, f"{today} 12:00:00", 110.0),
+            ("lookback_2h", "AAPL"): _window(f"{today} 10:00:00", 100.0, f"{today} 12:00:00", 110.0),
+            ("before_open", "AAPL"): _window("2023-12-29 09:30:00", 99.0, "2023-12-29 15:59:00", 100.0),
+        }
+        rpc, ids, save = self._poll(stats)
+        assert rpc.call_count == ids.call_count == save.call_count == 1
+        assert len(list(ids.call_args[0][0])) == 6
+        # The gap check reads the same "session" window as the EOD check
+        keys = sorted((w["key"], w["symbol"]) for w in rpc.call_args[0][0])
+        assert keys == [("before_open", "AAPL"), ("before_open", "MSFT"), ("lookback_2h", "AAPL"),
+                        ("lookback_2h", "MSFT"), ("session", "AAPL"), ("session", "MSFT")]
+        saved = sorted(n["type"] for n in save.call_args[0][0])
+        assert saved == ["DAILY_EOD", "MOMENTUM_2H", "MORNING_GAP"]
+
+    def test_existing_notifications_drop_their_windows(self):
+        today = datetime.now(ns.ET).strftime("%Y-%m-%d")
+        existing = [f"{s}_{kind}_{today}" for s in ("AAPL", "MSFT") for kind in ("DAILY_EOD", "MORNING_GAP")]
+        rpc, ids, save = self._poll({}, existing)
+        assert sorted(w["key"] for w in rpc.call_args[0][0]) == ["lookback_2h", "lookback_2h"]
+        assert save.call_args[0][0] == []
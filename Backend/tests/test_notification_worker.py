@@ -0,0 +1,96 @@
+"""
+7 tests for background notification generation and the read-only panel:
+  worker schedule (3), GET /notifications with per-list cursors (3), bulk clear-all (1).
+"""
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import database
+from routers import notifications
+from services import notification_worker as worker
+from services.market_calendar import ET
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(notifications.router)
+    return TestClient(app)
+
+
+class TestSchedule:
+
+    def test_regular_session_triggers_on_buckets_gap_and_close(self):
+        times = [t.strftime("%H:%M") for t in worker.trigger_times(date(2024, 3, 5))]
+        assert times[:3] == ["09:30", "09:45", "10:00"] and times[-1] == "16:00"
+        assert len(times) == 27
+
+    def test_early_close_ends_at_one_and_holidays_have_none(self):
+        times = worker.trigger_times(date(2024, 11, 29))  # day after Thanksgiving
+        assert times[-1].strftime("%H:%M") == "13:00"
+        assert worker.trigger_times(date(2024, 12, 25)) == []
+
+    def test_next_run_skips_the_weekend_and_waits_for_the_delay(self):
+        friday_after_close = ET.localize(datetime(2024, 3, 8, 16, 5))
+        run_at = worker.next_run_time(friday_after_close)
+        assert run_at.date() == date(2024, 3, 11)
+        assert (run_at.hour, run_at.minute, run_at.second) == (9, 30, int(worker.DELAY_S))
+        just_before = ET.localize(datetime(2024, 3, 8, 15, 45, 1))
+        assert worker.next_run_time(just_before).strftime("%H:%M") == "15:45"
+
+
+class TestReadPath:
+
+    def _get(self, client, url, generated, alerts):
+        with patch.object(notifications, "get_today_notifications", return_value=generated) as today, \
+             patch.object(notifications, "get_dismissed_notification_ids", return_value={"AAPL_DAILY_EOD_x"}), \
+             patch.object(notifications, "get_unread_alerts", return_value=alerts) as unread:
+            return client.get(url), today, unread
+
+    def test_poll_reads_without_generating_and_returns_a_cursor(self, client):
+        generated = ([{"id": "MSFT_MOMENTUM_2H_x", "type": "MOMENTUM_2H"},
+                      {"id": "AAPL_DAILY_EOD_x", "type": "DAILY_EOD"}], "2024-03-05T15:00:00")
+        alerts = [{"id": "a1", "ticker": "AAPL", "message": "m", "triggered_at": "2024-03-05T15:30:00"}]
+        with patch("services.notification_service.run_checks") as run:
+            resp, _, _ = self._get(client, "/notifications", generated, alerts)
+        assert run.call_count == 0
+        assert [n["id"] for n in resp.json()] == ["ALERT_a1", "MSFT_MOMENTUM_2H_x"]
+        assert resp.headers[notifications.CURSOR_HEADER] == "2024-03-05T15:00:00"
+        assert resp.headers[notifications.ALERTS_CURSOR_HEADER] == "2024-03-05T15:30:00|a1"
+
+    def test_each_list_reads_after_its_own_cursor(self, client):
+        resp, today, unread = self._get(
+            client, "/notifications?since=2024-03-05T15:00:00&alerts_since=2024-03-05T15:30:00",
+            ([], "2024-03-05T15:00:00"), [])
+        assert resp.json() == []
+        assert today.call_args.args == ("2024-03-05T15:00:00", notifications.PAGE_SIZE)
+        assert unread.call_args.args == ("2024-03-05T15:30:00", notifications.PAGE_SIZE)
+        assert resp.headers[notifications.CURSOR_HEADER] == "2024-03-05T15:00:00"
+        assert resp.headers[notifications.ALERTS_CURSOR_HEADER] == "2024-03-05T15:30:00"
+
+    def test_a_newer_alert_does_not_move_the_notification_cursor(self, client):
+        # A notification created at 15:10 but committed after the 15:30 alert was returned
+        late = ([{"id": "AAPL_DAILY_EOD_y", "type": "DAILY_EOD"}], "2024-03-05T15:10:00")
+        resp, today, _ = self._get(
+            client, "/notifications?since=2024-03-05T15:00:00&alerts_since=2024-03-05T15:30:00", late, [])
+        assert [n["id"] for n in resp.json()] == ["AAPL_DAILY_EOD_y"]
+        assert resp.headers[notifications.CURSOR_HEADER] == "2024-03-05T15:10:00"
+        assert resp.headers[notifications.ALERTS_CURSOR_HEADER] == "2024-03-05T15:30:00"
+
+
+class TestClearAll:
+
+    def test_clear_all_is_one_rpc(self, client):
+        rpc_client = MagicMock()
+        rpc_client.rpc.return_value.execute.return_value.data = 4
+        with patch.object(database, "_get_client", return_value=rpc_client):
+            resp = client.post("/notifications/clear-all")
+        assert resp.status_code == 200
+        name, params = rpc_client.rpc.call_args.args
+        assert name == "clear_all_notifications"
+        assert params["p_date"] == datetime.now(ET).strftime("%Y-%m-%d")
+        assert rpc_client.table.call_count == 0
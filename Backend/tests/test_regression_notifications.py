@@ -32,10 +32,9 @@ def _make_alert(id_="alert1", ticker="AAPL"):
 class TestNotificationsRegression:
 
     def test_get_notifications_returns_list(self, client):
-        with patch("routers.notifications.generate_all_notifications", return_value=[]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         assert resp.status_code == 200
         assert isinstance(resp.json(), list)
@@ -43,10 +42,9 @@ class TestNotificationsRegression:
     def test_reminder_alerts_appear_in_notifications(self, client):
         """REMINDER_ALERT type notifications are included from the alerts table."""
         alert = _make_alert()
-        with patch("routers.notifications.generate_all_notifications", return_value=[]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[alert]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[alert]):
             resp = client.get("/api/v1/notifications")
         items = resp.json()
         types = [n["type"] for n in items]
@@ -56,10 +54,9 @@ class TestNotificationsRegression:
         """Alerts are listed first (confirmed by order in router code)."""
         alert = _make_alert()
         market_notif = _make_notification("DAILY_EOD")
-        with patch("routers.notifications.generate_all_notifications", return_value=[market_notif]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([market_notif], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[alert]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[alert]):
             resp = client.get("/api/v1/notifications")
         items = resp.json()
         assert len(items) >= 2
@@ -67,10 +64,9 @@ class TestNotificationsRegression:
 
     def test_daily_eod_notification_has_required_fields(self, client):
         eod = _make_notification("DAILY_EOD")
-        with patch("routers.notifications.generate_all_notifications", return_value=[eod]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([eod], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         eod_items = [n for n in resp.json() if n["type"] == "DAILY_EOD"]
         assert len(eod_items) == 1
@@ -79,10 +75,9 @@ class TestNotificationsRegression:
 
     def test_momentum_notification_has_required_fields(self, client):
         mom = _make_notification("MOMENTUM_2H")
-        with patch("routers.notifications.generate_all_notifications", return_value=[mom]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([mom], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         items = [n for n in resp.json() if n["type"] == "MOMENTUM_2H"]
         assert len(items) == 1
@@ -91,10 +86,9 @@ class TestNotificationsRegression:
 
     def test_morning_gap_notification_has_required_fields(self, client):
         gap = _make_notification("MORNING_GAP")
-        with patch("routers.notifications.generate_all_notifications", return_value=[gap]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([gap], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         items = [n for n in resp.json() if n["type"] == "MORNING_GAP"]
         assert len(items) == 1
@@ -105,11 +99,10 @@ class TestNotificationsRegression:
         """A notification whose id is in dismissed_ids must not appear in the response."""
         notif = _make_notification("DAILY_EOD")
         notif["id"] = "EOD_AAPL_dismiss_me"
-        with patch("routers.notifications.generate_all_notifications", return_value=[notif]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([notif], None)), \
              patch("routers.notifications.get_dismissed_notification_ids",
                    return_value={"EOD_AAPL_dismiss_me"}), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         ids = [n["id"] for n in resp.json()]
         assert "EOD_AAPL_dismiss_me" not in ids
@@ -128,10 +121,9 @@ class TestNotificationsRegression:
         """is_read=True alert must not appear as a REMINDER_ALERT notification."""
         read_alert = _make_alert(id_="read_alert")
         read_alert["is_read"] = 1
-        with patch("routers.notifications.generate_all_notifications", return_value=[]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[read_alert]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[read_alert]):
             resp = client.get("/api/v1/notifications")
         types = [n["type"] for n in resp.json()]
         assert "REMINDER_ALERT" not in types
@@ -147,21 +139,19 @@ class TestNotificationsRegression:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "articles": [],
         }
-        with patch("routers.notifications.generate_all_notifications", return_value=[briefing]), \
+        with patch("routers.notifications.get_today_notifications", return_value=([briefing], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         items = [n for n in resp.json() if n["type"] == "NEWS_BRIEFING"]
         assert len(items) == 1
         assert re.match(r".+_NEWS_\d{4}-\d{2}-\d{2}_10AM$", items[0]["id"])
 
     def test_empty_watchlist_gives_no_market_notifications(self, client):
-        """generate_all_notifications returns [] when watchlist is empty → only alerts shown."""
-        with patch("routers.notifications.generate_all_notifications", return_value=[]), \
+        """No notifications generated today (e.g. empty watchlist) → only alerts shown."""
+        with patch("routers.notifications.get_today_notifications", return_value=([], None)), \
              patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.get_all_reminders", return_value=[]):
+             patch("routers.notifications.get_unread_alerts", return_value=[]):
             resp = client.get("/api/v1/notifications")
         market_types = {"DAILY_EOD", "MOMENTUM_2H", "MORNING_GAP"}
         for n in resp.json():
@@ -169,13 +159,10 @@ class TestNotificationsRegression:
 
     def test_clear_all_notifications(self, client):
         """POST /notifications/clear-all returns 200."""
-        with patch("routers.notifications.dismiss_notification"), \
-             patch("routers.notifications.generate_all_notifications", return_value=[]), \
-             patch("routers.notifications.get_dismissed_notification_ids", return_value=set()), \
-             patch("routers.notifications.get_all_alerts", return_value=[]), \
-             patch("routers.notifications.mark_alert_read"):
+        with patch("routers.notifications.clear_all_notifications", return_value=3) as clear:
             resp = client.post("/api/v1/notifications/clear-all")
         assert resp.status_code == 200
+        assert clear.call_count == 1
 
     def test_news_briefing_and_reminder_alert_are_separate_types(self, client):
         """NEWS_BRIEFING and REMINDER_ALERT are distinct type strings."""
@@ -0,0 +1,97 @@
+"""
+5 tests for request-scoped upstream memoization:
+  pass-through outside a request (1), dedup within a request (2),
+  failure handling (1), debug header through the middleware (1).
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.request_context import (
+    DEDUP_HEADER,
+    RequestContext,
+    _current,
+    request_context_middleware,
+    request_memoized,
+)
+
+
+def _memoized_upstream():
+    upstream = MagicMock(side_effect=lambda symbol: {"symbol": symbol})
+    return upstream, request_memoized("test.quote")(lambda symbol: upstream(symbol))
+
+
+class TestRequestMemoized:
+
+    def test_pass_through_outside_request(self):
+        upstream, fetch = _memoized_upstream()
+        fetch("AAPL")
+        fetch("AAPL")
+        assert upstream.call_count == 2
+
+    def test_same_args_fetched_once_per_request(self):
+        upstream, fetch = _memoized_upstream()
+        ctx = RequestContext()
+        token = _current.set(ctx)
+        try:
+            first = fetch("AAPL")
+            second = fetch("AAPL")
+        finally:
+            _current.reset(token)
+        assert first is second
+        assert upstream.call_count == 1
+        assert ctx.dedup_count == 1
+
+    def test_different_args_are_separate_entries(self):
+        upstream, fetch = _memoized_upstream()
+        ctx = RequestContext()
+        token = _current.set(ctx)
+        try:
+            fetch("AAPL")
+            fetch("MSFT")
+        finally:
+            _current.reset(token)
+        assert upstream.call_count == 2
+        assert ctx.dedup_count == 0
+
+    def test_failures_are_not_memoized(self):
+        upstream = MagicMock(side_effect=[RuntimeError("boom"), {"c": 1.0}])
+        fetch = request_memoized("test.flaky")(lambda symbol: upstream(symbol))
+        token = _current.set(RequestContext())
+        try:
+            with pytest.raises(RuntimeError):
+                fetch("AAPL")
+            assert fetch("AAPL") == {"c": 1.0}
+        finally:
+            _current.reset(token)
+        assert upstream.call_count == 2
+
+
+class TestDedupHeader:
+
+    def test_header_reports_dedup_count_for_sync_and_async_routes(self):
+        upstream, fetch = _memoized_upstream()
+        app = FastAPI()
+        app.middleware("http")(request_context_middleware)
+
+        @app.get("/async")
+        async def async_route():
+            fetch("AAPL")
+            fetch("AAPL")
+            fetch("AAPL")
+            return {}
+
+        @app.get("/sync")
+        def sync_route():
+            fetch("MSFT")
+            fetch("MSFT")
+            return {}
+
+        with TestClient(app) as c:
+            assert c.get("/async").headers[DEDUP_HEADER] == "2"
+            assert c.get("/sync").headers[DEDUP_HEADER] == "1"
+            # A new request starts with an empty memo table
+            assert c.get("/sync").headers[DEDUP_HEADER] == "1"
+        assert upstream.call_count == 3
@@ -0,0 +1,136 @@
+"""
+6 tests for multi-symbol TwelveData refreshes in DataManager.get_stock_data_batch:
+  payload parsing (1), one request per group (2), skipping fresh symbols (1),
+  API-credit failures and budget deferral (2).
+"""
+from collections import OrderedDict
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from services import bar_store, stock_manager
+from services.bar_cache import bar_cache
+from services.td_scheduler import scheduler
+
+
+def _rows(symbol, times, closes):
+    return pd.DataFrame({
+        "symbol": symbol, "datetime": times,
+        "open": closes, "high": closes, "low": closes, "close": closes,
+        "volume": [10] * len(times),
+    })
+
+
+def _payload(symbols, times=("2024-01-03 09:30:00", "2024-01-03 09:31:00")):
+    """Shape of TimeSeries.as_json() for a comma-separated symbol list."""
+    out = OrderedDict()
+    for i, symbol in enumerate(symbols):
+        out[symbol] = OrderedDict(
+            (t, {"datetime": t, "open": str(10 + i), "high": str(11 + i), "low": str(9 + i),
+                 "close": str(10.5 + i), "volume": "100"})
+            for t in times
+        )
+    return out
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", "")
+    bar_cache.clear()
+    scheduler.reset()
+    dm = stock_manager.DataManager()
+    dm._td = MagicMock()
+    yield dm
+    bar_cache.clear()
+    scheduler.reset()
+
+
+def _stale_history(symbol, table, start=None):
+    return _rows(symbol, ["2024-01-02 15:59:00"], [1.0])
+
+
+class TestBatchPayload:
+
+    def test_payload_splits_into_per_symbol_numeric_frames(self):
+        frames = stock_manager._batch_json_to_frames(_payload(["AAPL", "MSFT"]))
+        assert set(frames) == {"AAPL", "MSFT"}
+        msft = frames["MSFT"]
+        assert isinstance(msft.index, pd.DatetimeIndex)
+        assert msft["close"].tolist() == [11.5, 11.5]
+        assert msft["volume"].dtype.kind in "fi"
+
+
+class TestBatchRequests:
+
+    def test_stale_symbols_share_one_request_and_are_split_back(self, manager):
+        manager._td.time_series.return_value.as_json.return_value = _payload(["AAPL", "MSFT"])
+        with patch.object(stock_manager, "fetch_history", side_effect=_stale_history), \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars") as save:
+            result = manager.get_stock_data_batch(["aapl", "MSFT", "AAPL"], "1min")
+
+        manager._td.time_series.assert_called_once()
+        assert manager._td.time_series.call_args.kwargs["symbol"] == "AAPL,MSFT"
+        assert manager._td.time_series.call_args.kwargs["start_date"] == "2024-01-02 15:59:00"
+        assert sorted(c.args[0] for c in save.call_args_list) == ["AAPL", "MSFT"]
+        assert list(result) == ["AAPL", "MSFT"]
+        assert result["AAPL"]["close"].tolist() == [1.0, 10.5, 10.5]
+        assert result["MSFT"]["close"].tolist() == [1.0, 11.5, 11.5]
+
+    def test_groups_are_chunked_by_batch_size(self, manager, monkeypatch):
+        monkeypatch.setattr(stock_manager, "TWELVEDATA_BATCH_SYMBOLS", 2)
+        manager._td.time_series.side_effect = lambda **kw: MagicMock(
+            as_json=MagicMock(return_value=_payload(kw["symbol"].split(","))),
+            as_pandas=MagicMock(return_value=stock_manager._batch_json_to_frames(
+                _payload([kw["symbol"]]))[kw["symbol"]]),
+        )
+        with patch.object(stock_manager, "fetch_history", side_effect=_stale_history), \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars"):
+            result = manager.get_stock_data_batch(["A", "B", "C"], "1min")
+
+        sent = sorted(c.kwargs["symbol"] for c in manager._td.time_series.call_args_list)
+        assert sent == ["A,B", "C"]
+        assert all(len(df) == 3 for df in result.values())
+
+    def test_fresh_symbols_are_not_requested(self, manager):
+        now_et = datetime.now(stock_manager.ET).strftime("%Y-%m-%d %H:%M:%S")
+        with patch.object(stock_manager, "fetch_history",
+                          side_effect=lambda s, t, start=None: _rows(s, [now_et], [2.0])), \
+             patch.object(stock_manager, "is_market_open", return_value=False):
+            result = manager.get_stock_data_batch(["AAPL", "MSFT"], "1min")
+
+        manager._td.time_series.assert_not_called()
+        assert result["MSFT"]["close"].tolist() == [2.0]
+
+
+class TestBatchFailures:
+
+    def test_credit_error_blocks_further_requests(self, manager):
+        manager._td.time_series.side_effect = Exception("You have run out of API credits")
+        with patch.object(stock_manager, "fetch_history", side_effect=_stale_history), \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars") as save:
+            result = manager.get_stock_data_batch(["AAPL", "MSFT"], "1min")
+            manager.get_stock_data_batch(["AAPL", "MSFT"], "1min")
+
+        assert manager._td.time_series.call_count == 1
+        save.assert_not_called()
+        assert scheduler.is_blocked()
+        assert result["AAPL"]["close"].tolist() == [1.0]
+
+    def test_symbols_beyond_the_budget_are_deferred_and_served_stale(self, manager, monkeypatch):
+        monkeypatch.setattr(scheduler, "per_minute", 3)
+        monkeypatch.setattr(scheduler, "reserve", 1)
+        manager._td.time_series.side_effect = lambda **kw: MagicMock(
+            as_json=MagicMock(return_value=_payload(kw["symbol"].split(","))))
+        with patch.object(stock_manager, "fetch_history", side_effect=_stale_history), \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars"):
+            result = manager.get_stock_data_batch(["A", "B", "C"], "1min")
+
+        assert manager._td.time_series.call_args.kwargs["symbol"] == "A,B"
+        assert scheduler.pending() == [("C", "1min")]
+        assert result["C"]["close"].tolist() == [1.0]
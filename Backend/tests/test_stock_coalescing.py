@@ -0,0 +1,125 @@
+"""
+4 tests for single-flight chart loads in DataManager:
+  concurrent callers share one refresh and load (2), batch joins an in-flight
+  chart load (1), errors reach every waiter (1).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from services import bar_store, stock_manager
+from services.bar_cache import bar_cache
+from services.td_scheduler import scheduler
+
+
+def _rows(symbol, times, closes):
+    return pd.DataFrame({
+        "symbol": symbol, "datetime": times,
+        "open": closes, "high": closes, "low": closes, "close": closes,
+        "volume": [10] * len(times),
+    })
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(bar_store, "BAR_STORE_DIR", "")
+    bar_cache.clear()
+    scheduler.reset()
+    dm = stock_manager.DataManager()
+    dm._td = MagicMock()
+    dm._td.time_series.return_value.as_pandas.return_value = pd.DataFrame(
+        {"open": [2.0], "high": [2.0], "low": [2.0], "close": [2.0], "volume": [5.0]},
+        index=pd.DatetimeIndex([pd.Timestamp("2024-01-03 09:30:00")], name="datetime"),
+    )
+    yield dm
+    bar_cache.clear()
+    scheduler.reset()
+
+
+def _run_concurrently(dm, n, call, gate):
+    """Start n callers and release `gate` once all of them have claimed the flight."""
+    claims = []
+    claim = dm._claim_flight
+
+    def counting_claim(key):
+        result = claim(key)
+        claims.append(key)
+        return result
+
+    dm._claim_flight = counting_claim
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(call, i) for i in range(n)]
+        deadline = time.monotonic() + 5
+        while len(claims) < n and time.monotonic() < deadline:
+            time.sleep(0.005)
+        gate.set()
+        return [f.result(timeout=5) if not f.exception() else f.exception() for f in futures]
+
+
+def _slow_history(gate):
+    def fetch(sym, table, start=None):
+        gate.wait(5)
+        return _rows(sym, ["2024-01-02 15:59:00"], [1.0])
+    return fetch
+
+
+class TestCoalescedLoads:
+
+    def test_concurrent_callers_share_one_refresh_and_frame(self, manager):
+        gate = threading.Event()
+        with patch.object(stock_manager, "fetch_history", side_effect=_slow_history(gate)) as history, \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars"):
+            frames = _run_concurrently(manager, 4, lambda i: manager.get_stock_data("AAPL", "1min"), gate)
+
+        assert history.call_count == 1
+        manager._td.time_series.assert_called_once()
+        assert all(f["close"].tolist() == [1.0, 2.0] for f in frames)
+        frames[0].loc[0, "close"] = 99.0
+        assert frames[1]["close"].tolist() == [1.0, 2.0]
+        assert manager._flights == {}
+
+    def test_waiters_with_another_start_slice_their_own_range(self, manager):
+        gate = threading.Event()
+        starts = [None, "2024-01-03 00:00:00"]
+        with patch.object(stock_manager, "fetch_history", side_effect=_slow_history(gate)), \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars"):
+            frames = _run_concurrently(
+                manager, 2, lambda i: manager.get_stock_data("AAPL", "1min", start=starts[i]), gate)
+
+        manager._td.time_series.assert_called_once()
+        assert sorted(len(f) for f in frames) == [1, 2]
+
+    def test_batch_prefetch_waits_for_an_in_flight_chart_load(self, manager):
+        gate = threading.Event()
+        calls = [lambda: manager.get_stock_data("AAPL", "1min"),
+                 lambda: manager.get_stock_data_batch(["AAPL"], "1min")["AAPL"]]
+        with patch.object(stock_manager, "fetch_history", side_effect=_slow_history(gate)), \
+             patch.object(stock_manager, "is_market_open", return_value=False), \
+             patch.object(stock_manager, "save_bars"):
+            frames = _run_concurrently(manager, 2, lambda i: calls[i](), gate)
+
+        assert manager._td.time_series.call_count == 1
+        assert [f["close"].tolist() for f in frames] == [[1.0, 2.0], [1.0, 2.0]]
+
+
+class TestCoalescedErrors:
+
+    def test_load_error_reaches_every_waiter_and_clears_the_flight(self, manager):
+        gate = threading.Event()
+
+        def failing(sym, table, start=None):
+            gate.wait(5)
+            raise RuntimeError("supabase down")
+
+        with patch.object(stock_manager, "fetch_history", side_effect=failing) as history:
+            results = _run_concurrently(manager, 3, lambda i: manager.get_stock_data("AAPL", "1day"), gate)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert history.call_count == 1
+        assert manager._flights == {}
@@ -0,0 +1,102 @@
+"""
+6 tests for the TwelveData credit scheduler:
+  minute window (1), interactive reserve and waiting (2), deferral merging and
+  expiry (2), exhausted credits (1).
+"""
+from services.td_scheduler import BACKGROUND, INTERACTIVE, CreditScheduler
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _scheduler(per_minute=4, per_day=100, reserve=1, wait=0.0, deferred_ttl=3600):
+    clock = _Clock()
+    return CreditScheduler(per_minute, per_day, reserve, wait, deferred_ttl,
+                           clock=clock, sleep=clock.sleep), clock
+
+
+class TestMinuteWindow:
+
+    def test_credits_free_up_after_sixty_seconds(self):
+        s, clock = _scheduler()
+        assert s.acquire(4, INTERACTIVE)
+        assert not s.acquire(1, INTERACTIVE)
+        clock.now += 60
+        assert s.acquire(1, INTERACTIVE)
+        assert s.state()["day"]["used"] == 5
+
+
+class TestPriorities:
+
+    def test_background_leaves_the_interactive_reserve(self):
+        s, _ = _scheduler(per_minute=4, reserve=1)
+        assert s.acquire(3, BACKGROUND)
+        assert not s.acquire(1, BACKGROUND)
+        assert s.acquire(1, INTERACTIVE)
+        assert s.state()["requests"][BACKGROUND] == {"granted": 1, "denied": 1}
+
+    def test_interactive_waits_for_the_window_within_its_budget(self):
+        s, clock = _scheduler(per_minute=2, wait=30.0)
+        start = clock.now
+        s.acquire(2, INTERACTIVE)
+        clock.now += 45
+        assert s.acquire(1, INTERACTIVE)
+        assert clock.now - start >= 60
+        clock.now += 1
+        assert s.acquire(1, INTERACTIVE)
+        # The next credit frees up 59s later, beyond the 30s wait budget: degrade instead
+        assert not s.acquire(1, INTERACTIVE)
+        assert clock.now == start + 61
+
+
+class TestDeferral:
+
+    def test_deferred_keys_merge_and_go_first(self):
+        s, clock = _scheduler(per_minute=3, reserve=1)
+        granted, deferred = s.acquire_batch([("A", "1min"), ("B", "1min"), ("C", "1min")])
+        assert granted == [("A", "1min"), ("B", "1min")] and deferred == [("C", "1min")]
+        s.acquire_batch([("C", "1min")])
+        assert s.state()["deferred"][0]["requests"] == 2
+
+        clock.now += 60
+        granted, deferred = s.acquire_batch([("A", "1min"), ("B", "1min"), ("C", "1min")])
+        assert granted[0] == ("C", "1min")
+        assert ("C", "1min") not in s.pending()
+
+    def test_deferrals_nobody_asks_for_again_expire(self):
+        s, clock = _scheduler(per_minute=2, reserve=1, deferred_ttl=600)
+        s.acquire_batch(["A", "B", "C"])
+        assert s.pending() == ["B", "C"]
+
+        clock.now += 300
+        s.acquire(1, INTERACTIVE)             # uses up the minute: C is deferred again
+        s.acquire_batch(["C"])
+        clock.now += 400                      # B last asked 700 s ago, C 400 s ago
+        assert s.pending() == ["C"]
+        assert [d["key"] for d in s.state()["deferred"]] == ["C"]
+
+        clock.now = (clock.now // 86400 + 1) * 86400  # day budget rollover
+        assert s.pending() == []
+
+
+class TestExhausted:
+
+    def test_reported_exhaustion_blocks_until_the_window_resets(self):
+        s, clock = _scheduler()
+        s.record_exhausted("You have run out of API credits for the current minute.")
+        assert s.is_blocked() and not s.acquire(1, BACKGROUND)
+        clock.now += 61
+        assert s.acquire(1, BACKGROUND)
+
+        s.record_exhausted("You have run out of API credits for the day.")
+        clock.now += 61
+        assert not s.acquire(1, INTERACTIVE)
+        assert s.state()["day"]["remaining"] == 0
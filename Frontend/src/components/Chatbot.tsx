@@ -35,6 +35,7 @@ interface ChatRequestOptions {
   ticker?: string;
   improveSummary?: boolean;
   history?: { role: string; content: string }[];
+  conversationId?: string | null;
 }
 
 const API_TIMEOUT_MS = 35000;
@@ -58,6 +59,7 @@ const postChatMessage = async (message: string, options: ChatRequestOptions = {}
     ticker: options.ticker || null,
     improve_summary: Boolean(options.improveSummary),
     history: options.history || null,
+    conversation_id: options.conversationId || null,
   });
   const endpoints = buildChatEndpoints();
   let lastError: unknown;
@@ -139,6 +141,8 @@ const Chatbot: React.FC<ChatbotProps> = ({ userId: _userId, conversationId, init
   const [selectedVoice, setSelectedVoice] = useState<SpeechSynthesisVoice | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const recognitionRef = useRef<any>(null);
+  // Server-side session id from the last /chat response; lets follow-ups reuse fetched news and quotes
+  const serverConversationIdRef = useRef<string | null>(null);
 
   useEffect(() => {
     if (typeof window === 'undefined' || !window.speechSynthesis) return;
@@ -177,9 +181,10 @@ const Chatbot: React.FC<ChatbotProps> = ({ userId: _userId, conversationId, init
     scrollToBottom();
   }, [messages]);
 
-  // Reset isInitialMount when conversationId changes
+  // Reset isInitialMount and the server session when conversationId changes
   useEffect(() => {
     isInitialMount.current = true;
+    serverConversationIdRef.current = null;
   }, [conversationId]);
 
   // Update messages when initialMessages prop changes (when switching conversations)
@@ -258,13 +263,30 @@ const Chatbot: React.FC<ChatbotProps> = ({ userId: _userId, conversationId, init
     setIsLoading(true);
 
     try {
-      const result = await postChatMessage(backendText, {
+      const history = messages.map(m => ({ role: m.role, content: m.content }));
+      const requestOptions: ChatRequestOptions = {
         eli5: eli5Mode || resolvedOptions.eli5,
         includeNews: resolvedOptions.includeNews,
         ticker: resolvedOptions.ticker,
         improveSummary: resolvedOptions.improveSummary,
-        history: messages.map(m => ({ role: m.role, content: m.content })),
-      });
+        conversationId: serverConversationIdRef.current,
+        // The server keeps the history of a live session; send it only to start one
+        history: serverConversationIdRef.current ? undefined : history,
+      };
+
+      let result: Awaited<ReturnType<typeof postChatMessage>>;
+      try {
+        result = await postChatMessage(backendText, requestOptions);
+      } catch (error) {
+        // 409: the server no longer has this session (expired or restarted), so resend the transcript
+        const expired = error instanceof Error && error.message.startsWith('HTTP_409');
+        if (!expired || !requestOptions.conversationId) throw error;
+        result = await postChatMessage(backendText, { ...requestOptions, history });
+      }
+
+      if ((result as any).conversation_id) {
+        serverConversationIdRef.current = (result as any).conversation_id;
+      }
 
       const assistantMessage: Message = {
         id: (Date.now() + 1).toString(),
@@ -1,5 +1,5 @@
 import React, { createContext, useContext, useState, useEffect, useRef, ReactNode } from 'react';
-import { fetchNotifications, dismissNotification as apiDismiss, clearAllNotifications as apiClearAll, triggerNewsBriefingGeneration, Notification } from '../services/api';
+import { fetchNotifications, dismissNotification as apiDismiss, clearAllNotifications as apiClearAll, triggerNewsBriefingGeneration, subscribeToNotifications, Notification } from '../services/api';
 
 interface NotificationContextType {
     notifications: Notification[];
@@ -20,24 +20,54 @@ export const NotificationProvider: React.FC<{ children: ReactNode }> = ({ childr
     const [loading, setLoading] = useState(false);
     const lastBriefingDate = useRef<string>('');
 
-    // Load and stamp notifications
-    const loadNotifications = async () => {
+    // Load and stamp notifications; returns the stream position the load reflects
+    const loadNotifications = async (): Promise<string | null> => {
         setLoading(true);
         try {
-            const data = await fetchNotifications();
+            const { notifications: data, eventId } = await fetchNotifications();
             setNotifications(data);
+            return eventId;
         } catch (err) {
             console.error("Failed to load notifications", err);
+            return null;
         } finally {
             setLoading(false);
         }
     };
 
-    // Poll every 30s
+    // Load once, then follow the server's event stream from where the load
+    // left off (poll every 30s only without it)
     useEffect(() => {
-        loadNotifications();
-        const interval = setInterval(loadNotifications, 30_000);
-        return () => clearInterval(interval);
+        let cancelled = false;
+        let interval: ReturnType<typeof setInterval> | undefined;
+        let unsubscribe: () => void = () => {};
+        loadNotifications().then((eventId) => {
+            if (cancelled) return;
+            unsubscribe = subscribeToNotifications({
+                onNotification: (n) => setNotifications(prev => {
+                    const rest = prev.filter(p => p.id !== n.id);
+                    // Alerts stay first, like in GET /notifications
+                    return n.type === 'REMINDER_ALERT' ? [n, ...rest] : [
+                        ...rest.filter(p => p.type === 'REMINDER_ALERT'),
+                        n,
+                        ...rest.filter(p => p.type !== 'REMINDER_ALERT'),
+                    ];
+                }),
+                onDismiss: (id) => setNotifications(prev => prev.filter(n => n.id !== id)),
+                onClear: () => setNotifications([]),
+                onReset: loadNotifications,
+                onUnavailable: () => {
+                    if (!interval) {
+                        interval = setInterval(loadNotifications, 30_000);
+                    }
+                },
+            }, eventId);
+        });
+        return () => {
+            cancelled = true;
+            unsubscribe();
+            if (interval) clearInterval(interval);
+        };
     }, []);
 
     // On app startup, trigger news briefing generation for any enabled stocks
@@ -397,7 +397,7 @@ export interface NewsArticle {
 
 export interface Notification {
   id: string;
-  type: 'DAILY_EOD' | 'MOMENTUM_2H' | 'MORNING_GAP' | 'NEWS_BRIEFING' | 'REMINDER_ALERT';
+  type: 'DAILY_EOD' | 'MOMENTUM_2H' | `MOMENTUM_${string}` | 'MORNING_GAP' | 'NEWS_BRIEFING' | 'REMINDER_ALERT';
   symbol: string;
   title: string;
   message: string;
@@ -407,19 +407,67 @@ export interface Notification {
   articles?: NewsArticle[];  // Only for NEWS_BRIEFING
 }
 
-export const fetchNotifications = async (): Promise<Notification[]> => {
+export interface NotificationsPage {
+  notifications: Notification[];
+  /** The event stream's position when the panel was read (X-Notifications-Event-Id) */
+  eventId: string | null;
+}
+
+export const fetchNotifications = async (): Promise<NotificationsPage> => {
   try {
     const response = await fetch(`${API_BASE_URL}/notifications`);
     if (!response.ok) {
       throw new Error('Failed to fetch notifications');
     }
-    return await response.json();
+    return {
+      notifications: await response.json(),
+      eventId: response.headers.get('X-Notifications-Event-Id'),
+    };
   } catch (error) {
     console.error('Error fetching notifications:', error);
-    return [];
+    return { notifications: [], eventId: null };
   }
 };
 
+export interface NotificationStreamHandlers {
+  onNotification: (notification: Notification) => void;
+  onDismiss: (id: string) => void;
+  onClear: () => void;
+  /** Events were missed and can't be replayed: reload with fetchNotifications */
+  onReset: () => void;
+  /** The stream is unavailable; fall back to polling */
+  onUnavailable: () => void;
+}
+
+/**
+ * Listen to /notifications/stream (server-sent events). Pass the eventId of the
+ * panel load so events published since are replayed; after that EventSource
+ * reconnects on its own and sends Last-Event-ID.
+ * Returns a function that closes the stream.
+ */
+export const subscribeToNotifications = (
+  handlers: NotificationStreamHandlers,
+  lastEventId?: string | null,
+): (() => void) => {
+  if (typeof EventSource === 'undefined') {
+    handlers.onUnavailable();
+    return () => {};
+  }
+  const query = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : '';
+  const source = new EventSource(`${API_BASE_URL}/notifications/stream${query}`);
+  source.addEventListener('notification', (e) => handlers.onNotification(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener('dismiss', (e) => handlers.onDismiss(JSON.parse((e as MessageEvent).data).id));
+  source.addEventListener('clear', () => handlers.onClear());
+  source.addEventListener('reset', () => handlers.onReset());
+  source.onerror = () => {
+    // CLOSED means the browser gave up (e.g. the endpoint is missing); otherwise it retries
+    if (source.readyState === EventSource.CLOSED) {
+      handlers.onUnavailable();
+    }
+  };
+  return () => source.close();
+};
+
 export const dismissNotification = async (notificationId: string): Promise<void> => {
   await fetch(`${API_BASE_URL}/notifications/dismiss`, {
     method: 'POST',